@@ -56,6 +56,8 @@ class OnTaskSharedState:
 
     engine = None
 
+    engine_pid = None
+
     def __init__(self):
         """Stored the shared state as the dictionary."""
         self.__dict__ = self.__shared_state
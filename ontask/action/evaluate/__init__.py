@@ -1,8 +1,8 @@
 """Module to evaluate actions, templates and conditions."""
 from ontask.action.evaluate.action import (
     action_condition_evaluation, evaluate_action, evaluate_row_action_out,
-    get_action_evaluation_context, get_row_values,
+    get_action_evaluation_context, get_row_values, iterate_action_evaluation,
 )
 from ontask.action.evaluate.template import (
-    RTR_ITEM, TR_ITEM, VIZ_NUMBER_CONTEXT_VAR, render_action_template,
-    render_rubric_criteria)
+    RENDER_CACHE_CONTEXT_VAR, RTR_ITEM, TR_ITEM, VIZ_NUMBER_CONTEXT_VAR,
+    get_render_cache_item, render_action_template, render_rubric_criteria)
@@ -2,12 +2,17 @@
 
 - evaluate_action: Evaluates the content of an action
 
+- iterate_action_evaluation: Evaluates the content of an action one row at a
+  time
+
 - evaluate_row_action_out: Evaluates an action text for a single row of the
   table
 
 """
 from datetime import datetime
-from typing import Dict, List, Mapping, Optional, Tuple, Union
+from typing import (
+    Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union,
+)
 
 from django.conf import settings
 from django.template import TemplateSyntaxError
@@ -17,7 +22,7 @@ from django.utils.translation import gettext_lazy as _
 from ontask import OnTaskException
 from ontask import models
 from ontask.action.evaluate.template import render_action_template
-from ontask.dataops import formula, sql
+from ontask.dataops import sql
 
 
 def _render_tuple_result(
@@ -25,6 +30,7 @@ def _render_tuple_result(
     context: Dict[str, Union[str, float, int, datetime]],
     extra_string: str,
     column_name: str,
+    render_cache: Optional[Dict] = None,
 ) -> List:
     """Render text in action, extra string (optional), and get column_name.
 
@@ -34,6 +40,7 @@ def _render_tuple_result(
     :param context: Dictionary with name: value
     :param extra_string: Optional string to render
     :param column_name: Column name to include its value
+    :param render_cache: Dictionary shared by all the rendered rows
     :return: [action content render, extra string rendered (optional),
               column value (optional)]
     """
@@ -42,6 +49,7 @@ def _render_tuple_result(
         action.text_content,
         context,
         action,
+        render_cache=render_cache,
     )]
 
     # If there is extra message, render with context and append
@@ -66,13 +74,10 @@ def action_condition_evaluation(
     :return: Dictionary condition_name: True/False or None if anomaly
     """
     condition_eval = {}
-    conditions = action.conditions.values('name', '_formula')
-    for condition in conditions:
+    for condition in action.conditions.all():
         # Evaluate the condition
         try:
-            condition_eval[condition['name']] = formula.evaluate(
-                condition['_formula'],
-                formula.EVAL_EXP,
+            condition_eval[condition.name] = condition.evaluate_row(
                 row_values)
         except OnTaskException:
             # Something went wrong evaluating a condition. Stop.
@@ -97,16 +102,13 @@ def get_action_evaluation_context(
         # No rows satisfy the given condition
         return None
 
-    if not condition_eval:
+    if condition_eval is None:
         # Step 1: Evaluate all the conditions
         condition_eval = {}
-        conditions = action.conditions.values('name', '_formula')
-        for condition in conditions:
+        for condition in action.conditions.all():
             # Evaluate the condition
             try:
-                condition_eval[condition['name']] = formula.evaluate(
-                    condition['_formula'],
-                    formula.EVAL_EXP,
+                condition_eval[condition.name] = condition.evaluate_row(
                     row_values)
             except OnTaskException:
                 # Something went wrong evaluating a condition. Stop.
@@ -130,9 +132,10 @@ def evaluate_action(
 
     Given an action object and an optional string:
     1) Access the attached workflow
-    2) Obtain the data from the appropriate data frame
+    2) Obtain the data from the appropriate data frame together with the
+       evaluation of all the conditions (in a single SQL query)
     3) Loop over each data row and
-      3.1) Evaluate the conditions with respect to the values in the row
+      3.1) Take the evaluation of the conditions for the row
       3.2) Create a context with the result of evaluating the conditions,
            attributes and column names
       3.3) Run the template with the context
@@ -153,32 +156,108 @@ def evaluate_action(
              element in the list contains the HTML body, the extra string (if
              provided) and the column value.
     """
-    # Get the table data
-    rows = sql.get_rows(
-        action.workflow.get_data_frame_table_name(),
-        filter_formula=action.get_filter_formula())
-    list_of_renders = []
-    for row in rows:
-        if exclude_values and str(row[column_name]) in exclude_values:
-            # Skip the row with the col_name in exclude values
-            continue
+    return list(iterate_action_evaluation(
+        action,
+        extra_string=extra_string,
+        column_name=column_name,
+        exclude_values=exclude_values))
 
-        # Step 4: Create the context with the attributes, the evaluation of the
-        # conditions and the values of the columns.
-        context = get_action_evaluation_context(action, row)
 
-        # Append result
-        list_of_renders.append(
-            _render_tuple_result(action, context, extra_string, column_name),
-        )
+def iterate_action_evaluation(
+    action: models.Action,
+    extra_string: str = None,
+    column_name: str = None,
+    exclude_values: List[str] = None,
+) -> Iterator[List]:
+    """Evaluate the content in an action one row at a time.
+
+    The data and the condition values are obtained from the DB when the
+    function is invoked, but each row is rendered only when the next element
+    is requested. Same parameters and elements as in evaluate_action.
+
+    :param action: Action object with pointers to conditions, filter,
+                   workflow, etc.
+    :param extra_string: An extra string to process (something like the email
+           subject line) with the same dictionary as the text in the action.
+    :param column_name: Column from where to extract the special value (
+           typically the email address) and include it in the result.
+    :param exclude_values: List of values in the column to exclude
+    :return: Iterator over the lists [HTML body, extra string (if provided),
+             column value (if provided)]
+    """
+    # Get the table data and the condition values
+    column_names = action.workflow.get_column_names()
+    condition_names, condition_formulas = [], []
+    for cond_name, cond_formula in action.conditions.values_list(
+        'name',
+        '_formula',
+    ):
+        condition_names.append(cond_name)
+        condition_formulas.append(cond_formula)
+    rows = sql.get_rows_with_conditions(
+        action.workflow.get_data_frame_table_name(),
+        column_names,
+        condition_formulas,
+        filter_formula=action.get_filter_formula())
 
     if settings.DEBUG:
         # Check that selected_count is rows.rowcount
-        if action.filter and action.filter.selected_count != rows.rowcount:
+        if action.filter and action.get_rows_selected() != rows.rowcount:
             raise OnTaskException(
                 'Inconsistent selected_count field value')
 
-    return list_of_renders
+    return _render_rows(
+        action,
+        rows,
+        column_names,
+        condition_names,
+        extra_string,
+        column_name,
+        exclude_values)
+
+
+def _render_rows(
+    action: models.Action,
+    rows: Iterable,
+    column_names: List[str],
+    condition_names: List[str],
+    extra_string: Optional[str],
+    column_name: Optional[str],
+    exclude_values: Optional[List[str]],
+) -> Iterator[List]:
+    """Render the action for each of the given rows.
+
+    :param action: Action object being evaluated
+    :param rows: Rows with the column values followed by the condition values
+    :param column_names: Names of the columns in the rows
+    :param condition_names: Names of the conditions in the rows
+    :param extra_string: An extra string to process (optional)
+    :param column_name: Column from where to extract the special value
+    :param exclude_values: List of values in the column to exclude
+    :return: Iterator over the rendered results
+    """
+    # Population data used by the template tags is computed only once
+    render_cache = {}
+    ncols = len(column_names)
+    for row in rows:
+        row_values = dict(zip(column_names, row[:ncols]))
+        if exclude_values and str(row_values[column_name]) in exclude_values:
+            # Skip the row with the col_name in exclude values
+            continue
+
+        # Step 4: Create the context with the attributes, the evaluation of the
+        # conditions and the values of the columns.
+        context = get_action_evaluation_context(
+            action,
+            row_values,
+            dict(zip(condition_names, row[ncols:])))
+
+        yield _render_tuple_result(
+            action,
+            context,
+            extra_string,
+            column_name,
+            render_cache)
 
 
 def get_row_values(
@@ -1,8 +1,11 @@
 """Manipulate template text within OnTask and evaluate its content."""
+import functools
 import re
 import shlex
 import string
-from typing import Callable, Dict, List, Mapping
+from typing import (
+    Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple,
+)
 
 from django.template import Context, Template
 from django.utils.html import escape
@@ -14,6 +17,9 @@ from ontask import models
 from ontask.templatetags import ACTION_CONTEXT_VAR
 
 VIZ_NUMBER_CONTEXT_VAR = 'ONTASK_VIZ_NUMBER_CONTEXT_VARIABLE___'
+# Variable name to store the dictionary shared by all the rows rendered in an
+# action execution (used by the tags to compute population data only once)
+RENDER_CACHE_CONTEXT_VAR = 'ONTASK_RENDER_CACHE_CONTEXT_VARIABLE___'
 
 # Regular expression and replacements replace whitespace surrounding condition
 # markup
@@ -25,6 +31,10 @@ WHITE_SPACE_RES = [
 # Template prelude to load the ontask_tags
 _ONTASK_TEMPLATE_PRELUDE = '{% load ontask_tags %}'
 
+# Maximum number of parsed templates (and context key translations) kept in
+# memory to render the same text for multiple rows.
+TEMPLATE_CACHE_SIZE = 128
+
 
 def make_translate(*args, **keywords) -> Callable:
     """Apply multiple character substitutions.
@@ -200,6 +210,75 @@ def _clean_whitespace(template_text: str) -> str:
     return template_text
 
 
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(template_text: str, has_html_text: bool) -> Template:
+    """Translate the variables in a template text and parse it.
+
+    The result only depends on the text and the type of content in the
+    action, so it is cached and the text is parsed only once when rendering
+    it for multiple rows.
+
+    :param template_text: Text in the template to be rendered
+    :param has_html_text: The text is HTML (variable names are escaped)
+    :return: Django template object
+    """
+    # Apply the translation process to all variables in the template text
+    new_template_text = template_text
+    for regex in models.VAR_USE_RES:
+        if has_html_text:
+            new_template_text = regex.sub(
+                _change_unescape_variable_name,
+                new_template_text)
+        else:
+            new_template_text = regex.sub(
+                _change_variable_name,
+                new_template_text)
+
+    # Remove pre-and post white space from the {% if %} and {% endif %}
+    # conditions (to reduce white space when using non HTML content).
+    new_template_text = _clean_whitespace(new_template_text)
+
+    return Template(_ONTASK_TEMPLATE_PRELUDE + new_template_text)
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _translate_keys(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Translate the names of the variables in a context.
+
+    All the rows rendered for an action have the same context keys, so the
+    translation is calculated only once.
+
+    :param keys: Tuple of variable names in the context
+    :return: Tuple with the translated names (in the same order)
+    """
+    return tuple(_translate(key) for key in keys)
+
+
+def get_render_cache_item(
+    context: Mapping,
+    key: Hashable,
+    create_item: Callable[[], Any],
+) -> Any:
+    """Get an item from the render cache in the context (create if needed).
+
+    The items stored in the cache are shared by all the rows rendered in the
+    same execution of an action, so they must not depend on the values of a
+    row.
+
+    :param context: Context used to render the template
+    :param key: Key identifying the item (include column, filter, etc.)
+    :param create_item: Function to create the item if it is not present
+    :return: Item in the cache
+    """
+    render_cache = context.get(RENDER_CACHE_CONTEXT_VAR)
+    if render_cache is None:
+        return create_item()
+
+    if key not in render_cache:
+        render_cache[key] = create_item()
+    return render_cache[key]
+
+
 def render_rubric_criteria(action: models.Action, context: Dict) -> List[List]:
     """Calculate the list of elements [criteria, feedback] for action.
 
@@ -231,6 +310,7 @@ def render_action_template(
     template_text: str,
     context_dict: Mapping,
     action: models.Action = None,
+    render_cache: Optional[Dict] = None,
 ) -> str:
     """Render a template using a given context.
 
@@ -271,31 +351,20 @@ def render_action_template(
     :param context_dict: Dictionary used by Jinja to evaluate the template
     :param action: Action object to insert in the context in case it is
     needed by any other custom template.
+    :param render_cache: Dictionary shared by all the rows rendered in the
+    same action execution (see get_render_cache_item)
     :return: The rendered template
     """
-    # Steps 1 and 2. Apply the translation process to all variables that
-    # appear in the template text
-    new_template_text = template_text
-    for regex in models.VAR_USE_RES:
-        if action and action.has_html_text:
-            new_template_text = regex.sub(
-                _change_unescape_variable_name,
-                new_template_text)
-        else:
-            new_template_text = regex.sub(
-                _change_variable_name,
-                new_template_text)
-
-    # Step 2.2 Remove pre-and post white space from the {% if %} and
-    # {% endif %} conditions (to reduce white space when using non HTML
-    # content).
-    new_template_text = _clean_whitespace(new_template_text)
+    # Steps 1 and 2. Translate the variables in the text and parse it (only
+    # the first time the text is rendered)
+    template = _compile_template(
+        template_text,
+        bool(action and action.has_html_text))
 
     # Step 3. Apply the translation process to the context keys
-    new_context = {
-        _translate(key): str_val
-        for key, str_val in list(context_dict.items())
-    }
+    new_context = dict(zip(
+        _translate_keys(tuple(context_dict.keys())),
+        context_dict.values()))
 
     # If the number of elements in the two dictionaries is different, we have
     #  a case of collision in the translation. Need to stop immediately.
@@ -311,7 +380,12 @@ def render_action_template(
         ))
     new_context[VIZ_NUMBER_CONTEXT_VAR] = 0
 
+    if RENDER_CACHE_CONTEXT_VAR in new_context:
+        raise Exception(_('Name {0} is reserved.').format(
+            RENDER_CACHE_CONTEXT_VAR,
+        ))
+    new_context[RENDER_CACHE_CONTEXT_VAR] = (
+        {} if render_cache is None else render_cache)
+
     # Step 4. Return the rendering of the new elements
-    return Template(
-        _ONTASK_TEMPLATE_PRELUDE + new_template_text,
-    ).render(Context(new_context))
+    return template.render(Context(new_context))
@@ -106,57 +106,59 @@ class ActionRunProducerCanvasEmail(ActionRunProducerBase):
 
         # Send the emails using Canvas API
         to_emails = []
-        for msg_body, msg_subject, msg_to in action_evals:
-            # JSON object to send. Taken from method.conversations.create in
-            # https://canvas.instructure.com/doc/api/conversations.html
-            canvas_email_payload = {
-                'recipients[]': int(msg_to),
-                'subject': msg_subject,
-                'body': msg_body,
-                'force_new': True}
-
-            try:
-                # Send the email
-                canvas_ops.request_and_access(
-                    'send_email',
-                    oauth_info,
-                    user_token,
-                    endpoint_format=None,
-                    result_key=None,
-                    data=canvas_email_payload,
-                    verify=True)
-            except Exception as exc:
-                result_msg = gettext(
-                    'Unable to deliver message (code {0})').format(
-                    str(exc))
-            else:
-                result_msg = gettext('Message successfully sent')
-
-            if settings.ONTASK_TESTING:
-                # Print the JSON object sent to the server
-                LOGGER.info(
-                    'SEND JSON(%s): %s',
-                    target_url,
-                    json.dumps(canvas_email_payload))
-                result_msg = 'SENT TO LOGGER'
-                response_status = 'OK'
-            else:
-                response_status = 'ERROR'
-
-            # Log message sent
-            context['subject'] = canvas_email_payload['subject']
-            context['body'] = canvas_email_payload['body']
-            context['from_email'] = user.email
-            context['to_email'] = canvas_email_payload['recipients[]']
-            context['email_sent_datetime'] = str(
-                datetime.datetime.now(ZoneInfo(settings.TIME_ZONE)))
-            context['response_status'] = response_status
-            context['result_msg'] = result_msg
-            action.log(
-                user,
-                models.Log.ACTION_CANVAS_EMAIL_SENT,
-                **context)
-            to_emails.append(msg_to)
+        with models.Log.objects.buffered() as log_buffer:
+            for msg_body, msg_subject, msg_to in action_evals:
+                # JSON object to send. Taken from method.conversations.create
+                # in https://canvas.instructure.com/doc/api/conversations.html
+                canvas_email_payload = {
+                    'recipients[]': int(msg_to),
+                    'subject': msg_subject,
+                    'body': msg_body,
+                    'force_new': True}
+
+                try:
+                    # Send the email
+                    canvas_ops.request_and_access(
+                        'send_email',
+                        oauth_info,
+                        user_token,
+                        endpoint_format=None,
+                        result_key=None,
+                        data=canvas_email_payload,
+                        verify=True)
+                except Exception as exc:
+                    result_msg = gettext(
+                        'Unable to deliver message (code {0})').format(
+                        str(exc))
+                else:
+                    result_msg = gettext('Message successfully sent')
+
+                if settings.ONTASK_TESTING:
+                    # Print the JSON object sent to the server
+                    LOGGER.info(
+                        'SEND JSON(%s): %s',
+                        target_url,
+                        json.dumps(canvas_email_payload))
+                    result_msg = 'SENT TO LOGGER'
+                    response_status = 'OK'
+                else:
+                    response_status = 'ERROR'
+
+                # Log message sent
+                context['subject'] = canvas_email_payload['subject']
+                context['body'] = canvas_email_payload['body']
+                context['from_email'] = user.email
+                context['to_email'] = canvas_email_payload['recipients[]']
+                context['email_sent_datetime'] = str(
+                    datetime.datetime.now(ZoneInfo(settings.TIME_ZONE)))
+                context['response_status'] = response_status
+                context['result_msg'] = result_msg
+                action.log(
+                    user,
+                    models.Log.ACTION_CANVAS_EMAIL_SENT,
+                    log_buffer=log_buffer,
+                    **context)
+                to_emails.append(msg_to)
 
         action.last_executed_log = log_item
         action.save(update_fields=['last_executed_log'])
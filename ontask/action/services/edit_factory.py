@@ -54,6 +54,8 @@ class ActionEditProducerBase(generic.UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Row edits may have left the counts in the conditions stale
+        self.action.refresh_selected_row_counts()
         context.update({
             # Workflow elements
             'attribute_names': [
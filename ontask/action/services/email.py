@@ -1,8 +1,13 @@
 """Send Email Messages with the rendered content in the action."""
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
 import datetime
 from email.mime.text import MIMEText
-from time import sleep
-from typing import Dict, List, Optional, Union
+import itertools
+import smtplib
+import threading
+from time import monotonic, sleep
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from zoneinfo import ZoneInfo
 
 import html2text
@@ -13,13 +18,14 @@ from django.core.mail import EmailMessage, EmailMultiAlternatives, send_mail
 from django.template import Context, Template, TemplateSyntaxError
 from django.urls import reverse
 from django.utils.html import strip_tags
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import gettext, gettext_lazy as _
 
 from ontask import (
     get_incorrect_email, models, settings as ontask_settings,
     simplify_datetime_str)
 from ontask.action.evaluate.action import (
-    evaluate_action, evaluate_row_action_out, get_action_evaluation_context,
+    evaluate_row_action_out, get_action_evaluation_context,
+    iterate_action_evaluation,
 )
 from ontask.action.services.edit_factory import ActionOutEditProducerBase
 from ontask.action.services.run_factory import ActionRunProducerBase
@@ -28,6 +34,12 @@ from ontask.dataops import pandas, sql
 
 LOGGER = get_task_logger('celery_execution')
 
+# Number of messages created and delivered at a time if EMAIL_BURST is zero
+EMAIL_CHUNK_SIZE = 500
+
+# Seconds to wait before retrying a message (multiplied by the attempt)
+EMAIL_RETRY_DELAY = 1
+
 
 def _send_confirmation_message(
     user,
@@ -151,6 +163,9 @@ def _create_track_column(action: models.Action) -> str:
         'integer',
         0)
 
+    if action.workflow.search_index:
+        action.workflow.update_search_index()
+
     return track_col_name
 
 
@@ -218,27 +233,25 @@ def _create_single_message(
 def _create_messages(
     user,
     action: models.Action,
-    action_evals: List,
+    action_evals: Iterable,
     track_col_name: str,
     payload: Dict,
-) -> List[Union[EmailMessage, EmailMultiAlternatives]]:
+) -> Iterator[Tuple[Union[EmailMessage, EmailMultiAlternatives], Dict]]:
     """Create the email messages to send and the tracking ids.
 
+    The messages are created one at a time as they are requested.
+
     :param user: User that sends the message (encoded in the track-id)
     :param action: Action to process
-    :param action_evals: Action content already evaluated
+    :param action_evals: Action content evaluated (iterable)
     :param track_col_name: column name to track
     :param payload: Dictionary with the required fields
-    :return:
+    :return: Iterator over the pairs (message, context to log the event)
     """
-    # Context to log the events (one per email)
-    context = {'action': action.id}
-
     cc_email = _check_email_list(payload['cc_email'])
     bcc_email = _check_email_list(payload['bcc_email'])
 
     # Everything seemed to work to create the messages.
-    msgs = []
     column_to = action.workflow.columns.get(pk=payload['item_column']).name
     # for msg_body, msg_subject, msg_to in action_evals:
     for msg_body_sbj_to in action_evals:
@@ -274,54 +287,272 @@ def _create_messages(
             from_field,
             cc_email,
             bcc_email)
-        msgs.append(msg)
 
-        # Log the event
-        context['subject'] = msg.subject
-        context['body'] = msg.body
-        context['from_email'] = msg.from_email
-        context['to_email'] = msg.to[0]
-        context['email_sent_datetime'] = str(
-            datetime.datetime.now(ZoneInfo(settings.TIME_ZONE)))
+        # Context to log the event (once the message is delivered)
+        context = {
+            'action': action.id,
+            'subject': msg.subject,
+            'body': msg.body,
+            'from_email': msg.from_email,
+            'to_email': msg.to[0]}
         if track_str:
             context['track_id'] = track_str
-        action.log(user, models.Log.ACTION_EMAIL_SENT, **context)
 
-    return msgs
+        yield msg, context
+
+
+def _is_transient_failure(exc: Exception) -> bool:
+    """Check if the delivery of a message should be retried.
+
+    Transient failures are 4xx SMTP replies, a lost connection, and network
+    errors. Other SMTP errors (e.g. all recipients refused) are permanent.
+
+    :param exc: Exception raised when delivering the message
+    :return: Boolean stating if the failure is transient
+    """
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    return (
+        isinstance(exc, OSError)
+        and not isinstance(exc, smtplib.SMTPException))
+
+
+class _RateLimiter:
+    """Space the messages to deliver a maximum number per second."""
+
+    def __init__(self, rate: float):
+        """Store the interval between messages (zero if no limit)."""
+        self.interval = 1.0 / rate if rate else 0
+        self.next_time = monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait until the next message can be delivered."""
+        if not self.interval:
+            return
+
+        with self.lock:
+            now = monotonic()
+            slot = max(now, self.next_time)
+            self.next_time = slot + self.interval
+
+        if slot > now:
+            sleep(slot - now)
+
+
+class _EmailDeliveryPool:
+    """Deliver messages through a set of persistent SMTP connections.
+
+    Each thread in the pool keeps its own connection open until the pool is
+    closed. Messages are delivered individually, respecting the rate limit,
+    and transient failures (connection lost or 4xx SMTP replies) are retried.
+    """
+
+    def __init__(self, nconnections: int, rate: float, retries: int):
+        """Create the thread pool and the rate limiter."""
+        self.executor = ThreadPoolExecutor(max_workers=max(nconnections, 1))
+        self.limiter = _RateLimiter(rate)
+        self.retries = retries
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> '_EmailDeliveryPool':
+        """Use the pool in a with statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the threads and close the connections."""
+        self.executor.shutdown()
+        for connection in self.connections:
+            connection.close()
+
+    def _get_connection(self):
+        """Get the connection for the current thread (open a new one)."""
+        if (connection := getattr(self.local, 'connection', None)) is None:
+            connection = mail.get_connection()
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def _reset_connection(self):
+        """Discard the connection of the current thread."""
+        if (connection := getattr(self.local, 'connection', None)) is None:
+            return
+
+        self.local.connection = None
+        with self.lock:
+            self.connections.remove(connection)
+        with contextlib.suppress(Exception):
+            connection.close()
+
+    def _deliver(
+        self,
+        msg: Union[EmailMessage, EmailMultiAlternatives],
+    ) -> Tuple[Optional[str], bool]:
+        """Deliver a message through the connection of the current thread.
+
+        :param msg: Message to deliver
+        :return: Pair with None if the message was delivered (or the error
+        message), and a boolean stating if the failure is transient
+        """
+        self.limiter.wait()
+        try:
+            self._get_connection().send_messages([msg])
+        except Exception as exc:
+            return str(exc), _is_transient_failure(exc)
+
+        return None, False
+
+    def _send(
+        self,
+        msg: Union[EmailMessage, EmailMultiAlternatives],
+    ) -> Optional[str]:
+        """Deliver a message retrying if there is a transient failure.
+
+        :param msg: Message to deliver
+        :return: None if the message was delivered, or the error message
+        """
+        for attempt in range(self.retries + 1):
+            if attempt:
+                sleep(EMAIL_RETRY_DELAY * attempt)
+            error, transient = self._deliver(msg)
+            if not transient:
+                return error
+
+            self._reset_connection()
+            LOGGER.info(
+                'Transient failure delivering email to %s (%s)',
+                msg.to[0],
+                error)
+
+        return error
+
+    def send_messages(
+        self,
+        msgs: List[Union[EmailMessage, EmailMultiAlternatives]],
+    ) -> List[Optional[str]]:
+        """Deliver the messages using the connections in parallel.
+
+        :param msgs: List of messages to deliver
+        :return: List with the result of each message (None if delivered or
+        the error message)
+        """
+        return list(self.executor.map(self._send, msgs))
+
+
+def _get_delivery_rate() -> float:
+    """Get the maximum number of messages to deliver per second.
+
+    The rate is the lowest of EMAIL_RATE_LIMIT and EMAIL_BURST messages every
+    EMAIL_BURST_PAUSE seconds (zero if none of them is configured).
+
+    :return: Messages per second (zero if no limit)
+    """
+    rate = settings.EMAIL_RATE_LIMIT
+    if settings.EMAIL_BURST and settings.EMAIL_BURST_PAUSE:
+        burst_rate = settings.EMAIL_BURST / settings.EMAIL_BURST_PAUSE
+        rate = min(rate, burst_rate) if rate else burst_rate
+    return rate
+
+
+def _log_delivery_results(
+    msg_chunk: List[Tuple[Union[EmailMessage, EmailMultiAlternatives], Dict]],
+    results: List[Optional[str]],
+    user,
+    action: models.Action,
+    log_buffer: models.LogBuffer,
+) -> List[str]:
+    """Log the result of the delivery of each message.
+
+    :param msg_chunk: List of pairs (message, context to log the event)
+    :param results: Result of each message (None if delivered or the error)
+    :param user: User that sends the messages
+    :param action: Action being executed
+    :param log_buffer: Buffer to store the logs
+    :return: List with the recipients of the delivered messages
+    """
+    recipients = []
+    for (msg, context), error in zip(msg_chunk, results):
+        context['email_sent_datetime'] = str(
+            datetime.datetime.now(ZoneInfo(settings.TIME_ZONE)))
+        if error is None:
+            context['response_status'] = 'OK'
+            context['result_msg'] = gettext('Message successfully sent')
+            recipients.append(msg.to[0])
+        else:
+            context['response_status'] = 'ERROR'
+            context['result_msg'] = gettext(
+                'Unable to deliver message ({0})').format(error)
+        action.log(
+            user,
+            models.Log.ACTION_EMAIL_SENT,
+            log_buffer=log_buffer,
+            **context)
+
+    return recipients
 
 
 def _deliver_msg_burst(
-    msgs: List[Union[EmailMessage, EmailMultiAlternatives]],
-):
+    msgs: Iterable[Tuple[Union[EmailMessage, EmailMultiAlternatives], Dict]],
+    user,
+    action: models.Action,
+    log_item: Optional[models.Log] = None,
+) -> List[str]:
     """Deliver the messages in bursts.
 
-    :param msgs: List of either EmailMessage or EmailMultiAlternatives
-    :return: Nothing.
+    The messages are requested from the iterable in chunks as per the value of
+    EMAIL_BURST (or EMAIL_CHUNK_SIZE if no burst is configured), so that only
+    one chunk is in memory and the first one is delivered right away. Each
+    chunk is delivered through EMAIL_CONNECTIONS connections in parallel, and
+    the result of each message is logged. The messages are spaced to respect
+    both EMAIL_RATE_LIMIT and EMAIL_BURST messages every EMAIL_BURST_PAUSE
+    seconds.
+
+    :param msgs: Iterable of pairs (message, context to log the event)
+    :param user: User that sends the messages
+    :param action: Action being executed
+    :param log_item: Log object to store the progress (optional)
+    :return: List with the recipients of the delivered messages
     """
-    if not msgs:
-        # bypass trivial case, no list given
-        return
-
-    # Partition the list of emails into chunks as per the value of EMAIL_BURST
-    chunk_size = len(msgs)
-    wait_time = 0
-    if settings.EMAIL_BURST:
-        chunk_size = settings.EMAIL_BURST
-        wait_time = settings.EMAIL_BURST_PAUSE
-    msg_chunks = [
-        msgs[idx:idx + chunk_size]
-        for idx in range(0, len(msgs), chunk_size)
-    ]
-    for idx, msg_chunk in enumerate(msg_chunks):
-        # Mass mail!
-        mail.get_connection().send_messages(msg_chunk)
-
-        if idx != len(msg_chunks) - 1:
-            LOGGER.info(
-                'Email Burst (%s) reached. Waiting for %s secs',
-                str(len(msg_chunk)),
-                str(wait_time))
-            sleep(wait_time)
+    chunk_size = settings.EMAIL_BURST or EMAIL_CHUNK_SIZE
+
+    recipients = []
+    nerrors = 0
+    msg_iterator = iter(msgs)
+    msg_chunk = list(itertools.islice(msg_iterator, chunk_size))
+    with _EmailDeliveryPool(
+        settings.EMAIL_CONNECTIONS,
+        _get_delivery_rate(),
+        settings.EMAIL_RETRIES,
+    ) as delivery_pool, models.Log.objects.buffered() as log_buffer:
+        while msg_chunk:
+            # Mass mail!
+            results = delivery_pool.send_messages(
+                [msg for msg, __ in msg_chunk])
+
+            delivered = _log_delivery_results(
+                msg_chunk,
+                results,
+                user,
+                action,
+                log_buffer)
+            recipients += delivered
+            nerrors += len(msg_chunk) - len(delivered)
+
+            if log_item:
+                # Record the progress
+                log_item.payload['emails_sent'] = len(recipients)
+                log_item.payload['emails_failed'] = nerrors
+                log_item.save(update_fields=['payload'])
+
+            msg_chunk = list(itertools.islice(msg_iterator, chunk_size))
+
+    return recipients
 
 
 class ActionEditProducerEmail(ActionOutEditProducerBase):
@@ -359,8 +590,8 @@ class ActionRunProducerEmail(ActionRunProducerBase):
         given subject. The subject will be evaluated also with respect to the
         rows, attributes, and conditions.
 
-        The messages are sent in bursts with a pause in seconds as specified by
-        the configuration variables EMAIL_BURST  and EMAIL_BURST_PAUSE
+        The messages are sent at the rate specified by the configuration
+        variables EMAIL_RATE_LIMIT, EMAIL_BURST and EMAIL_BURST_PAUSE
 
         :param user: User object that executed the action
         :param workflow: Optional object
@@ -370,7 +601,7 @@ class ActionRunProducerEmail(ActionRunProducerBase):
         :return: Nothing
         """
         item_column = action.workflow.columns.get(pk=payload['item_column'])
-        action_evals = evaluate_action(
+        action_evals = iterate_action_evaluation(
             action,
             extra_string=payload['subject'],
             column_name=item_column.name,
@@ -383,25 +614,27 @@ class ActionRunProducerEmail(ActionRunProducerBase):
             log_item.payload['track_column'] = track_col_name
             log_item.save(update_fields=['payload'])
 
-        msgs = _create_messages(
+        # Messages are rendered, created, sent and logged one chunk at a time
+        recipients = _deliver_msg_burst(
+            _create_messages(
+                user,
+                action,
+                action_evals,
+                track_col_name,
+                payload),
             user,
             action,
-            action_evals,
-            track_col_name,
-            payload,
-        )
-
-        _deliver_msg_burst(msgs)
+            log_item)
 
         if payload['send_confirmation']:
             # Confirmation message requested
-            _send_confirmation_message(user, action, len(msgs))
+            _send_confirmation_message(user, action, len(recipients))
 
         action.last_executed_log = log_item
         action.save(update_fields=['last_executed_log'])
 
         # Update excluded items in payload
-        self._update_excluded_items(payload, [msg.to[0] for msg in msgs])
+        self._update_excluded_items(payload, recipients)
 
 
 class ActionEditProducerEmailReport(ActionOutEditProducerBase):
@@ -22,6 +22,7 @@ def _send_and_log_json(
     action: models.Action,
     json_obj: str,
     headers: Mapping,
+    log_buffer: Optional[models.LogBuffer] = None,
 ):
     """Send a JSON object to the action URL and LOG event."""
     if settings.EXECUTE_ACTION_JSON_TRANSFER:
@@ -46,6 +47,7 @@ def _send_and_log_json(
     action.log(
         user,
         models.Log.ACTION_JSON_SENT,
+        log_buffer=log_buffer,
         action=action.id,
         object=json.dumps(json_obj),
         status=status_val,
@@ -86,12 +88,14 @@ class ActionRunProducerJSON(ActionRunProducerBase):
 
         # Iterate over all json objects to create the strings and check for
         # correctness
-        for json_string, _ in action_evaluations:
-            _send_and_log_json(
-                user,
-                action,
-                json.loads(json_string),
-                headers)
+        with models.Log.objects.buffered() as log_buffer:
+            for json_string, _ in action_evaluations:
+                _send_and_log_json(
+                    user,
+                    action,
+                    json.loads(json_string),
+                    headers,
+                    log_buffer)
 
         action.last_executed_log = log_item
         action.save(update_fields=['last_executed_log'])
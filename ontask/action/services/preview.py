@@ -106,10 +106,7 @@ def create_row_preview_context(
     :return: context is modified to include the appropriate items
     """
     # Get the total number of items
-    if action.filter:
-        n_items = action.filter.selected_count
-    else:
-        n_items = action.workflow.nrows
+    n_items = action.get_rows_selected()
 
     # Set the correct values to the indeces
     prv, idx, nxt = _get_navigation_index(idx, n_items)
@@ -123,6 +123,8 @@ class ActionRunProducerBase(generic.FormView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Row edits may have left the counts in the conditions stale
+        self.action.refresh_selected_row_counts()
         context.update({
             'action': self.action,
             'num_msgs': self.action.get_rows_selected(),
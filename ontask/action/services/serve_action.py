@@ -15,6 +15,7 @@ from ontask.action.services.errors import (
     OnTaskActionSurveyDataNotFound, OnTaskActionSurveyNoTableData,
 )
 from ontask.dataops import sql
+from ontask.tasks.row_counts import mark_row_counts_stale
 
 
 def serve_action_out(
@@ -139,10 +140,8 @@ def update_row_values(
         filter_dict={where_field: where_value},
     )
 
-    # Recompute all the values of the conditions in each of the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for act in action.workflow.actions.all():
-        act.update_selected_row_counts()
+    # Only the conditions using the modified columns need to be recomputed
+    mark_row_counts_stale(action.workflow, keys)
 
     # Log the event and update its content in the action
     log_item = action.log(
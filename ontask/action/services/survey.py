@@ -121,6 +121,7 @@ def _create_initial_qs(
     filter_formula,
     columns,
     dt_page,
+    use_search_index: bool = False,
 ):
     """Obtain the iniital QuerySet to select the right page.
 
@@ -128,6 +129,7 @@ def _create_initial_qs(
     :param filter_formula:
     :param columns: Workflow columns
     :param dt_page: datatables paging information
+    :param use_search_index: Use the search index of the table
     :return: query set
     """
     # See if an order column has been given.
@@ -135,7 +137,7 @@ def _create_initial_qs(
     if dt_page.order_col is not None:
         order_col_name = columns[dt_page.order_col].name
 
-    # Get the query set (including the filter in the action)
+    # Get the query set (including the filter in the action) for the page
     qs = sql.search_table(
         table_name,
         dt_page.search_value,
@@ -143,6 +145,10 @@ def _create_initial_qs(
         filter_formula=filter_formula,
         order_col_name=order_col_name,
         order_asc=dt_page.order_dir == 'asc',
+        key_name=next(col.name for col in columns if col.is_key),
+        offset=dt_page.start,
+        limit=dt_page.length,
+        use_search_index=use_search_index,
     )
 
     return qs
@@ -151,24 +157,19 @@ def _create_initial_qs(
 def _create_table_qsdata(
     action_id: int,
     qs,
-    dt_page: DataTablesServerSidePaging,
     columns: List[models.Column],
     key_idx: int,
 ) -> List:
-    """Select the subset of the qs to be sent as qs data to the JSON request.
+    """Process the page of the qs to be sent as qs data to the JSON request.
 
     :param action_id: Action id being processed
-    :param qs: Query set from where to extract the data
-    :param dt_page: Object with DataTable parameters to process the page
+    :param qs: Query set with the rows in the page
     :param columns: List of column
     :param key_idx: Index of the key column
     :return: Query set to return to DataTable JavaScript
     """
     final_qs = []
-    item_count = 0
-    for row in qs[dt_page.start:dt_page.start + dt_page.length]:
-        item_count += 1
-
+    for row in qs:
         # Render the first element (the key) as the link to the page to update
         # the content.
         row = list(row)
@@ -181,10 +182,6 @@ def _create_table_qsdata(
         # Add the row for rendering
         final_qs.append(row)
 
-        if item_count == dt_page.length:
-            # We reached the number or requested elements, abandon loop
-            break
-
     return final_qs
 
 
@@ -206,15 +203,20 @@ def create_survey_table(
         action.get_filter_formula(),
         columns,
         dt_page,
+        use_search_index=workflow.search_index,
     )
 
-    filtered = len(query_set)
+    filtered = sql.search_table_count(
+        workflow.get_data_frame_table_name(),
+        dt_page.search_value,
+        columns_to_search=[col.name for col in columns],
+        filter_formula=action.get_filter_formula(),
+        use_search_index=workflow.search_index)
 
-    # Get the subset of the qs to show in the table
+    # Process the page of the qs to show in the table
     query_set = _create_table_qsdata(
         action.id,
         query_set,
-        dt_page,
         columns,
         next(idx for idx, col in enumerate(columns) if col.is_key),
     )
@@ -1,7 +1,7 @@
 """Methods to process the personalized zip action run request."""
 from datetime import datetime
-from io import BytesIO
-from typing import List, Optional, Tuple
+from io import RawIOBase
+from typing import Iterable, Iterator, List, Optional, Tuple
 import zipfile
 
 from django import http
@@ -9,7 +9,7 @@ from django.shortcuts import redirect, render
 
 from ontask import models
 from ontask.core import session_ops
-from ontask.action.evaluate.action import evaluate_action
+from ontask.action.evaluate.action import iterate_action_evaluation
 from ontask.action.services.run_factory import ActionRunProducerBase
 from ontask.dataops import sql
 
@@ -47,21 +47,42 @@ def _create_filename_template(
     return file_name_template
 
 
+class _ZipStream(RawIOBase):
+    """Unseekable file that accumulates the bytes written by ZipFile."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        """Return the bytes written since the previous call."""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
 def _create_eval_data_tuple(
     action: models.Action,
     item_column: models.Column,
     exclude_values: List,
     user_fname_column: Optional[models.Column],
-) -> List[Tuple[str, str, str]]:
-    """Evaluate text and create list of tuples [filename, part id, text].
+) -> Iterator[Tuple[str, str, str]]:
+    """Evaluate text and create tuples [filename, part id, text].
 
     Evaluate the conditions in the actions based on the given
-    item_column excluding the values in exclude_values. This returns a
-    list with tuples [action text, None, participant column value]. Process
-    that list to insert as second element of the tuple the corresponding
-    value in user_fname_column (if given).
+    item_column excluding the values in exclude_values. This produces
+    tuples [action text, participant column value]. Process them to insert
+    the corresponding value in user_fname_column (if given).
 
-    The final result is a list of triplets with:
+    The rows are evaluated one at a time, and the result is an iterator over
+    triplets with:
 
     - Filename
     - part id as extracted from the participation column
@@ -71,29 +92,58 @@ def _create_eval_data_tuple(
     :param item_column: The column used to iterate
     :param exclude_values: List of values to exclude from evaluation
     :param user_fname_column: Column to use for filename creation
-    :return: List[Tuple[text, text, text]]
+    :return: Iterator[Tuple[text, text, text]]
     """
-    # Obtain the personalised text
-    action_evals = evaluate_action(
-        action,
-        column_name=item_column.name,
-        exclude_values=exclude_values)
-
+    user_fname_data = {}
     if user_fname_column:
-        # Get the user_fname_column values
-        user_fname_data = [row[user_fname_column.name] for row in sql.get_rows(
+        # Get the user_fname_column values for each participant
+        user_fname_data = dict(sql.get_rows(
             action.workflow.get_data_frame_table_name(),
-            column_names=[user_fname_column.name],
-            filter_formula=None).fetchall()]
-    else:
-        # Array of empty strings to concatenate
-        user_fname_data = [''] * len(action_evals)
+            column_names=[item_column.name, user_fname_column.name],
+            filter_formula=action.get_filter_formula()).fetchall())
 
-    return [
-        (user_fname, part_id, _HTML_BODY.format(msg_body))
-        for (msg_body, part_id), user_fname in
-        zip(action_evals, user_fname_data)
-    ]
+    # Obtain the personalised text
+    for msg_body, part_id in iterate_action_evaluation(
+        action,
+        column_name=item_column.name,
+        exclude_values=exclude_values,
+    ):
+        yield (
+            user_fname_data.get(part_id, ''),
+            part_id,
+            _HTML_BODY.format(msg_body))
+
+
+def _create_zip_chunks(
+    files: Iterable[Tuple[str, str, str]],
+    file_name_template: str,
+    zip_for_moodle: bool,
+) -> Iterator[bytes]:
+    """Create the ZIP content producing the bytes after each file.
+
+    :param files: Iterator over the tuples [user_fname, part id, text]
+    :param file_name_template: Template to create the file names
+    :param zip_for_moodle: Boolean to process the participant ids for Moodle
+    :return: Iterator over the chunks of the ZIP content
+    """
+    zip_stream = _ZipStream()
+    with zipfile.ZipFile(zip_stream, 'w') as zip_file_obj:
+        for user_fname, part_id, msg_body in files:
+            if zip_for_moodle:
+                # If a zip for Moodle, field is Participant [number]. Take the
+                # number only
+                part_id = part_id.split()[1]
+
+            zip_file_obj.writestr(
+                file_name_template.format(
+                    user_fname=user_fname,
+                    part_id=part_id),
+                str(msg_body),
+            )
+            yield zip_stream.pop()
+
+    # Central directory
+    yield zip_stream.pop()
 
 
 def create_and_send_zip(
@@ -102,15 +152,18 @@ def create_and_send_zip(
     item_column: models.Column,
     user_fname_column: Optional[models.Column],
     payload: dict,
-) -> http.HttpResponse:
-    """Process the list of tuples in files and create the ZIP BytesIO object.
+) -> http.StreamingHttpResponse:
+    """Create the ZIP with the files and send it while it is being created.
+
+    The rows are evaluated and added to the ZIP while the response is
+    transmitted, so the archive is never stored in memory.
 
     :param request: request object while creating a zip (need it to flush it)
     :param action: Action being used for ZIP
     :param item_column: Column used to itemize the zip
     :param user_fname_column: Optional column to create file name
     :param payload: Dictionary with additional parameters to create the ZIP
-    :return: HttpResponse to send back with the ZIP download header
+    :return: StreamingHttpResponse to send back with the ZIP download header
     """
     files = _create_eval_data_tuple(
         action,
@@ -119,33 +172,19 @@ def create_and_send_zip(
         user_fname_column)
     file_name_template = _create_filename_template(payload, user_fname_column)
 
-    # Create the ZIP and return it for download
-    sbuf = BytesIO()
-    zip_file_obj = zipfile.ZipFile(sbuf, 'w')
-    for user_fname, part_id, msg_body in files:
-        if payload['zip_for_moodle']:
-            # If a zip for Moodle, field is Participant [number]. Take the
-            # number only
-            part_id = part_id.split()[1]
-
-        zip_file_obj.writestr(
-            file_name_template.format(user_fname=user_fname, part_id=part_id),
-            str(msg_body),
-        )
-    zip_file_obj.close()
-
     # Remove payload from session
     session_ops.flush_payload(request)
 
     suffix = datetime.now().strftime('%y%m%d_%H%M%S')
-    # Attach the compressed value to the response and send
-    compressed_content = sbuf.getvalue()
-    response = http.HttpResponse(compressed_content)
+    # Send the compressed content while it is created
+    response = http.StreamingHttpResponse(_create_zip_chunks(
+        files,
+        file_name_template,
+        payload['zip_for_moodle']))
     response['Content-Type'] = 'application/x-zip-compressed'
     response['Content-Transfer-Encoding'] = 'binary'
     response['Content-Disposition'] = (
         'attachment; filename="ontask_zip_action_{0}.zip"'.format(suffix))
-    response['Content-Length'] = str(len(compressed_content))
 
     return response
 
@@ -1,14 +1,24 @@
 """Test task logic functions."""
 import os
+import smtplib
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core import signing
+from django.core import mail, signing
+from django.core.cache import cache
+from django.core.mail.backends import locmem
 from django.shortcuts import reverse
+from django.test import override_settings
+from django_redis import get_redis_connection
 from rest_framework import status
 
-from ontask.action import services
+from ontask import models
+from ontask.action import evaluate, services
+from ontask.action.services import email as email_services
 from ontask.models import Workflow, Action
+from ontask.dataops import services as dataops_services, sql as dataops_sql
+from ontask.dataops.services import increase_track
 from ontask.tests import (
     SimpleEmailActionFixture, OnTaskTestCase, WrongEmailFixture,
     FilterCorrectEmailsFixture, user_info)
@@ -46,6 +56,9 @@ class EmailActionTracking(SimpleEmailActionFixture, OnTaskTestCase):
             for track in trck_tokens:
                 self.client.get(reverse('trck') + '?v=' + track)
 
+            # Process the requests accumulated
+            dataops_services.flush_track_hits()
+
             # Get the workflow and the data frame
             workflow = Workflow.objects.get(name=self.wflow_name)
             data_frame = pandas.load_table(
@@ -62,6 +75,42 @@ class EmailActionTracking(SimpleEmailActionFixture, OnTaskTestCase):
                             'EmailRead_1'].values[0]),
                     idx)
 
+        # One log per recipient and flush
+        self.assertEqual(
+            models.Log.objects.filter(
+                name=models.Log.ACTION_EMAIL_READ,
+                payload__reads=1).count(),
+            2 * len(trck_tokens))
+        self.assertFalse(
+            models.Log.objects.filter(
+                name=models.Log.ACTION_EMAIL_READ,
+                payload__has_key='EXCEPTION_MSG').exists())
+
+        # The hits are kept if their processing fails
+        self.client.get(reverse('trck') + '?v=' + trck_tokens[0])
+        with mock.patch(
+            'ontask.dataops.services.increase_track._group_track_hits',
+            side_effect=Exception('Processing failed'),
+        ):
+            with self.assertRaises(Exception):
+                dataops_services.flush_track_hits()
+        self.client.get(reverse('trck') + '?v=' + trck_tokens[0])
+        dataops_services.flush_track_hits()
+        dataops_services.flush_track_hits()
+
+        workflow = Workflow.objects.get(name=self.wflow_name)
+        data_frame = pandas.load_table(workflow.get_data_frame_table_name())
+        self.assertEqual(
+            int(data_frame.loc[
+                data_frame['email'] == 'student01@bogus.com',
+                'EmailRead_1'].values[0]),
+            4)
+
+        # Requests with an incorrect token are not stored
+        self.client.get(reverse('trck') + '?v=bogus_token')
+        self.assertFalse(get_redis_connection('default').exists(
+            cache.make_key(increase_track.TRACK_BUFFER_KEY)))
+
 
 class ActionImport(SimpleEmailActionFixture, OnTaskTestCase):
     """Test action import."""
@@ -137,3 +186,146 @@ class EmailActionChecksOnlySelectedEmails(
             'Action scheduled for execution' in str(resp.content))
         self.assertTrue(
             'You may check the status in log number' in str(resp.content))
+
+
+class ActionTemplateIsParsedOnce(OnTaskTestCase):
+    """Test that the same template text is parsed only once."""
+
+    def test(self):
+        text = 'Hi {{ first name }}{% if 1st cond %}, well done{% endif %}'
+        rows = [
+            ({'first name': 'Ana', '1st cond': True}, 'Hi Ana, well done'),
+            ({'first name': 'Bob', '1st cond': False}, 'Hi Bob')]
+
+        evaluate.template._compile_template.cache_clear()
+        for context, result in rows:
+            self.assertEqual(
+                evaluate.render_action_template(text, context),
+                result)
+
+        cache_info = evaluate.template._compile_template.cache_info()
+        self.assertEqual(cache_info.misses, 1)
+        self.assertEqual(cache_info.hits, len(rows) - 1)
+
+
+class ActionPopulationDataComputedOnce(
+    SimpleEmailActionFixture,
+    OnTaskTestCase,
+):
+    """Test that the report and visualization data are computed once."""
+
+    def test(self):
+        action = Action.objects.first()
+        action.set_text_content(
+            '<p>{% ot_insert_report "email" %}</p>'
+            + '<p>{% load vis_include %}{% visualization "age" %}</p>')
+        action.save()
+        nrows = action.get_rows_selected()
+        self.assertTrue(nrows > 1)
+
+        with mock.patch(
+            'ontask.templatetags.ontask_tags.sql.get_rows',
+            wraps=dataops_sql.get_rows,
+        ) as get_rows, mock.patch(
+            'ontask.visualizations.templatetags.vis_include.pandas.'
+            + 'get_subframe',
+            wraps=pandas.get_subframe,
+        ) as get_subframe:
+            result = evaluate.evaluate_action(action)
+
+        self.assertEqual(len(result), nrows)
+        self.assertEqual(get_rows.call_count, 1)
+        self.assertEqual(get_subframe.call_count, 1)
+
+        # Each row has the report and the histogram with its own marker
+        for text in result:
+            self.assertIn('<table', text[0])
+            self.assertIn('annotations', text[0])
+
+
+class ActionLogBuffer(SimpleEmailActionFixture, OnTaskTestCase):
+    """Test that the logs are stored in batches."""
+
+    def test(self):
+        action = Action.objects.first()
+        user = get_user_model().objects.get(email='instructor01@bogus.com')
+        nlogs = models.Log.objects.count()
+
+        with models.Log.objects.buffered(batch_size=2) as log_buffer:
+            for idx in range(3):
+                action.log(
+                    user,
+                    models.Log.ACTION_EMAIL_SENT,
+                    log_buffer=log_buffer,
+                    to_email='student0{0}@bogus.com'.format(idx))
+                self.assertEqual(
+                    models.Log.objects.count(),
+                    nlogs + 2 * ((idx + 1) // 2))
+
+        self.assertEqual(models.Log.objects.count(), nlogs + 3)
+        self.assertEqual(
+            models.Log.objects.filter(
+                name=models.Log.ACTION_EMAIL_SENT,
+                payload__to_email='student02@bogus.com').count(),
+            1)
+
+
+class FlakyEmailBackend(locmem.EmailBackend):
+    """Email backend failing the first delivery of each message."""
+
+    failed = set()
+
+    def send_messages(self, messages):
+        """Fail the first time a recipient is seen."""
+        for message in messages:
+            if message.to[0] not in self.failed:
+                self.failed.add(message.to[0])
+                raise smtplib.SMTPServerDisconnected('Connection lost')
+        return super().send_messages(messages)
+
+
+class EmailDeliveryPoolRetries(OnTaskTestCase):
+    """Test that the messages are retried after transient failures."""
+
+    @override_settings(
+        EMAIL_BACKEND='ontask.action.tests.test_logic.FlakyEmailBackend')
+    def test(self):
+        msgs = [
+            mail.EmailMessage(
+                'Subject',
+                'Body',
+                'instructor01@bogus.com',
+                ['student0{0}@bogus.com'.format(idx)])
+            for idx in range(1, 5)]
+
+        with mock.patch.object(email_services, 'EMAIL_RETRY_DELAY', 0):
+            with email_services._EmailDeliveryPool(2, 0, 1) as pool:
+                self.assertEqual(pool.send_messages(msgs), [None] * 4)
+
+            with email_services._EmailDeliveryPool(2, 0, 0) as pool:
+                msgs[0].to = ['student05@bogus.com']
+                self.assertEqual(
+                    pool.send_messages(msgs[:1]),
+                    ['Connection lost'])
+
+        self.assertEqual(len(mail.outbox), 4)
+
+
+class EmailDeliveryRate(OnTaskTestCase):
+    """Test the rate combining the limit and the email bursts."""
+
+    def test(self):
+        with override_settings(
+            EMAIL_RATE_LIMIT=0, EMAIL_BURST=0, EMAIL_BURST_PAUSE=0,
+        ):
+            self.assertEqual(email_services._get_delivery_rate(), 0)
+
+        with override_settings(
+            EMAIL_RATE_LIMIT=0, EMAIL_BURST=500, EMAIL_BURST_PAUSE=100,
+        ):
+            self.assertEqual(email_services._get_delivery_rate(), 5)
+
+        with override_settings(
+            EMAIL_RATE_LIMIT=2, EMAIL_BURST=500, EMAIL_BURST_PAUSE=100,
+        ):
+            self.assertEqual(email_services._get_delivery_rate(), 2)
@@ -79,6 +79,12 @@ class ActionViewRunEmailActionNoFilter(ActionViewRunBasic):
         self._verify_content()
         self.assertTrue(status.is_success(resp.status_code))
 
+        # The progress is recorded in the log
+        action.refresh_from_db()
+        self.assertEqual(
+            action.last_executed_log.payload['emails_sent'],
+            len(mail.outbox))
+
 
 class ActionViewRunEmailActionOverrideFrom(ActionViewRunBasic):
     """Test the view to run email action and override FROM."""
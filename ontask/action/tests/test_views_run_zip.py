@@ -1,4 +1,6 @@
 """Test views to run ZIP actions."""
+import io
+import zipfile
 
 from django.shortcuts import reverse
 from rest_framework import status
@@ -65,3 +67,11 @@ class ActionViewRunZIPExport(ActionViewZIPBasic):
                 'confirm_items': False})
         self.assertTrue(status.is_success(resp.status_code))
         self.assertEqual(resp['Content-Type'], 'application/x-zip-compressed')
+
+        # The ZIP is produced while it is sent and contains a file per row
+        zip_file_obj = zipfile.ZipFile(
+            io.BytesIO(b''.join(resp.streaming_content)))
+        self.assertIsNone(zip_file_obj.testzip())
+        self.assertEqual(
+            len(zip_file_obj.namelist()),
+            action.get_rows_selected())
@@ -57,6 +57,9 @@ class ColumnSerializer(serializers.ModelSerializer):
         column.position = workflow.ncols
         column.save(update_fields=['position'])
 
+        if workflow.search_index:
+            workflow.update_search_index()
+
         return column
 
     class Meta:
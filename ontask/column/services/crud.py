@@ -1,50 +1,30 @@
 """Functions to manipulate column CRUD ops."""
 import copy
-import random
 from typing import Any, List, Optional
 
-import pandas as pd
-from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from ontask import create_new_name, models
 from ontask.column.services import errors
 from ontask.dataops import pandas, sql
 
-_op_distrib = {
-    'sum': lambda operand: operand.sum(axis=1, skipna=False),
-    'prod': lambda operand: operand.prod(axis=1, skipna=False),
-    'max': lambda operand: operand.max(axis=1, skipna=False),
-    'min': lambda operand: operand.min(axis=1, skipna=False),
-    'mean': lambda operand: operand.mean(axis=1, skipna=False),
-    'median': lambda operand: operand.median(axis=1, skipna=False),
-    'std': lambda operand: operand.std(axis=1, skipna=False),
-    'all': lambda operand: operand.all(axis=1, skipna=False),
-    'any': lambda operand: operand.any(axis=1, skipna=False),
+# Data type of the result of the formula column operations. Those with None
+# are integer if all the operands are integer, and double otherwise.
+_op_result_type = {
+    'sum': None,
+    'prod': None,
+    'max': None,
+    'min': None,
+    'mean': 'double',
+    'median': 'double',
+    'std': 'double',
+    'all': 'boolean',
+    'any': 'boolean',
 }
 
-_ontask_type_to_pd_type = {
-    'string': 'object',
-    'integer': 'int64',
-    'double': 'float64',
-    'boolean': 'bool',
-    'datetime': 'datetime64[ns, {0}]'.format(settings.TIME_ZONE)}
-
-
-def _partition(list_in: List[Any], num: int) -> List[List[Any]]:
-    """Partitions the list in num lists.
-
-    Given a list and n, returns a list with n lists, and inside each of them a
-    set of elements from the shuffled list. All lists are of the same size
-
-    :param list_in: List of elements to partition
-    :param num: Number of partitions
-    :return: List of lists with shuffled elements partitioned
-    """
-    random.shuffle(list_in)
-    return [list_in[idx::num] for idx in range(num)]
-
 
 def add_column_to_workflow(
     user,
@@ -97,6 +77,9 @@ def add_column_to_workflow(
     workflow.set_query_builder_ops()
     workflow.save(update_fields=['ncols', 'query_builder_ops'])
 
+    if workflow.search_index:
+        workflow.update_search_index()
+
     if action_column_event:
         acc, __ = models.ActionColumnConditionTuple.objects.get_or_create(
             action=action,
@@ -115,6 +98,9 @@ def add_formula_column(
 ):
     """Add the formula column to the workflow.
 
+    The column is added to the table and its values are calculated in the
+    database, the rest of the columns are not modified.
+
     :param user: User making the request.
     :param workflow: Workflow to add the column.
     :param column: Column being added.
@@ -126,28 +112,30 @@ def add_formula_column(
     column.workflow = workflow
     column.is_key = False
 
+    # Populate the column type
+    column.data_type = _op_result_type[operation]
+    if column.data_type is None:
+        column.data_type = 'integer'
+        if any(col.data_type != 'integer' for col in selected_columns):
+            column.data_type = 'double'
+
     # Save the instance
     column.save()
 
-    # Update the data frame
-    df = pandas.load_table(workflow.get_data_frame_table_name())
-
-    # Add the column with the appropriate computation
-    cnames = [col.name for col in selected_columns]
-    df[column.name] = _op_distrib[operation](df[cnames])
-
-    # Populate the column type
-    column.data_type = pandas.datatype_names.get(
-        df[column.name].dtype.name)
-
     # Update the positions of the appropriate columns
     workflow.reposition_columns(workflow.ncols + 1, column.position)
     column.save()
     workflow.refresh_from_db()
 
-    # Store the df to DB
+    # Add the column with the appropriate computation
     try:
-        pandas.store_dataframe(df, workflow)
+        with transaction.atomic():
+            sql.add_formula_column_to_db(
+                workflow.get_data_frame_table_name(),
+                column.name,
+                column.data_type,
+                operation,
+                [col.name for col in selected_columns])
     except Exception as exc:
         raise errors.OnTaskColumnAddError(
             message=_('Unable to add column: {0}').format(str(exc)),
@@ -156,6 +144,10 @@ def add_formula_column(
     workflow.ncols = workflow.columns.count()
     workflow.set_query_builder_ops()
     workflow.save(update_fields=['ncols', 'query_builder_ops'])
+
+    if workflow.search_index:
+        workflow.update_search_index()
+
     column.log(user, models.Log.COLUMN_ADD_FORMULA)
 
 
@@ -166,47 +158,33 @@ def add_random_column(
 ):
     """Add the formula column to the workflow.
 
+    The categories of the column are assigned randomly to the rows (in
+    partitions of equal size) in the database, the rest of the columns are
+    not modified.
+
     :param user: User making the request.
     :param workflow: Workflow to add the column.
     :param column: Column being added.
     :return: Column is added to the workflow.
     """
-    # Empty new column
-    new_column = [None] * workflow.nrows
     categories = column.get_categories()
-    # Create the random partitions
-    partitions = _partition(
-        [idx for idx in range(workflow.nrows)],
-        len(categories))
-
-    # Assign values to partitions
-    for idx, indexes in enumerate(partitions):
-        for col_idx in indexes:
-            new_column[col_idx] = categories[idx]
-
-    # Load the data frame
-    data_frame = pandas.load_table(workflow.get_data_frame_table_name())
-
-    # Assign the new column to the data frame
-    data_frame[column.name] = pd.Series(
-        new_column,
-        dtype=_ontask_type_to_pd_type[column.data_type],
-        index=data_frame.index)
-
-    if (
-            column.data_type == 'datetime'
-            and data_frame[column.name].dt.tz is None
-    ):
-        data_frame[column.name] = data_frame[column.name].dt.tz_localize(
-            settings.TIME_ZONE)
+    if column.data_type == 'datetime':
+        categories = [
+            timezone.make_aware(cat) if timezone.is_naive(cat) else cat
+            for cat in categories]
 
     # Update the positions of the appropriate columns
     workflow.reposition_columns(workflow.ncols + 1, column.position)
     workflow.refresh_from_db()
 
-    # Store the df to DB
+    # Add the column and assign the values
     try:
-        pandas.store_dataframe(data_frame, workflow)
+        with transaction.atomic():
+            sql.add_random_column_to_db(
+                workflow.get_data_frame_table_name(),
+                column.name,
+                column.data_type,
+                categories)
     except Exception as exc:
         raise errors.OnTaskColumnAddError(
             message=_('Unable to add the column: {0}').format(str(exc)),
@@ -216,6 +194,9 @@ def add_random_column(
     workflow.set_query_builder_ops()
     workflow.save(update_fields=['ncols', 'query_builder_ops'])
 
+    if workflow.search_index:
+        workflow.update_search_index()
+
     # Log the event
     column.log(user, models.Log.COLUMN_ADD_RANDOM)
 
@@ -362,6 +343,9 @@ def clone_column(user, column: models.Column) -> models.Column:
         column.name,
         new_column.name)
 
+    if workflow.search_index:
+        workflow.update_search_index()
+
     new_column.log(user, models.Log.COLUMN_CLONE)
 
     return new_column
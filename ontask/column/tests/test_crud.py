@@ -1,8 +1,10 @@
 """Test the views for the column pages."""
 
+import numpy as np
 from rest_framework import status
 
 from ontask import models, tests
+from ontask.column import services
 from ontask.dataops import pandas
 
 
@@ -134,6 +136,40 @@ class ColumnCrudAddFormulaColumn(ColumnCrudBasic):
             df['FORMULA COLUMN'].equals(df['Q01'] + df['Q02']))
 
 
+class ColumnCrudAddFormulaColumnOperations(ColumnCrudBasic):
+    """Test the values of the formula columns computed in the database."""
+
+    def test(self):
+        selected_columns = list(self.workflow.columns.filter(
+            name__in=['Q01', 'Q02']).order_by('position'))
+        for operation in ['sum', 'prod', 'max', 'min', 'mean', 'median',
+                          'std']:
+            self.workflow.refresh_from_db()
+            services.add_formula_column(
+                self.user,
+                self.workflow,
+                models.Column(
+                    name=operation,
+                    position=self.workflow.ncols + 1),
+                operation,
+                selected_columns)
+
+        df = pandas.load_table(self.workflow.get_data_frame_table_name())
+        for operation in ['sum', 'prod', 'max', 'min', 'mean', 'median',
+                          'std']:
+            expected = getattr(df[['Q01', 'Q02']], operation)(
+                axis=1,
+                skipna=False)
+            self.assertTrue(np.allclose(
+                df[operation].astype(float),
+                expected.astype(float),
+                equal_nan=True))
+
+        self.assertEqual(
+            self.workflow.columns.get(name='mean').data_type,
+            'double')
+
+
 class ColumnCrudAddRandomColumn(ColumnCrudBasic):
     """Test adding a random column."""
 
@@ -1,4 +1,8 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 import datetime
+import hashlib
+import json
+import threading
 from time import sleep
 from typing import Tuple, Dict, Optional
 from zoneinfo import ZoneInfo
@@ -9,6 +13,8 @@ from django import http
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
+from django.db import connection
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
@@ -27,42 +33,95 @@ LOGGER = get_task_logger('celery_execution')
 # Dictionary with:
 #   - key: name to identify one API operation
 #   - (method, URL, correct status code)
-_canvas_api_map = {}
-if settings.CANVAS_INFO_DICT:
-    _canvas_api_map = {
-        'get_course_quizzes': (
-            requests.get,
-            '{0}/api/v1/courses/{1}/quizzes',
-            status.HTTP_200_OK),
-        'get_quiz_questions': (
-            requests.get,
-            '{0}/api/v1/courses/{1}/quizzes/{2}/questions',
-            status.HTTP_200_OK),
-        'get_quiz_statistics': (
-            requests.get,
-            '{0}/api/v1/courses/{1}/quizzes/{2}/statistics',
-            status.HTTP_200_OK),
-        'get_quiz_submissions': (
-            requests.get,
-            '{0}/api/v1/courses/{1}/quizzes/{2}/submissions',
-            status.HTTP_200_OK),
-        'get_course_enrolment': (
-            requests.get,
-            '{0}/api/v1/courses/{1}/enrollments'
-            '?type=StudentEnrollment&state={2}',
-            status.HTTP_200_OK),
-        'get_course_assignments': (
-            requests.get,
-            '{0}/api/v1/courses/{1}/assignments',
-            status.HTTP_200_OK),
-        'get_assignment_submissions': (
-            requests.get,
-            '{0}/api/v1/courses/{1}/assignments/{2}/submissions',
-            status.HTTP_200_OK),
-        'send_email': (
-            requests.post,
-            '{0}/api/v1/conversations',
-            status.HTTP_201_CREATED)}
+_canvas_api_map = {
+    'get_course_quizzes': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/quizzes',
+        status.HTTP_200_OK),
+    'get_quiz_questions': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/quizzes/{2}/questions',
+        status.HTTP_200_OK),
+    'get_quiz_statistics': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/quizzes/{2}/statistics',
+        status.HTTP_200_OK),
+    'get_quiz_submissions': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/quizzes/{2}/submissions',
+        status.HTTP_200_OK),
+    'get_course_enrolment': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/enrollments'
+        '?type=StudentEnrollment&state={2}',
+        status.HTTP_200_OK),
+    'get_course_assignments': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/assignments',
+        status.HTTP_200_OK),
+    'get_assignment_submissions': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/assignments/{2}/submissions',
+        status.HTTP_200_OK),
+    'get_course_submissions': (
+        requests.get,
+        '{0}/api/v1/courses/{1}/students/submissions',
+        status.HTTP_200_OK),
+    'send_email': (
+        requests.post,
+        '{0}/api/v1/conversations',
+        status.HTTP_201_CREATED)}
+
+# Seconds to wait when the rate limit quota is below the threshold, and when
+# the rate limit has been exceeded
+CANVAS_RATE_LIMIT_WAIT = 1
+CANVAS_RATE_LIMIT_EXCEEDED_WAIT = 60
+
+# Responses stored to repeat requests with If-None-Match (seconds to keep
+# them in the cache)
+CANVAS_RESPONSE_CACHE_KEY = 'ONTASK_CANVAS_RESPONSE_{0}'
+CANVAS_RESPONSE_CACHE_TIMEOUT = 7 * 24 * 3600
+
+# Only one thread refreshes the token at a time
+_token_refresh_lock = threading.Lock()
+
+
+class _CanvasRateLimit:
+    """Track the rate limit quota reported by each Canvas instance.
+
+    Canvas reports the remaining quota in the X-Rate-Limit-Remaining header
+    of every response. When it drops below CANVAS_RATE_LIMIT_THRESHOLD, the
+    requests are delayed to let the quota recover.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._remaining = {}
+
+    def update(self, domain: str, response):
+        """Store the quota reported in a response."""
+        try:
+            remaining = float(response.headers['X-Rate-Limit-Remaining'])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self._lock:
+            self._remaining[domain] = remaining
+
+    def wait(self, domain: str):
+        """Wait (if needed) before sending a request to the domain."""
+        with self._lock:
+            remaining = self._remaining.get(domain)
+
+        if (
+            remaining is not None
+            and remaining < settings.CANVAS_RATE_LIMIT_THRESHOLD
+        ):
+            LOGGER.info('Canvas rate limit quota low (%s)', remaining)
+            sleep(CANVAS_RATE_LIMIT_WAIT)
+
+
+_rate_limit = _CanvasRateLimit()
 
 
 def _get_authorization_header(token: str) -> dict:
@@ -87,7 +146,8 @@ def _request_refresh_and_retry(
     again.
 
     The method also checks if the Rate Limit Exceeded is returned, and if so,
-    it delays the execution of the query.
+    it delays the execution of the query. Requests are also delayed when the
+    rate limit quota reported by Canvas is low.
 
     :param oauth_info: Object with the oauth information
     :param user_token: OAuth user token object
@@ -96,6 +156,8 @@ def _request_refresh_and_retry(
     :param headers: Dictionary with the headers to use in the request
     :param kwargs: Other arguments passed to the request
     """
+    domain = oauth_info['domain_port']
+    _rate_limit.wait(domain)
     response = request_method(url, headers=headers, **kwargs)
 
     # Check if the token needs refreshing
@@ -103,26 +165,31 @@ def _request_refresh_and_retry(
         response.status_code == status.HTTP_401_UNAUTHORIZED
         and response.headers.get('WWW-Authenticate')
     ):
-        services.refresh_token(user_token, oauth_info)
+        auth_header = _get_authorization_header(user_token.access_token)
+        with _token_refresh_lock:
+            # Other thread may have refreshed the token already
+            if headers['Authorization'] == auth_header['Authorization']:
+                services.refresh_token(user_token, oauth_info)
         # Retry request with updated headers
-        response = request_method(
-            url,
-            headers=_get_authorization_header(user_token.access_token),
-            **kwargs)
+        headers = dict(
+            headers,
+            **_get_authorization_header(user_token.access_token))
+        response = request_method(url, headers=headers, **kwargs)
+
+    # Loop while the Rate Limit Exceeded is reached
+    while (
+        response.status_code == status.HTTP_403_FORBIDDEN
+        and 'Rate Limit Exceeded' in response.text
+    ):
+        sleep(CANVAS_RATE_LIMIT_EXCEEDED_WAIT)
+        response = request_method(url, headers=headers, **kwargs)
 
     if response.status_code == status.HTTP_403_FORBIDDEN:
         msg = gettext('Unable to refresh OAuth access token')
         LOGGER.error(msg)
         raise OnTaskException(msg)
 
-    # Loop while the Rate Limit Exceeded is reached
-    while (
-                response.status_code == status.HTTP_403_FORBIDDEN and
-                response.data == "403 Forbidden (Rate Limit Exceeded)"
-    ):
-        # Wait a minute
-        sleep(60)
-        response = request_method(url, headers, **kwargs)
+    _rate_limit.update(domain, response)
 
     return response
 
@@ -228,12 +295,100 @@ def verify_course_id(
     return result
 
 
+def _get_response_cache_key(
+        user_token: models.OAuthUserToken,
+        url: str,
+        params: Optional[dict]) -> str:
+    """Create the key to store the response of a request in the cache.
+
+    :param user_token: Token used in the request (responses are per user)
+    :param url: URL requested
+    :param params: Parameters added to the URL
+    :return: Cache key
+    """
+    return CANVAS_RESPONSE_CACHE_KEY.format(hashlib.sha256(json.dumps(
+        [user_token.id, url, params],
+        sort_keys=True).encode()).hexdigest())
+
+
+def _request_page(
+        canvas_operation_name: str,
+        oauth_info: dict,
+        user_token: models.OAuthUserToken,
+        url: str,
+        use_cache: bool,
+        **kwargs) -> Tuple:
+    """Request a page of results (reusing the one in the cache if possible).
+
+    :param canvas_operation_name: String with the API operation to execute
+    :param oauth_info: Dictionary with the required oauth information
+    :param user_token: Current token for authentication
+    :param url: URL of the page
+    :param use_cache: Store the page with an ETag in the cache and request it
+    again with If-None-Match (a 304 response reuses the stored page).
+    :param kwargs: Other additional parameters to include in the request.
+    :return: Pair with the JSON in the response and the link header
+    """
+    request_method, __, ok_status = _canvas_api_map[canvas_operation_name]
+    headers = _get_authorization_header(user_token.access_token)
+    cache_key = cached_page = None
+    if use_cache:
+        cache_key = _get_response_cache_key(
+            user_token,
+            url,
+            kwargs.get('params'))
+        if cached_page := cache.get(cache_key):
+            headers['If-None-Match'] = cached_page['etag']
+
+    response = _request_refresh_and_retry(
+        oauth_info,
+        user_token,
+        request_method,
+        url,
+        headers,
+        **kwargs)
+
+    if cached_page and response.status_code == status.HTTP_304_NOT_MODIFIED:
+        # Page has not changed since it was stored
+        return cached_page['content'], cached_page['link']
+
+    if response.status_code != ok_status:
+        raise OnTaskException(
+            _('Incorrect response from API call {0}').format(
+                canvas_operation_name))
+
+    new_data = response.json()
+    links = response.headers.get('link', None)
+    if cache_key and (etag := response.headers.get('ETag')):
+        cache.set(
+            cache_key,
+            {'etag': etag, 'content': new_data, 'link': links},
+            CANVAS_RESPONSE_CACHE_TIMEOUT)
+    return new_data, links
+
+
+def _get_next_page_url(links: Optional[str]) -> Optional[str]:
+    """Get the URL of the next page from the link header of a response.
+
+    :param links: Content of the link header
+    :return: URL of the next page or None if this is the last one
+    """
+    if not links:
+        return None
+
+    links = dict(
+        [(c, b[1:-1]) for b, c in
+         [a.split('; ') for a in links.split(',')]])
+    return links.get('rel="next"', None)
+
+
 def request_and_access(
         canvas_operation_name: str,
         oauth_info: dict,
         user_token: models.OAuthUserToken,
         endpoint_format: Optional[list] = None,
         result_key: str = None,
+        use_cache: bool = False,
         **kwargs):
     """Method to execute an API call and accumulate the
     result for multiple pages.
@@ -244,54 +399,106 @@ def request_and_access(
     :param endpoint_format: List of strings to format the endpoint URL
     :param result_key: Dictionary key to accumulate the result. If this is none,
     then it is assumed to be a list.
+    :param use_cache: Store the pages with an ETag in the cache and request
+    them again with If-None-Match (a 304 response reuses the stored page).
     :param kwargs: Other additional parameters to include in the request.
 
     :return: Accumulated JSON in the responses
     """
     if endpoint_format is None:
         endpoint_format = []
-    request_method, endpoint, ok_status = _canvas_api_map[canvas_operation_name]
+    request_method, endpoint, __ = _canvas_api_map[canvas_operation_name]
+
+    if request_method is requests.get:
+        # Request large pages (the following page URLs include the parameter)
+        kwargs['params'] = dict(
+            {'per_page': settings.CANVAS_API_PAGE_SIZE},
+            **kwargs.get('params', {}))
 
     # Result is a list or a dictionary if a result key is given
     result = {result_key: []} if result_key else []
 
     url = endpoint.format(oauth_info['domain_port'], *endpoint_format)
     # Execute multiple requests if there are pages of results
-    while True:
-        response = _request_refresh_and_retry(
-                oauth_info,
-                user_token,
-                request_method,
-                url,
-                _get_authorization_header(user_token.access_token),
-                **kwargs)
-
-        if response.status_code != ok_status:
-            raise OnTaskException(
-                _('Incorrect response from API call {0}').format())
+    while url:
+        new_data, links = _request_page(
+            canvas_operation_name,
+            oauth_info,
+            user_token,
+            url,
+            use_cache,
+            **kwargs)
+        kwargs.pop('params', None)
 
         if result_key:
-            result[result_key].extend(response.json()[result_key])
+            result[result_key].extend(new_data[result_key])
+        elif isinstance(new_data, list):
+            result.extend(new_data)
         else:
-            new_data = response.json()
-            if isinstance(new_data, list):
-                result.extend(new_data)
-            else:
-                result.append(new_data)
-
-        links = response.headers.get('link', None)
-        if not links:
-            # Whole information received
-            break
-
-        links = dict(
-            [(c, b[1:-1]) for b, c in
-             [a.split('; ') for a in links.split(',')]])
+            result.append(new_data)
 
         # Check the links headers to see if there are additional pages
-        if not (url := links.get('rel="next"', None)):
-            # There is no link to access the next page. Terminate loop
-            break
+        url = _get_next_page_url(links)
 
     # Return the accumulated result
     return result
+
+
+class CanvasRequestPool:
+    """Execute Canvas API calls concurrently.
+
+    Each call to request submits request_and_access to a thread pool (with
+    at most CANVAS_API_CONCURRENCY simultaneous requests) and returns a
+    future with its result. The pages of each call are requested in order.
+    """
+
+    def __init__(
+        self,
+        oauth_info: dict,
+        user_token: models.OAuthUserToken,
+        max_workers: Optional[int] = None,
+    ):
+        """Create the pool.
+
+        :param oauth_info: Dictionary with the required oauth information
+        :param user_token: Current token for authentication
+        :param max_workers: Maximum number of simultaneous requests
+        """
+        self.oauth_info = oauth_info
+        self.user_token = user_token
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.CANVAS_API_CONCURRENCY)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+    def _request_and_access(self, *args, **kwargs):
+        """Execute request_and_access and release the DB connection."""
+        try:
+            return request_and_access(*args, **kwargs)
+        finally:
+            # A token refresh may have opened a connection in this thread
+            connection.close()
+
+    def request(
+        self,
+        canvas_operation_name: str,
+        endpoint_format: Optional[list] = None,
+        result_key: str = None,
+        **kwargs,
+    ) -> Future:
+        """Submit an API call (same parameters as request_and_access).
+
+        :return: Future with the accumulated JSON in the responses
+        """
+        return self.executor.submit(
+            self._request_and_access,
+            canvas_operation_name,
+            self.oauth_info,
+            self.user_token,
+            endpoint_format,
+            result_key,
+            **kwargs)
@@ -1,6 +1,7 @@
 """Basic views to render error."""
 from django import http
 from django.contrib.auth.decorators import login_required
+from django.core import signing
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.views import generic
@@ -8,12 +9,11 @@ from django.views.decorators.clickjacking import xframe_options_exempt
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
-from ontask import models
-from ontask.tasks.execute import execute_operation
 from ontask.core.decorators import ajax_required
 from ontask.core.permissions import UserIsInstructor, is_admin, is_instructor
 from ontask.core.services import ontask_handler404
 from ontask.core import session_ops
+from ontask.dataops.services import register_track_hit
 from ontask.django_auth_lti.decorators import lti_role_required
 from ontask.workflow.views import WorkflowIndexView
 
@@ -64,10 +64,19 @@ class TrackView(generic.View):
     http_method_names = ['get']
 
     def get(self, request, *args, **kwargs) -> http.HttpResponse:
-        # Push the tracking to the asynchronous queue
-        execute_operation.delay(
-            operation_type=models.Log.WORKFLOW_INCREASE_TRACK_COUNT,
-            payload={'method': request.method, 'get_dict': request.GET})
+        track_token = request.GET.get('v')
+        if not track_token:
+            return http.HttpResponse(status=200)
+
+        # Discard the requests without a valid token so that they are not
+        # stored in the tracking buffer
+        try:
+            signing.loads(track_token)
+        except signing.BadSignature:
+            return http.HttpResponse(status=200)
+
+        # Accumulate the request (processed periodically in bulk)
+        register_track_hit(track_token)
 
         return http.HttpResponse(status=200)
 
@@ -1,5 +1,7 @@
 """Module to evaluate formulas in OnTask."""
 from ontask.dataops.formula.evaluation import (
-    evaluate, get_variables, has_variable, rename_variable, is_empty
+    compile_formula, evaluate, exclude_null_values, get_compiled_formula,
+    get_variables, has_variable, invalidate_compiled_formula, is_empty,
+    rename_variable,
 )
 from ontask.dataops.formula.operands import EVAL_EXP, EVAL_SQL, EVAL_TXT
@@ -10,13 +10,21 @@ for execution.
 
 - Text rendering: Render a formula to a readable format.
 """
+import collections
 import itertools
-from typing import Dict, List, Optional, Tuple, Union
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
 
 from psycopg2 import sql
 
 from ontask.dataops.formula import operands
 
+# Maximum number of compiled formulas kept in the cache
+COMPILED_FORMULA_CACHE_SIZE = 512
+
+_compiled_formulas = collections.OrderedDict()
+_compiled_formulas_lock = threading.Lock()
+
 
 def evaluate(
     node,
@@ -92,6 +100,103 @@ def evaluate(
     return result_txt
 
 
+def compile_formula(node) -> Callable[[Optional[Dict]], bool]:
+    """Translate a formula into a function performing its EVAL_EXP evaluation.
+
+    The formula is traversed only once, and the resulting function evaluates
+    the formula for a dictionary of var/values without interpreting the JSON
+    structure again. The result is identical to evaluate(node, EVAL_EXP, ...).
+
+    :param node: JSON node representing the expression
+    :return: Function receiving the dictionary (name, value) of variables
+    """
+    if 'condition' not in node:
+        # Terminal case.
+        return operands.compile_operand(node)
+
+    sub_clauses = [
+        compile_formula(sub_formula) for sub_formula in node['rules']]
+    combine = all if node['condition'] == 'AND' else any
+    negate = node.get('not') is True
+
+    def evaluate_composite(given_variables: Optional[Dict]) -> bool:
+        # All sub-clauses are evaluated (as in evaluate) to raise the same
+        # exceptions when a variable is missing.
+        result_bool = combine([
+            sub_clause(given_variables) for sub_clause in sub_clauses])
+        return (not result_bool) if negate else result_bool
+
+    return evaluate_composite
+
+
+def get_compiled_formula(
+    formula_id: Hashable,
+    version: Hashable,
+    node,
+) -> Callable[[Optional[Dict]], bool]:
+    """Get the compiled version of a formula from the cache (or compile it).
+
+    :param formula_id: Key identifying the formula (e.g. condition id)
+    :param version: Value that changes when the formula changes (e.g.
+    modification time)
+    :param node: JSON node representing the expression
+    :return: Function receiving the dictionary (name, value) of variables
+    """
+    with _compiled_formulas_lock:
+        cached = _compiled_formulas.get(formula_id)
+        if cached is not None and cached[0] == version:
+            _compiled_formulas.move_to_end(formula_id)
+            return cached[1]
+
+    compiled = compile_formula(node)
+
+    with _compiled_formulas_lock:
+        _compiled_formulas[formula_id] = (version, compiled)
+        _compiled_formulas.move_to_end(formula_id)
+        while len(_compiled_formulas) > COMPILED_FORMULA_CACHE_SIZE:
+            _compiled_formulas.popitem(last=False)
+
+    return compiled
+
+
+def invalidate_compiled_formula(formula_id: Hashable):
+    """Remove the compiled version of a formula from the cache.
+
+    :param formula_id: Key identifying the formula (e.g. condition id)
+    :return: Nothing
+    """
+    with _compiled_formulas_lock:
+        _compiled_formulas.pop(formula_id, None)
+
+
+def exclude_null_values(node: Dict) -> Dict:
+    """Copy a formula making false the operands with an empty (null) value.
+
+    The SQL translation of the operators in operands.SQL_NULL_OPERATORS is
+    true for the rows with a null value, whereas their Python evaluation
+    (EVAL_EXP) is false. These operands are combined with "is not null", so
+    the SQL translation of the result has the same value as the Python
+    evaluation of the original formula (every operand is TRUE or FALSE, so
+    the negations are also equivalent).
+
+    :param node: Formula to process
+    :return: New formula (the given one is not modified)
+    """
+    if 'condition' in node:
+        return dict(
+            node,
+            rules=[exclude_null_values(sub_f) for sub_f in node['rules']])
+
+    if node['operator'] not in operands.SQL_NULL_OPERATORS:
+        return node
+
+    return {
+        'condition': 'AND',
+        'not': False,
+        'rules': [node, dict(node, operator='is_not_null', value=None)],
+        'valid': True}
+
+
 def is_empty(node: Optional[Dict]) -> bool:
     """Detect if a formula is empty"""
 
@@ -1,5 +1,6 @@
 """Functions to evaluate the operands in OnTask conditions and filters."""
-from typing import Any, Dict, Tuple, Union
+import functools
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 from django.utils.dateparse import parse_datetime
 from django.utils.translation import gettext
@@ -13,6 +14,15 @@ EVAL_EXP = 0
 EVAL_SQL = 1
 EVAL_TXT = 2
 
+# Operators whose SQL translation is true for a null value (their Python
+# evaluation is false)
+SQL_NULL_OPERATORS = {
+    'not_equal',
+    'not_begins_with',
+    'not_contains',
+    'not_ends_with',
+    'is_empty'}
+
 GET_CONSTANT = {
     'integer': lambda operand: int(operand),
     'double': lambda operand: float(operand),
@@ -667,3 +677,107 @@ def not_between(
         str(node['value'][0]),
         str(node['value'][1]),
     )
+
+
+# Python predicates (value, constant) used by the compiled (EVAL_EXP)
+# version of the operators. Operators requiring a numeric type are stored
+# separately so that the type check is done once at compile time.
+_EXP_PREDICATES = {
+    'equal': lambda value, constant: value == constant,
+    'not_equal': lambda value, constant: value != constant,
+    'begins_with': lambda value, constant: value.startswith(constant),
+    'not_begins_with': lambda value, constant: not value.startswith(constant),
+    'contains': lambda value, constant: value.find(constant) != -1,
+    'not_contains': lambda value, constant: value.find(constant) == -1,
+    'ends_with': lambda value, constant: value.endswith(constant),
+    'not_ends_with': lambda value, constant: not value.endswith(constant),
+    'is_empty': lambda value, constant: value == '',
+    'is_not_empty': lambda value, constant: value != '',
+}
+
+_EXP_NUMERIC_PREDICATES = {
+    'less': lambda value, constant: value < constant,
+    'less_or_equal': lambda value, constant: value <= constant,
+    'greater': lambda value, constant: value > constant,
+    'greater_or_equal': lambda value, constant: value >= constant,
+    'between': lambda value, constant: constant[0] <= value <= constant[1],
+    'not_between': lambda value, constant: not (
+        constant[0] <= value <= constant[1]),
+}
+
+
+# Python predicates (value) for the operators checking the null values
+_EXP_NULL_PREDICATES = {
+    'is_null': value_is_null,
+    'is_not_null': lambda value: not value_is_null(value),
+}
+
+
+def _get_range_constant(node) -> Tuple:
+    """Parse the two values in a node with the between operators.
+
+    :param node: Terminal node in the formula
+    :return: Pair with the lower and upper values
+    """
+    return (
+        GET_CONSTANT[node['type']](node['value'][0]),
+        GET_CONSTANT[node['type']](node['value'][1]))
+
+
+# Functions to parse the constant in the node (the rest of the operators use
+# the value of the node with its type)
+_EXP_CONSTANTS = {
+    'between': _get_range_constant,
+    'not_between': _get_range_constant,
+    'is_empty': lambda node: None,
+    'is_not_empty': lambda node: None,
+}
+
+
+def _get_exp_predicate(node) -> Optional[Callable[[Any, Any], bool]]:
+    """Get the python predicate for the operator in the node.
+
+    :param node: Terminal node in the formula
+    :return: Predicate or None if the operator is unknown or the type of the
+    node is not allowed with the operator
+    """
+    if (predicate := _EXP_PREDICATES.get(node['operator'])) is not None:
+        return predicate
+
+    if node['type'] not in ('integer', 'double', 'datetime'):
+        return None
+
+    return _EXP_NUMERIC_PREDICATES.get(node['operator'])
+
+
+def compile_operand(node) -> Callable[[Optional[Dict]], bool]:
+    """Translate a terminal node into a function evaluating it (EVAL_EXP).
+
+    The constant in the node is parsed only once, and the returned function
+    only needs to fetch the variable value and apply the predicate. Its
+    result is identical to calling the operator with EVAL_EXP.
+
+    :param node: Terminal node in the formula
+    :return: Function receiving the dictionary of var/values
+    """
+    operator = node['operator']
+
+    if (null_predicate := _EXP_NULL_PREDICATES.get(operator)) is not None:
+        return lambda given_variables: null_predicate(
+            get_value(node, given_variables))
+
+    if (predicate := _get_exp_predicate(node)) is None:
+        # Unknown operator or type not allowed, use the operator itself
+        # to obtain the same behavior (or exception)
+        return functools.partial(globals()[operator], node, EVAL_EXP)
+
+    if (get_constant := _EXP_CONSTANTS.get(operator)) is not None:
+        constant = get_constant(node)
+    else:
+        constant = GET_CONSTANT.get(node['type'])(node['value'])
+
+    def evaluate_operand(given_variables: Optional[Dict]) -> bool:
+        varvalue = get_value(node, given_variables)
+        return (not value_is_null(varvalue)) and predicate(varvalue, constant)
+
+    return evaluate_operand
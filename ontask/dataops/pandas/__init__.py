@@ -4,14 +4,15 @@ from ontask.dataops.pandas.columns import (
     has_unique_column, is_unique_series,
 )
 from ontask.dataops.pandas.database import (
-    create_db_engine, destroy_db_engine, is_table_in_db, load_table,
-    set_engine, store_table, verify_data_frame,
+    create_db_engine, destroy_db_engine, get_engine, get_engine_pool_status,
+    is_table_in_db, load_table, set_engine, store_table, verify_data_frame,
 )
 from ontask.dataops.pandas.dataframe import (
-    add_column_to_df, get_subframe, rename_column,
-    store_dataframe, store_temporary_dataframe, store_workflow_table,
+    add_column_to_df, get_dataframe_column_errors, get_subframe,
+    rename_column, store_dataframe, store_dataframe_columns,
+    store_temporary_dataframe, store_workflow_table,
 )
 from ontask.dataops.pandas.datatypes import datatype_names
 from ontask.dataops.pandas.merge import (
-    perform_dataframe_upload_merge, validate_merge_parameters,
-    perform_dataframe_set_or_update)
+    perform_dataframe_upload_merge, perform_table_upload_merge,
+    validate_merge_parameters, perform_dataframe_set_or_update)
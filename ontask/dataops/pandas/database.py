@@ -1,5 +1,7 @@
 """Functions to manipulate Pandas DataFrames and related operations."""
-from typing import Dict, List, Mapping, Optional
+import os
+import tempfile
+from typing import Dict, Iterable, List, Mapping, Optional
 from sqlalchemy.engine.url import URL
 
 import pandas as pd
@@ -8,10 +10,14 @@ from django.conf import settings
 from django.core.cache import cache
 from django.db import connection
 from django.utils.translation import gettext as _
+from psycopg2 import sql as psycopg2_sql
 
 from ontask import LOGGER, OnTaskSharedState, OnTaskDataFrameNoKey
 from ontask.dataops import pandas, sql
 
+# Bytes of CSV content kept in memory by COPY before moving it to a file
+COPY_SPOOL_SIZE = 16 * 1024 * 1024
+
 # Translation between OnTask data types and SQLAlchemy
 ONTASK_TO_SQLALCHEMY = {
     'string': sqlalchemy.UnicodeText(),
@@ -23,7 +29,7 @@ ONTASK_TO_SQLALCHEMY = {
 
 
 def set_engine() -> None:
-    """Create a persistent SQLAlchemy connection to the DB."""
+    """Create a persistent, pooled SQLAlchemy connection to the DB."""
     if getattr(OnTaskSharedState, 'engine', None):
         return
 
@@ -33,7 +39,44 @@ def set_engine() -> None:
         password=settings.DATABASES['default'].get('PASSWORD'),
         host=settings.DATABASES['default'].get('HOST'),
         port=settings.DATABASES['default'].get('PORT'),
-        database=settings.DATABASES['default'].get('NAME'))
+        database=settings.DATABASES['default'].get('NAME'),
+        pool_size=settings.DATAOPS_ENGINE_POOL_SIZE,
+        max_overflow=settings.DATAOPS_ENGINE_MAX_OVERFLOW,
+        pool_pre_ping=settings.DATAOPS_ENGINE_POOL_PRE_PING,
+        pool_recycle=settings.DATAOPS_ENGINE_POOL_RECYCLE)
+    OnTaskSharedState.engine_pid = os.getpid()
+
+
+def get_engine():
+    """Get the process-wide SQLAlchemy engine (create it if needed).
+
+    If the process was forked after the engine was created (Celery prefork
+    workers, gunicorn with preload), the inherited pool is discarded without
+    closing the connections that belong to the parent process.
+
+    :return: The shared engine
+    """
+    set_engine()
+
+    if OnTaskSharedState.engine_pid != os.getpid():
+        OnTaskSharedState.engine.dispose(close=False)
+        OnTaskSharedState.engine_pid = os.getpid()
+
+    return OnTaskSharedState.engine
+
+
+def get_engine_pool_status() -> Dict[str, int]:
+    """Get the usage metrics of the shared engine connection pool.
+
+    :return: Dictionary with the pool size, and the number of connections
+    checked in, checked out, and in overflow.
+    """
+    pool = get_engine().pool
+    return {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow()}
 
 
 def create_db_engine(
@@ -43,7 +86,8 @@ def create_db_engine(
         host: str = None,
         port: int = None,
         database: str = None,
-        query: dict = None
+        query: dict = None,
+        **pool_options,
 ):
     """Create SQLAlchemy DB Engine to connect Pandas <-> DB.
 
@@ -58,6 +102,8 @@ def create_db_engine(
     :param port: Port for the connection
     :param database: database name
     :param query: A dictionary with additional parameters for the connection
+    :param pool_options: Additional parameters to configure the connection
+      pool (pool_size, max_overflow, pool_pre_ping, pool_recycle, etc.)
 
     :return: the engine
 
@@ -81,7 +127,8 @@ def create_db_engine(
         client_encoding=str('utf8'),
         echo=False,
         paramstyle='format',
-        connect_args={'connect_timeout': 300})
+        connect_args={'connect_timeout': 300},
+        **pool_options)
 
 
 def destroy_db_engine(db_engine=None):
@@ -115,13 +162,7 @@ def load_table(
     if settings.DEBUG:
         LOGGER.debug('Loading table %s', table_name)
 
-    engine = create_db_engine(
-        drivername='postgresql+psycopg2',
-        username=settings.DATABASES['default']['USER'],
-        password=settings.DATABASES['default']['PASSWORD'],
-        host=settings.DATABASES['default']['HOST'],
-        port=settings.DATABASES['default']['PORT'],
-        database=settings.DATABASES['default']['NAME'])
+    engine = get_engine()
 
     if columns or filter_exp:
         # A list of columns or a filter exp is given
@@ -145,15 +186,90 @@ def load_table(
         except Exception as exc:
             LOGGER.error('Error ' + str(exc))
 
-    engine.dispose()
-
     return data_frame
 
 
+def _to_csv_field(value, is_integer: bool = False) -> str:
+    """Translate a value into a field for COPY in CSV format.
+
+    NULL values are written as empty unquoted fields, and any other value is
+    quoted so that empty strings are not confused with NULL. Integral floats
+    stored in integer columns (e.g. integer columns with NaN, which pandas
+    stores as float64) are written without decimals, as COPY does not cast
+    them.
+
+    :param value: Value provided by DataFrame.to_sql (None for nulls)
+    :param is_integer: The value is stored in an integer column
+    :return: String with the CSV field
+    """
+    if value is None:
+        return ''
+
+    if is_integer and isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_from_stdin(
+    table,
+    sqlalchemy_connection,
+    keys: List[str],
+    data_iter: Iterable,
+):
+    """Insert the rows in a table using COPY ... FROM STDIN.
+
+    Insertion method for DataFrame.to_sql. The table has already been created
+    by pandas (with the requested column types), so this function only
+    replaces the INSERT statements by a single COPY in CSV format. The CSV
+    content is kept in memory up to COPY_SPOOL_SIZE bytes, and in a
+    temporary file beyond that size.
+
+    :param table: pandas SQLTable object
+    :param sqlalchemy_connection: SQLAlchemy connection
+    :param keys: List of column names
+    :param data_iter: Iterable with the rows to insert
+    :return: Nothing. Rows are inserted in the DB
+    """
+    integer_keys = [
+        isinstance(table.table.columns[key].type, sqlalchemy.Integer)
+        for key in keys]
+
+    csv_buffer = tempfile.SpooledTemporaryFile(
+        max_size=COPY_SPOOL_SIZE,
+        mode='w+',
+        encoding='utf-8')
+    for row in data_iter:
+        csv_buffer.write(','.join(
+            _to_csv_field(value, is_integer)
+            for value, is_integer in zip(row, integer_keys)))
+        csv_buffer.write('\n')
+    csv_buffer.seek(0)
+
+    if table.schema:
+        table_identifier = psycopg2_sql.Identifier(table.schema, table.name)
+    else:
+        table_identifier = psycopg2_sql.Identifier(table.name)
+
+    dbapi_connection = sqlalchemy_connection.connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            psycopg2_sql.SQL(
+                'COPY {0} ({1}) FROM STDIN WITH (FORMAT csv)',
+            ).format(
+                table_identifier,
+                psycopg2_sql.SQL(', ').join([
+                    psycopg2_sql.Identifier(key) for key in keys]),
+            ).as_string(cursor),
+            csv_buffer)
+    csv_buffer.close()
+
+
 def store_table(
     data_frame: pd.DataFrame,
     table_name: str,
     dict_type: Optional[Mapping] = None,
+    bulk_copy: bool = True,
 ):
     """Store a data frame in the DB.
 
@@ -173,10 +289,14 @@ def store_table(
     - sqlalchemy.BigInteger()
     - sqlalchemy.UnicodeText()
 
+    The rows are stored with COPY ... FROM STDIN if the DB is PostgreSQL
+    (and bulk_copy is True), or with regular INSERT statements otherwise.
+
     :param data_frame: The data frame to store
     :param table_name: The name of the table in the DB
     :param dict_type: dictionary with (column_name, data type) to force the
     storage of certain data types
+    :param bulk_copy: Use COPY to insert the rows (if supported by the DB)
     :return: Nothing. Side effect in the DB
     """
     # Check the length of the column names
@@ -188,30 +308,31 @@ def store_table(
     if dict_type is None:
         dict_type = {}
 
-    engine = create_db_engine(
-        drivername='postgresql+psycopg2',
-        username=settings.DATABASES['default']['USER'],
-        password=settings.DATABASES['default']['PASSWORD'],
-        host=settings.DATABASES['default']['HOST'],
-        port=settings.DATABASES['default']['PORT'],
-        database=settings.DATABASES['default']['NAME'])
+    engine = get_engine()
 
     try:
         with cache.lock(table_name):
             with engine.begin() as sqlalchemy_connection:
+                insert_method = None
+                if (
+                    bulk_copy
+                    and sqlalchemy_connection.dialect.name == 'postgresql'
+                ):
+                    insert_method = _copy_from_stdin
+
                 # We overwrite the content and do not create an index
                 data_frame.to_sql(
                     table_name,
                     sqlalchemy_connection,
                     if_exists='replace',
                     index=False,
+                    method=insert_method,
                     dtype={
                         key: ONTASK_TO_SQLALCHEMY[type_value]
                         for key, type_value in dict_type.items()})
     except Exception as exc:
         LOGGER.error('Error: ' + str(exc))
 
-    engine.dispose()
 
 def verify_data_frame(data_frame: pd.DataFrame):
     """Verify consistency properties in a DF.
@@ -1,26 +1,24 @@
 """Operations to manipulate dataframes."""
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 import numpy as np
 import pandas as pd
 from django.conf import settings
+from django.db import transaction
 from django.utils.translation import gettext, gettext_lazy as _
 
 from ontask.dataops import formula, pandas, sql
 
 
-def _verify_dataframe_columns(
-    workflow,
+def get_dataframe_column_errors(
+    columns: Iterable,
     data_frame: pd.DataFrame,
-):
-    """Verify that the df columns are compatible with those in the wflow.
+) -> List[str]:
+    """Check that the data frame values are compatible with the columns.
 
-    This function is crucial to make sure the information stored in the
-    workflow and the one in the dataframe is consistent. It is assumed that
-    the data frame given as parameter contains a superset of the columns
-    already present in the workflow. The function traverses those columns in
-    the data frame that are already included in the workflow and checks the
-    following conditions:
+    The checks are vectorized (one operation per column instead of one per
+    cell) and all the problems are reported. For each column the following
+    conditions are checked:
 
     1) The value of is_key is preserved. If not, the offending column should
     have reached this stage with is_key equal to False
@@ -40,6 +38,123 @@ def _verify_dataframe_columns(
 
     3) If the WF column has categories, the values in the DF should be
     compatible.
+
+    :param columns: Workflow columns (all of them must be in the data frame)
+    :param data_frame: Data frame to check
+    :return: List of error messages (empty if the data frame is correct)
+    """
+    errors = []
+    for col in columns:
+        series = data_frame[col.name]
+        df_col_type = pandas.datatype_names.get(series.dtype.name)
+        errors += [
+            error for error in [
+                _get_key_error(col, series),
+                _get_type_error(col, series, df_col_type),
+                _get_category_error(col, series, df_col_type)]
+            if error]
+
+    return errors
+
+
+def _get_key_error(col, series: pd.Series) -> Optional[str]:
+    """Check condition 1 in get_dataframe_column_errors.
+
+    :param col: Workflow column
+    :param series: Values of the column in the data frame
+    :return: Error message or None if the key property is preserved
+    """
+    # If the column is marked as a key column, it should maintain this
+    # property
+    if col.is_key and not (series.is_unique and not series.hasnans):
+        return gettext(
+            'Column {0} looses its "key" property through this merge.'
+            + ' Either remove this property from the column or '
+            + 'remove the rows that cause this problem in the new '
+            + 'dataset').format(col.name)
+
+    return None
+
+
+def _get_type_error(
+    col,
+    series: pd.Series,
+    df_col_type: Optional[str],
+) -> Optional[str]:
+    """Check condition 2 in get_dataframe_column_errors.
+
+    :param col: Workflow column
+    :param series: Values of the column in the data frame
+    :param df_col_type: OnTask type of the values in the data frame
+    :return: Error message or None if the data types are compatible
+    """
+    if col.data_type == 'boolean' and df_col_type == 'string':
+        # 2.1: A WF boolean with must be DF string with True/False/None
+        if pd.api.types.infer_dtype(series, skipna=True) != 'boolean':
+            return gettext(
+                'New values in column {0} are not of type {1}',
+            ).format(col.name, col.data_type)
+    elif col.data_type == 'integer':
+        # 2.2 WF Numeric column must be DF integer or double
+        if df_col_type not in ('integer', 'double'):
+            return gettext(
+                'New values in column {0} are not of type number',
+            ).format(col.name)
+    elif df_col_type != col.data_type:
+        # 2.3 Any other type change is incorrect
+        return gettext(
+            'New values in column {0} are not of type {1}',
+        ).format(col.name, col.data_type)
+
+    return None
+
+
+def _get_category_error(
+    col,
+    series: pd.Series,
+    df_col_type: Optional[str],
+) -> Optional[str]:
+    """Check condition 3 in get_dataframe_column_errors.
+
+    :param col: Workflow column
+    :param series: Values of the column in the data frame
+    :param df_col_type: OnTask type of the values in the data frame
+    :return: Error message or None if the values are in the categories
+    """
+    # If there are categories, the new values (other than the empty ones)
+    # should be compatible with them.
+    if not col.categories:
+        return None
+
+    categories = col.get_categories()
+    if df_col_type == 'datetime':
+        values = pd.to_datetime(series.dropna(), utc=True)
+        wrong_values = values[~values.isin(
+            pd.to_datetime(categories, utc=True))]
+    else:
+        wrong_values = series[~series.isin(categories)].dropna()
+        wrong_values = wrong_values[wrong_values.astype(bool)]
+    if wrong_values.empty:
+        return None
+
+    return gettext(
+        'New values in column {0} are not in categories {1}',
+    ).format(col.name, ', '.join([str(cat) for cat in col.categories]))
+
+
+def _verify_dataframe_columns(
+    workflow,
+    data_frame: pd.DataFrame,
+):
+    """Verify that the df columns are compatible with those in the wflow.
+
+    This function is crucial to make sure the information stored in the
+    workflow and the one in the dataframe is consistent. It is assumed that
+    the data frame given as parameter contains a superset of the columns
+    already present in the workflow. The columns in the data frame that are
+    already included in the workflow are checked with
+    get_dataframe_column_errors, and all the problems detected are reported
+    in the exception.
     """
     df_column_names = list(data_frame.columns)
     wf_column_names = [col.name for col in workflow.columns.all()]
@@ -49,59 +164,9 @@ def _verify_dataframe_columns(
         # DF
         assert not (set(wf_column_names) - set(df_column_names))
 
-    # Loop over the columns in the Workflow to refresh the is_key value. There
-    # may be values that have been added to the column, so this field needs to
-    # be reassessed
-    for col in workflow.columns.all():
-        # Condition 1: If the column is marked as a key column, it should
-        # maintain this property
-        if col.is_key and not pandas.is_unique_series(data_frame[col.name]):
-            raise Exception(gettext(
-                'Column {0} looses its "key" property through this merge.'
-                + ' Either remove this property from the column or '
-                + 'remove the rows that cause this problem in the new '
-                + 'dataset').format(col.name))
-
-        # Get the pandas data type
-        df_col_type = pandas.datatype_names.get(
-            data_frame[col.name].dtype.name)
-
-        # Condition 2: Review potential data type changes
-        if col.data_type == 'boolean' and df_col_type == 'string':
-            # 2.1: A WF boolean with must be DF string with True/False/None
-            column_data_types = {
-                type(row_value)
-                for row_value in data_frame[col.name]
-                # Remove the NoneType and Float
-                if not isinstance(row_value, float) and row_value is not None
-            }
-            if len(column_data_types) != 1 or column_data_types.pop() != bool:
-                raise Exception(gettext(
-                    'New values in column {0} are not of type {1}',
-                ).format(col.name, col.data_type))
-        elif (
-            col.data_type == 'integer' and df_col_type != 'integer'
-            and df_col_type != 'double'
-        ):
-            # 2.2 WF Numeric column must be DF integer or double
-            raise Exception(gettext(
-                'New values in column {0} are not of type number',
-            ).format(col.name))
-        elif col.data_type != 'integer' and df_col_type != col.data_type:
-            # 2.3 Any other type change is incorrect
-            raise Exception(gettext(
-                'New values in column {0} are not of type {1}',
-            ).format(col.name, col.data_type))
-
-        # Condition 3: If there are categories, the new values should be
-        # compatible with them.
-        if col.categories and not all(
-            row_val in col.get_categories() for row_val in data_frame[col.name]
-            if row_val and not pd.isnull(row_val)
-        ):
-            raise Exception(gettext(
-                'New values in column {0} are not in categories {1}',
-            ).format(col.name, ', '.join(col.categories)))
+    errors = get_dataframe_column_errors(workflow.columns.all(), data_frame)
+    if errors:
+        raise Exception('. '.join(errors))
 
 
 def store_temporary_dataframe(
@@ -164,6 +229,125 @@ def store_dataframe(
             'keep_key_column': is_key})
 
 
+def _is_column_compatible(col, data_type: str, is_unique: bool) -> bool:
+    """Check if the new values can be stored in an existing column.
+
+    :param col: Existing workflow column
+    :param data_type: OnTask type of the new values
+    :param is_unique: The new values are unique
+    :return: False if the column has categories, looses the key property or
+    the type changes (other than between integer and double)
+    """
+    if col.categories or (col.is_key and not is_unique):
+        return False
+
+    return col.data_type == data_type or (
+        col.data_type in ('integer', 'double')
+        and data_type in ('integer', 'double'))
+
+
+def store_dataframe_columns(
+    workflow,
+    data_frame: pd.DataFrame,
+    key_name: str,
+) -> bool:
+    """Store some columns of a data frame in the workflow table.
+
+    The data frame has the key column of the workflow and a set of new or
+    existing columns. It is stored in the upload table, the new columns are
+    added to the workflow table, and all the values are written with a
+    single UPDATE matching the rows by the key (null values do not modify
+    the existing ones, as in DataFrame.update). The rest of the columns in
+    the workflow table are not read or written.
+
+    :param workflow: Workflow with the table to update
+    :param data_frame: Data frame with the key and the columns to store
+    :param key_name: Key column (in the workflow and the data frame)
+    :return: False if the values are not compatible with the existing
+    columns (type change other than integer to double, categories or loss of
+    the key property) and nothing was stored, True otherwise.
+    """
+    column_names = [cname for cname in data_frame.columns if cname != key_name]
+    column_unique = dict(zip(
+        data_frame.columns,
+        pandas.are_unique_columns(data_frame)))
+
+    upload_table = workflow.get_upload_table_name()
+    pandas.store_table(data_frame, upload_table)
+    column_types = sql.get_df_column_types(upload_table)
+
+    current_columns = {
+        col.name: col
+        for col in workflow.columns.filter(name__in=column_names)}
+    if not all(
+        _is_column_compatible(
+            col,
+            column_types[col.name],
+            column_unique[col.name])
+        for col in current_columns.values()
+    ):
+        # Verification and storage requires the full data frame
+        sql.delete_table(upload_table)
+        return False
+
+    table_name = workflow.get_data_frame_table_name()
+    new_names = [
+        cname for cname in column_names if cname not in current_columns]
+    with transaction.atomic():
+        # The new columns have the same type as in the upload table (for
+        # example, datetimes keep their time zone)
+        sql.add_columns_from_table(
+            table_name,
+            upload_table,
+            new_names,
+            new_names)
+        for col in current_columns.values():
+            if (
+                col.data_type == 'integer'
+                and column_types[col.name] == 'double'
+            ):
+                sql.db_change_column_type(table_name, col.name, 'double')
+                col.data_type = 'double'
+                col.save(update_fields=['data_type'])
+        workflow.add_columns([
+            (cname, column_types[cname], column_unique[cname])
+            for cname in new_names])
+
+        sql.update_table_from(
+            table_name,
+            upload_table,
+            key_name,
+            key_name,
+            column_names)
+
+    sql.delete_table(upload_table)
+    workflow.increase_table_version()
+
+    workflow.set_query_builder_ops()
+    workflow.save(update_fields=['query_builder_ops'])
+    if workflow.search_index:
+        workflow.update_search_index()
+
+    return True
+
+
+def _complete_update_info(update_info: Dict):
+    """Check the information to store a table and complete if needed.
+
+    :param update_info: Dictionary with the fields (see store_workflow_table)
+    :return: Nothing. Dictionary is updated, anomalies raised as Exceptions
+    """
+    mandatory = ['initial_column_names', 'column_types', 'keep_key_column']
+    if not all(update_info.get(field) for field in mandatory):
+        raise Exception(_('Internal error while processing database.'))
+    if not update_info.get('rename_column_names'):
+        update_info['rename_column_names'] = update_info[
+            'initial_column_names']
+    if not update_info.get('columns_to_upload'):
+        update_info['columns_to_upload'] = [True] * len(update_info[
+            'initial_column_names'])
+
+
 def store_workflow_table(
     workflow,
     update_info: Optional[Dict] = None,
@@ -183,6 +367,8 @@ def store_workflow_table(
 
     Step 5: Update workflow fields and update
 
+    Step 6: Create the search index (if needed)
+
     :param workflow: Workflow object being manipulated.
     :param update_info: Dictionary with the following fields:
         - initial_column_names: list of column names detected in read phase.
@@ -193,19 +379,7 @@ def store_workflow_table(
         The first field is mandatory. They have default values if not provided.
     :return: Nothing. Anomalies are raised as Exceptions
     """
-    # Check information on update_info and complete if needed
-    if not update_info.get('initial_column_names'):
-        raise Exception(_('Internal error while processing database.'))
-    if not update_info.get('rename_column_names'):
-        update_info['rename_column_names'] = update_info[
-            'initial_column_names']
-    if not update_info.get('column_types'):
-        raise Exception(_('Internal error while processing database.'))
-    if not update_info.get('keep_key_column'):
-        raise Exception(_('Internal error while processing database.'))
-    if not update_info.get('columns_to_upload'):
-        update_info['columns_to_upload'] = [True] * len(update_info[
-            'initial_column_names'])
+    _complete_update_info(update_info)
 
     db_table = workflow.get_upload_table_name()
     new_columns = []
@@ -255,12 +429,17 @@ def store_workflow_table(
     if workflow.has_data_frame:
         sql.delete_table(workflow.get_data_frame_table_name())
     sql.rename_table(db_table, workflow.get_data_frame_table_name())
+    workflow.increase_table_version()
 
     # Step 5: Update workflow fields and save
     workflow.nrows = sql.get_num_rows(workflow.get_data_frame_table_name())
     workflow.set_query_builder_ops()
     workflow.save(update_fields=['nrows', 'query_builder_ops'])
 
+    # Step 6: The new table has no indices
+    if workflow.search_index:
+        workflow.update_search_index()
+
 
 def add_column_to_df(
     data_frame: pd.DataFrame,
@@ -322,7 +501,7 @@ def rename_column(
                 view.filter.formula,
                 old_name,
                 new_name)
-            view.filter.save(update_fields=['_formula'])
+            view.filter.save(update_fields=['_formula', 'modified'])
 
 
 def get_subframe(
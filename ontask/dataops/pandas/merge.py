@@ -1,11 +1,12 @@
 """Functions to do data frame merging."""
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+from django.db import transaction
 from django.utils.translation import gettext as _
 import pandas as pd
 
 from ontask import OnTaskException, LOGGER
-from ontask.dataops import pandas
+from ontask.dataops import pandas, sql
 
 
 def _perform_non_overlapping_column_merge(
@@ -208,6 +209,23 @@ def validate_merge_parameters(
     return None
 
 
+def _load_key_columns(workflow, key_names: List[str]) -> pd.DataFrame:
+    """Load the given columns of the workflow table (if they exist).
+
+    :param workflow: Workflow with the table
+    :param key_names: Names of the columns to load
+    :return: Data frame with the existing columns (empty if none of them)
+    """
+    column_names = [
+        cname for cname in workflow.get_column_names() if cname in key_names]
+    if not column_names:
+        return pd.DataFrame()
+
+    return pandas.load_table(
+        workflow.get_data_frame_table_name(),
+        columns=column_names)
+
+
 def perform_dataframe_set_or_update(
         workflow,
         src_df: pd.DataFrame,
@@ -244,8 +262,11 @@ def perform_dataframe_set_or_update(
             log_item.save(update_fields=['payload'])
         return
 
-    # At this point, the operation is a Merge operation
-    dst_df = pandas.load_table(workflow.get_data_frame_table_name())
+    # At this point, the operation is a Merge operation. Only the key
+    # columns of the existing table are needed to validate the parameters.
+    dst_df = _load_key_columns(
+        workflow,
+        [src_selected_key, dst_selected_key])
     if dst_df is None:
         raise OnTaskException(
             _('Unexpected empty dataframe in update operation.'))
@@ -266,8 +287,10 @@ def perform_dataframe_set_or_update(
         'rename_column_names': list(src_df.columns),
         'columns_to_upload': [True] * len(list(src_df.columns))}
     try:
-        perform_dataframe_upload_merge(workflow, dst_df, src_df, merge_info)
+        pandas.store_table(src_df, workflow.get_upload_table_name())
+        perform_table_upload_merge(workflow, merge_info)
     except Exception as exc:
+        sql.delete_table(workflow.get_upload_table_name())
         msg = _('Unable to perform merge operation')
         LOGGER.error(msg + ': ' + str(exc))
         raise OnTaskException(msg + ': ' + str(exc))
@@ -278,6 +301,314 @@ def perform_dataframe_set_or_update(
     return
 
 
+def _is_compatible_type(dst_type: str, src_type: str) -> bool:
+    """Check if the values of a column can be stored in another.
+
+    :param dst_type: OnTask type of the existing column
+    :param src_type: OnTask type of the new values
+    :return: True if the types are equal or both numeric
+    """
+    return dst_type == src_type or (
+        dst_type in ('integer', 'double')
+        and src_type in ('integer', 'double'))
+
+
+def _get_sql_merge_source_names(merge_info: Dict) -> Dict[str, str]:
+    """Get the names of the uploaded columns.
+
+    :param merge_info: Dictionary with merge options (see
+    perform_dataframe_upload_merge)
+    :return: Dictionary name in the workflow -> name in the upload table
+    """
+    return {
+        new_name: old_name
+        for old_name, new_name, to_upload in zip(
+            merge_info['initial_column_names'],
+            merge_info['rename_column_names'],
+            merge_info['columns_to_upload'])
+        if to_upload}
+
+
+def _is_sql_merge_possible(
+    merge_info: Dict,
+    src_names: Dict[str, str],
+    src_types: Dict[str, str],
+    current_columns: Dict,
+) -> bool:
+    """Check if the merge can be executed in the database.
+
+    :param merge_info: Dictionary with merge options (see
+    perform_dataframe_upload_merge)
+    :param src_names: Uploaded columns (name in the workflow -> name in the
+    upload table)
+    :param src_types: Types of the columns in the upload table
+    :param current_columns: Existing columns (name -> Column) with the key or
+    included in the upload
+    :return: False if rows are inserted with different key columns, or the
+    values are not compatible with the existing columns or categories
+    """
+    src_key = merge_info['src_selected_key']
+    dst_key = merge_info['dst_selected_key']
+    if (
+        src_key not in src_names
+        or (
+            src_key != dst_key
+            and merge_info['how_merge'] in ('outer', 'right'))
+        or dst_key not in current_columns
+    ):
+        return False
+
+    compatible = [
+        _is_compatible_type(
+            current_columns[dst_key].data_type,
+            src_types[src_names[src_key]])]
+    compatible += [
+        not col.categories and _is_compatible_type(
+            col.data_type,
+            src_types[src_names[cname]])
+        for cname, col in current_columns.items() if cname in src_names]
+    return all(compatible)
+
+
+def _alter_sql_merge_columns(
+    table_name: str,
+    upload_table: str,
+    src_names: Dict[str, str],
+    src_types: Dict[str, str],
+    current_columns: Dict,
+    new_names: List[str],
+):
+    """Add the new columns and change the type of the integer columns.
+
+    :param table_name: Table of the workflow
+    :param upload_table: Table with the uploaded data
+    :param src_names: Uploaded columns (name in the workflow -> name in the
+    upload table)
+    :param src_types: Types of the columns in the upload table
+    :param current_columns: Existing columns (name -> Column) with the key or
+    included in the upload
+    :param new_names: Names of the columns to add
+    :return: Nothing. Table and columns are modified
+    """
+    sql.add_columns_from_table(
+        table_name,
+        upload_table,
+        new_names,
+        [src_names[cname] for cname in new_names])
+    for cname, col in current_columns.items():
+        if (
+            cname in src_names
+            and col.data_type == 'integer'
+            and src_types[src_names[cname]] == 'double'
+        ):
+            sql.db_change_column_type(table_name, cname, 'double')
+            col.data_type = 'double'
+            col.save(update_fields=['data_type'])
+
+
+def _merge_sql_rows(
+    merge_info: Dict,
+    table_name: str,
+    upload_table: str,
+    src_names: Dict[str, str],
+):
+    """Delete, update and insert the rows as required by the merge.
+
+    :param merge_info: Dictionary with merge options (see
+    perform_dataframe_upload_merge)
+    :param table_name: Table of the workflow
+    :param upload_table: Table with the uploaded data
+    :param src_names: Uploaded columns (name in the workflow -> name in the
+    upload table)
+    :return: Nothing. Rows are modified in the table
+    """
+    how_merge = merge_info['how_merge']
+    src_key = merge_info['src_selected_key']
+    dst_key = merge_info['dst_selected_key']
+
+    if how_merge in ('inner', 'right'):
+        sql.delete_unmatched_rows(
+            table_name,
+            upload_table,
+            dst_key,
+            src_names[src_key])
+
+    update_names = [
+        cname for cname in src_names
+        if cname != dst_key or src_key != dst_key]
+    if update_names:
+        sql.update_table_from(
+            table_name,
+            upload_table,
+            dst_key,
+            src_names[src_key],
+            update_names,
+            [src_names[cname] for cname in update_names])
+
+    if how_merge in ('outer', 'right'):
+        sql.insert_unmatched_rows(
+            table_name,
+            upload_table,
+            dst_key,
+            src_names[src_key],
+            list(src_names),
+            list(src_names.values()))
+
+
+def _check_sql_merge_keys(workflow, table_name: str, dst_key: str) -> int:
+    """Check that the merged table has rows and preserves the key columns.
+
+    :param workflow: Workflow with the table
+    :param table_name: Table of the workflow
+    :param dst_key: Key column used in the merge
+    :return: Number of rows in the table, or Exception with the anomaly
+    """
+    # If the merge produced a table with no rows, flag it as an error to
+    # prevent loosing data when there is a mistake in the key column
+    nrows = sql.get_num_rows(table_name)
+    if nrows == 0:
+        raise OnTaskException(_(
+            'Merge operation produced a result with no rows'))
+
+    # The key columns must preserve their property
+    key_names = list(workflow.columns.filter(
+        is_key=True,
+    ).values_list('name', flat=True))
+    for cname in key_names:
+        if not sql.is_column_unique(table_name, cname):
+            raise OnTaskException(_(
+                'Column {0} looses its "key" property through this merge.'
+                + ' Either remove this property from the column or '
+                + 'remove the rows that cause this problem in the new '
+                + 'dataset').format(cname))
+    if not key_names and not sql.is_column_unique(table_name, dst_key):
+        raise OnTaskException(_(
+            'Merge operation produced a result without any key columns. '
+            + 'Review the key columns in the data to upload.'))
+
+    return nrows
+
+
+def _perform_sql_merge(workflow, merge_info: Dict) -> bool:
+    """Merge the upload table with the workflow table in the database.
+
+    The four merge variants are executed as set-based queries in a single
+    transaction:
+
+    - ALTER TABLE ADD COLUMN for the new columns and change the type of
+      the integer columns receiving double values
+
+    - inner and right: DELETE the rows without a match in the upload table
+
+    - UPDATE ... FROM the matching rows (NULL values do not overwrite, as in
+      DataFrame.update)
+
+    - outer and right: INSERT ... SELECT the rows in the upload table
+      without a match
+
+    The existing columns not included in the upload are never read or
+    written.
+
+    :param workflow: Workflow with the table and the upload table
+    :param merge_info: Dictionary with merge options (see
+    perform_dataframe_upload_merge)
+    :return: False if the merge requires the data frames (values not
+    compatible with the existing columns, categories, or rows inserted with
+    different key columns) and nothing was modified, True otherwise.
+    """
+    table_name = workflow.get_data_frame_table_name()
+    upload_table = workflow.get_upload_table_name()
+
+    src_names = _get_sql_merge_source_names(merge_info)
+    src_types = sql.get_df_column_types(upload_table)
+    current_columns = {
+        col.name: col
+        for col in workflow.columns.filter(
+            name__in=[merge_info['dst_selected_key'], *src_names])}
+    if not _is_sql_merge_possible(
+        merge_info,
+        src_names,
+        src_types,
+        current_columns,
+    ):
+        return False
+
+    # If no keep_key_column value is given, keep those that are unique
+    if 'keep_key_column' not in merge_info:
+        merge_info['keep_key_column'] = [
+            sql.is_column_unique(upload_table, cname)
+            for cname in merge_info['initial_column_names']]
+    keep_key = dict(zip(
+        merge_info['rename_column_names'],
+        merge_info['keep_key_column']))
+
+    new_names = [cname for cname in src_names if cname not in current_columns]
+    with transaction.atomic():
+        _alter_sql_merge_columns(
+            table_name,
+            upload_table,
+            src_names,
+            src_types,
+            current_columns,
+            new_names)
+
+        _merge_sql_rows(merge_info, table_name, upload_table, src_names)
+
+        nrows = _check_sql_merge_keys(
+            workflow,
+            table_name,
+            merge_info['dst_selected_key'])
+
+        # Create the new columns and update the is_key property of the
+        # existing ones with the keep_key value
+        workflow.add_columns([
+            (
+                cname,
+                src_types[src_names[cname]],
+                keep_key[cname] and sql.is_column_unique(table_name, cname))
+            for cname in new_names])
+        for cname, col in current_columns.items():
+            if cname in src_names and col.is_key and not keep_key[cname]:
+                col.is_key = False
+                col.save(update_fields=['is_key'])
+
+    sql.delete_table(upload_table)
+    workflow.increase_table_version()
+
+    workflow.nrows = nrows
+    workflow.set_query_builder_ops()
+    workflow.save(update_fields=['nrows', 'query_builder_ops'])
+    if workflow.search_index:
+        workflow.update_search_index()
+
+    return True
+
+
+def perform_table_upload_merge(workflow, merge_info: Dict):
+    """Merge the upload table with the existing workflow table.
+
+    The merge is executed in the database when possible (see
+    _perform_sql_merge). Otherwise, both tables are loaded in data frames
+    and merged with perform_dataframe_upload_merge.
+
+    :param workflow: Workflow with the table and the upload table
+    :param merge_info: Dictionary with merge options (see
+    perform_dataframe_upload_merge)
+    :return: None or Exception with anomaly in the message
+    """
+    if not _perform_sql_merge(workflow, merge_info):
+        perform_dataframe_upload_merge(
+            workflow,
+            pandas.load_table(workflow.get_data_frame_table_name()),
+            pandas.load_table(workflow.get_upload_table_name()),
+            merge_info)
+        return
+
+    # Recompute all the values of the conditions in each of the actions
+    for action in workflow.actions.all():
+        action.update_selected_row_counts()
+
+
 def perform_dataframe_upload_merge(
     workflow,
     dst_df: pd.DataFrame,
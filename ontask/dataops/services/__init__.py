@@ -3,7 +3,8 @@ from ontask.dataops.services.dataframeupload import (
     batch_load_df_from_athenaconnection, load_df_from_csvfile,
     load_df_from_excelfile, load_df_from_googlesheet, load_df_from_s3)
 from ontask.dataops.services.errors import OnTasDataopsPluginInstantiationError
-from ontask.dataops.services.increase_track import ExecuteIncreaseTrackCount
+from ontask.dataops.services.increase_track import (
+    ExecuteIncreaseTrackCount, flush_track_hits, register_track_hit)
 from ontask.dataops.services.plugin_admin import (
     PluginAdminTable, load_plugin, refresh_plugin_data)
 from ontask.dataops.services.plugin_execute import ExecuteRunPlugin
@@ -1,7 +1,13 @@
 """Upload/Merge dataframe from a CANVAS connection."""
-from typing import Dict, Optional, Tuple
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+
 import pandas as pd
 from bs4 import BeautifulSoup
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
 
 from ontask import models
 from ontask.core import canvas_ops
@@ -121,30 +127,25 @@ def _process_question_statistic(
 
 
 def _extract_quiz_answer_information(
-        oauth_info: dict,
-        user_token: models.OAuthUserToken,
         canvas_course_id: int,
         quiz_id: int,
+        question_names: list,
+        quiz_stats: dict,
         data_frame_source: dict):
+    """Add the answers to the quiz questions to the given data frame.
 
-    question_names = canvas_ops.request_and_access(
-        'get_quiz_questions',
-        oauth_info,
-        user_token,
-        [canvas_course_id, quiz_id])
+    :param canvas_course_id: Canvas course
+    :param quiz_id: Quiz id
+    :param question_names: Result of the API call get_quiz_questions
+    :param quiz_stats: Result of the API call get_quiz_statistics
+    :param data_frame_source: Data frame to expand with the data
+    """
     question_names = dict([
         (
             str(qinfo['id']),
             BeautifulSoup(qinfo['question_name'], 'lxml').text)
         for qinfo in question_names])
 
-    quiz_stats = canvas_ops.request_and_access(
-        'get_quiz_statistics',
-        oauth_info,
-        user_token,
-        [canvas_course_id, quiz_id],
-        result_key='quiz_statistics')
-
     # Loop over all elements with quiz statistics
     for qstat in quiz_stats['quiz_statistics']:
         # Loop over all questions
@@ -157,27 +158,41 @@ def _extract_quiz_answer_information(
                 data_frame_source)
 
 
+def _is_changed_enrollment(student: dict, changed_time) -> bool:
+    """Check if the enrollment of a student changed after a time.
+
+    :param student: Element in the result of get_course_enrolment
+    :param changed_time: Datetime of the previous request (or None)
+    :return: True if there is no time or the enrollment was updated after it
+    """
+    return (
+        not changed_time
+        or not student.get('updated_at')
+        or parse_datetime(student['updated_at']) >= changed_time)
+
+
 def _extract_enrollment_information(
-        oauth_info: dict,
-        user_token: models.OAuthUserToken,
-        canvas_course_id: int,
-        data_frame_source: dict):
+        students: list,
+        data_frame_source: dict,
+        changed_since: Optional[str] = None):
     """Extract enrollment information from Canvas and add to given data frame
 
-    :param oauth_info: Oauth info to connect to Canvas
-    :param user_token: User token to authorize the canvas connection
-    :param canvas_course_id: Canvas course
+    If changed_since is given, only the students whose enrollment changed
+    after that time, or that already are in the data frame (with other
+    changes) are included.
+
+    :param students: Result of the API call get_course_enrolment
     :param data_frame_source: Data frame to expand with the data
+    :param changed_since: Optional ISO time of the previous request
     """
-
-    students = canvas_ops.request_and_access(
-        'get_course_enrolment',
-        oauth_info,
-        user_token,
-        [canvas_course_id, 'active'])
-
+    changed_time = parse_datetime(changed_since) if changed_since else None
     for student in students:
         user_id = student['user']['id']
+        if (
+            user_id not in data_frame_source
+            and not _is_changed_enrollment(student, changed_time)
+        ):
+            continue
         user_value = {
             'id': user_id,
             'name': student['user']['name']}
@@ -189,19 +204,17 @@ def _extract_enrollment_information(
 
 
 def _extract_quiz_submission_information(
-        oauth_info: dict,
-        user_token: models.OAuthUserToken,
         canvas_course_id: int,
         quiz_id: int,
+        quiz_submission: dict,
         data_frame_source: dict):
+    """Add the quiz submissions to the given data frame.
 
-    quiz_submission = canvas_ops.request_and_access(
-        'get_quiz_submissions',
-        oauth_info,
-        user_token,
-        [canvas_course_id, quiz_id],
-        result_key='quiz_submissions')
-
+    :param canvas_course_id: Canvas course
+    :param quiz_id: Quiz id
+    :param quiz_submission: Result of the API call get_quiz_submissions
+    :param data_frame_source: Data frame to expand with the data
+    """
     # Loop over all submissions in a quiz
     for submission in quiz_submission['quiz_submissions']:
         # Create the required column names
@@ -234,18 +247,18 @@ def _extract_quiz_submission_information(
 
 
 def _extract_assignment_submission_information(
-        oauth_info: dict,
-        user_token: models.OAuthUserToken,
         canvas_course_id: int,
         assignment_id: int,
+        assignment_submissions: list,
         data_frame_source: dict):
+    """Add the assignment submissions to the given data frame.
 
-    assignment_submissions = canvas_ops.request_and_access(
-        'get_assignment_submissions',
-        oauth_info,
-        user_token,
-        [canvas_course_id, assignment_id])
-
+    :param canvas_course_id: Canvas course
+    :param assignment_id: Assignment id
+    :param assignment_submissions: Result of the API call
+    get_assignment_submissions
+    :param data_frame_source: Data frame to expand with the data
+    """
     for submission in assignment_submissions:
         if not submission['attempt']:
             # Submission with no attempts, skip
@@ -279,6 +292,151 @@ def _extract_assignment_submission_information(
             user_row[score_column] = submission['entered_score']
 
 
+def _request_course_data(
+        canvas_pool: canvas_ops.CanvasRequestPool,
+        canvas_course_id: int,
+        upload_enrollment: bool,
+        upload_quizzes: bool,
+        upload_assignments: bool,
+) -> Tuple[Optional[list], list, Iterable]:
+    """Request all the information in a Canvas course.
+
+    :param canvas_pool: Pool to execute the requests
+    :param canvas_course_id: Canvas course
+    :param upload_enrollment: Whether to request the enrollment information
+    :param upload_quizzes: Whether to request the quizzes information
+    :param upload_assignments: Whether to request the assignments information
+    :return: List of students (or None), list of tuples (quiz id, futures
+    with questions, statistics and submissions), and iterable of tuples
+    (assignment id, submissions).
+    """
+    students = quizzes = assignments = None
+    if upload_enrollment:
+        students = canvas_pool.request(
+            'get_course_enrolment',
+            [canvas_course_id, 'active'])
+    if upload_quizzes:
+        quizzes = canvas_pool.request(
+            'get_course_quizzes',
+            [canvas_course_id])
+    if upload_assignments:
+        assignments = canvas_pool.request(
+            'get_course_assignments',
+            [canvas_course_id])
+
+    # Request the information of every quiz and assignment
+    quiz_requests = [
+        _request_quiz_data(canvas_pool, canvas_course_id, quiz['id'])
+        for quiz in (quizzes.result() if quizzes else [])]
+    assignment_requests = [
+        (
+            assignment['id'],
+            canvas_pool.request(
+                'get_assignment_submissions',
+                [canvas_course_id, assignment['id']]))
+        for assignment in (assignments.result() if assignments else [])]
+
+    return (
+        students.result() if students else None,
+        quiz_requests,
+        (
+            (assignment_id, submissions.result())
+            for assignment_id, submissions in assignment_requests))
+
+
+def _request_course_changes(
+        canvas_pool: canvas_ops.CanvasRequestPool,
+        canvas_course_id: int,
+        upload_enrollment: bool,
+        upload_quizzes: bool,
+        upload_assignments: bool,
+        changed_since: str,
+) -> Tuple[Optional[list], list, Iterable]:
+    """Request the information in a Canvas course that changed after a time.
+
+    The submissions submitted or graded after changed_since are obtained
+    with two requests for the whole course. The quizzes are requested again
+    only if they have one of these submissions (or if they have no
+    assignment, and therefore their changes cannot be detected). The lists of
+    students and quizzes are requested with If-None-Match. The complete list
+    of students is returned (see _extract_enrollment_information).
+
+    :param canvas_pool: Pool to execute the requests
+    :param canvas_course_id: Canvas course
+    :param upload_enrollment: Whether to request the enrollment information
+    :param upload_quizzes: Whether to request the quizzes information
+    :param upload_assignments: Whether to request the assignments information
+    :param changed_since: String with the ISO time of the previous request
+    :return: Same as _request_course_data
+    """
+    students = quizzes = None
+    if upload_enrollment:
+        students = canvas_pool.request(
+            'get_course_enrolment',
+            [canvas_course_id, 'active'],
+            use_cache=True)
+    if upload_quizzes:
+        quizzes = canvas_pool.request(
+            'get_course_quizzes',
+            [canvas_course_id],
+            use_cache=True)
+    changed_submissions = [
+        canvas_pool.request(
+            'get_course_submissions',
+            [canvas_course_id],
+            params={'student_ids[]': 'all', since_param: changed_since})
+        for since_param in ['submitted_since', 'graded_since']]
+
+    # Submissions per assignment (a submission may be in both results)
+    submissions = {}
+    for request in changed_submissions:
+        for submission in request.result():
+            submissions.setdefault(
+                submission['assignment_id'],
+                {})[submission['user_id']] = submission
+
+    quiz_requests = [
+        _request_quiz_data(canvas_pool, canvas_course_id, quiz['id'])
+        for quiz in (quizzes.result() if quizzes else [])
+        if not quiz.get('assignment_id')
+        or quiz['assignment_id'] in submissions]
+
+    return (
+        students.result() if students else None,
+        quiz_requests,
+        (
+            (assignment_id, list(assignment_submissions.values()))
+            for assignment_id, assignment_submissions in submissions.items()
+            if upload_assignments))
+
+
+def _request_quiz_data(
+        canvas_pool: canvas_ops.CanvasRequestPool,
+        canvas_course_id: int,
+        quiz_id: int,
+) -> Tuple[int, Future, Future, Future]:
+    """Request the questions, statistics and submissions of a quiz.
+
+    :param canvas_pool: Pool to execute the requests
+    :param canvas_course_id: Canvas course
+    :param quiz_id: Quiz id
+    :return: Quiz id and the futures with the three results
+    """
+    return (
+        quiz_id,
+        canvas_pool.request(
+            'get_quiz_questions',
+            [canvas_course_id, quiz_id]),
+        canvas_pool.request(
+            'get_quiz_statistics',
+            [canvas_course_id, quiz_id],
+            result_key='quiz_statistics'),
+        canvas_pool.request(
+            'get_quiz_submissions',
+            [canvas_course_id, quiz_id],
+            result_key='quiz_submissions'))
+
+
 def create_df_from_canvas_course(
         user: models.OnTaskUser,
         target_url: str,
@@ -287,7 +445,8 @@ def create_df_from_canvas_course(
         upload_quizzes: bool,
         upload_assignments: bool,
         include_course_id_column: bool,
-        columns_to_upload: list = None
+        columns_to_upload: list = None,
+        changed_since: Optional[str] = None,
 ) -> pd.DataFrame:
     """Create a data frame from the information in a canvas course
 
@@ -299,6 +458,8 @@ def create_df_from_canvas_course(
     :param upload_assignments: Whether to upload the assignments information
     :param include_course_id_column: Whether to include a course id column
     :param columns_to_upload: Columns in the workflow to upload
+    :param changed_since: If given (ISO time), the data frame contains only
+    the students and values that changed after that time.
     :return: The Pandas data frame with the extracted information
     """
     # Verify parameter
@@ -314,61 +475,63 @@ def create_df_from_canvas_course(
     # List of dictionaries to then create the Data Frame
     data_frame_source = {}
 
-    # Upload Enrollments
-    if upload_enrollment:
-        _extract_enrollment_information(
-            oauth_info,
-            user_token,
-            canvas_course_id,
-            data_frame_source)
-
-    # Upload Quizzes
-    if upload_quizzes:
-        # Fetch all quizzes for the course
-        quizzes = canvas_ops.request_and_access(
-            'get_course_quizzes',
-            oauth_info,
-            user_token,
-            [course_id])
-
-        # Build the data frame source with the information from quizzes
-        for quiz in quizzes:
-            quiz_id = quiz['id']
+    # The API calls are executed concurrently, and their results are
+    # processed in the same order in which they are requested.
+    with canvas_ops.CanvasRequestPool(oauth_info, user_token) as canvas_pool:
+        if changed_since:
+            students, quiz_requests, assignments = _request_course_changes(
+                canvas_pool,
+                canvas_course_id,
+                upload_enrollment,
+                upload_quizzes,
+                upload_assignments,
+                changed_since)
+        else:
+            students, quiz_requests, assignments = _request_course_data(
+                canvas_pool,
+                canvas_course_id,
+                upload_enrollment,
+                upload_quizzes,
+                upload_assignments)
 
+        # Upload Quizzes
+        for quiz_id, questions, statistics, submissions in quiz_requests:
             # Get the answer information
             _extract_quiz_answer_information(
-                oauth_info,
-                user_token,
                 canvas_course_id,
                 quiz_id,
+                questions.result(),
+                statistics.result(),
                 data_frame_source)
 
             # Get the quiz submission information
             _extract_quiz_submission_information(
-                oauth_info,
-                user_token,
                 canvas_course_id,
                 quiz_id,
+                submissions.result(),
                 data_frame_source)
 
-    # Upload Assignments
-    if upload_assignments:
-        # Get all the assignments in a course
-        assignments = canvas_ops.request_and_access(
-            'get_course_assignments',
-            oauth_info,
-            user_token,
-            [canvas_course_id])
-
-        for assignment in assignments:
+        # Upload Assignments
+        for assignment_id, submissions in assignments:
             # Get the assignment submission information
             _extract_assignment_submission_information(
-                oauth_info,
-                user_token,
                 canvas_course_id,
-                assignment['id'],
+                assignment_id,
+                submissions,
                 data_frame_source)
 
+    # Upload Enrollments (after the submissions to include the names of the
+    # students with changes in an incremental upload)
+    if students:
+        _extract_enrollment_information(
+            students,
+            data_frame_source,
+            changed_since)
+
+    if not data_frame_source:
+        # No information in the course (or no changes)
+        return pd.DataFrame()
+
     # Create the data frame with the collected data
     result = pd.DataFrame(data_frame_source.values())
 
@@ -387,7 +550,7 @@ def create_df_from_canvas_course(
             cname for cname in column_names if cname in columns_to_upload]
 
     head_column_names = ['id']
-    if upload_enrollment:
+    if upload_enrollment and 'name' in result.columns:
         # If the enrollment has been updated, include name as head column
         head_column_names.append('name')
 
@@ -401,6 +564,27 @@ def create_df_from_canvas_course(
     return result
 
 
+# Payload fields that must not change between two incremental executions
+SYNC_PARAMETERS = [
+    'target_url',
+    'canvas_course_id',
+    'upload_enrollment',
+    'upload_quizzes',
+    'upload_assignments',
+    'include_course_id_column',
+    'columns_to_upload',
+    'src_key',
+    'dst_key']
+
+# The merge of the changed rows must keep the rows in the table without
+# changes (they were already selected by the previous execution)
+INCREMENTAL_HOW_MERGE = {
+    'inner': 'left',
+    'left': 'left',
+    'right': 'outer',
+    'outer': 'outer'}
+
+
 class ExecuteCanvasCourseUpload:
     @staticmethod
     def execute_operation(
@@ -412,6 +596,10 @@ class ExecuteCanvasCourseUpload:
     ):
         """Perform a Canvas Course Upload asynchronously.
 
+        If the incremental sync is selected and a previous execution with the
+        same parameters succeeded, only the information that changed since
+        then is requested and merged into the table.
+
         :param user: User object
         :param workflow: Workflow object
         :param action: Empty
@@ -426,29 +614,60 @@ class ExecuteCanvasCourseUpload:
           - upload_assignments: Whether to upload the assignments information
           - include_course_id_column: Whether to include a course id column
           - columns_to_upload: Columns in the workflow to upload
+          - incremental_sync: Whether to request only the changes
+          - canvas_sync_state: Parameters and time of the last execution
+            (updated by this function)
         :param log_item: Optional log item object.
         """
+        how_merge = common.get_how_merge(payload, log_item)
+        parameters = [payload.get(key) for key in SYNC_PARAMETERS]
+        sync_state = payload.get('canvas_sync_state')
+        changed_since = None
+        if (
+            payload.get('incremental_sync')
+            and workflow.has_data_frame
+            and sync_state
+            and sync_state['parameters'] == parameters
+        ):
+            changed_since = sync_state['synced_at']
+            how_merge = INCREMENTAL_HOW_MERGE[how_merge]
+
+        # Changes that occur while the data is requested are requested again
+        # in the next execution
+        synced_at = datetime.now(ZoneInfo(settings.TIME_ZONE)).isoformat()
         data_frame = create_df_from_canvas_course(
             user,
-            payload.pop('target_url'),
-            payload.pop('canvas_course_id'),
-            payload.pop('upload_enrollment'),
-            payload.pop('upload_quizzes'),
-            payload.pop('upload_assignments'),
-            payload.pop('include_course_id_column'),
-            payload.pop('columns_to_upload'))
-
-        # Create session
-        session = common.create_session()
-
-        # Lock the workflow for processing
-        common.access_workflow(user, session, workflow.id, log_item)
-
-        # Merge or upload the data frame
-        pandas.perform_dataframe_set_or_update(
-            workflow,
-            data_frame,
-            common.get_how_merge(payload, log_item),
-            common.get_key(payload, 'src_key', log_item),
-            common.get_key(payload, 'dst_key', log_item),
-            log_item)
+            payload['target_url'],
+            payload['canvas_course_id'],
+            payload.get('upload_enrollment'),
+            payload.get('upload_quizzes'),
+            payload.get('upload_assignments'),
+            payload.get('include_course_id_column'),
+            payload.get('columns_to_upload'),
+            changed_since)
+
+        if log_item:
+            log_item.payload['incremental'] = changed_since is not None
+            log_item.payload['rows'] = data_frame.shape[0]
+            log_item.save(update_fields=['payload'])
+
+        if not changed_since or not data_frame.empty:
+            # Create session
+            session = common.create_session()
+
+            # Lock the workflow for processing
+            common.access_workflow(user, session, workflow.id, log_item)
+
+            # Merge or upload the data frame
+            pandas.perform_dataframe_set_or_update(
+                workflow,
+                data_frame,
+                how_merge,
+                common.get_key(payload, 'src_key', log_item),
+                common.get_key(payload, 'dst_key', log_item),
+                log_item)
+
+        # Stored with the scheduled operation
+        payload['canvas_sync_state'] = {
+            'parameters': parameters,
+            'synced_at': synced_at}
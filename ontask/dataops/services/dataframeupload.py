@@ -256,18 +256,11 @@ def batch_load_df_from_athenaconnection(
     upload_data['dst_selected_key'] = run_params['merge_key']
     upload_data['how_merge'] = run_params['merge_method']
 
-    dst_df = pandas.load_table(workflow.get_data_frame_table_name())
-    src_df = pandas.load_table(workflow.get_data_frame_upload_table_name())
-
     try:
-        pandas.perform_dataframe_upload_merge(
-            workflow,
-            dst_df,
-            src_df,
-            upload_data)
+        pandas.perform_table_upload_merge(workflow, upload_data)
     except Exception as exc:
         # Nuke the temporary table
-        sql.delete_table(workflow.get_data_frame_upload_table_name())
+        sql.delete_table(workflow.get_upload_table_name())
         raise Exception(_('Unable to perform merge operation: {0}').format(
             str(exc)))
 
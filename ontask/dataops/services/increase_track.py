@@ -1,13 +1,220 @@
-"""Function to increase the tracking column in a workflow."""
-from typing import Dict, Optional
+"""Function to increase the tracking column in a workflow.
+
+Email read tracking requests are accumulated in a Redis hash (one counter per
+tracking token) by register_track_hit, and processed periodically by
+flush_track_hits, which updates all the counters of a tracking column with a
+single query.
+"""
+from typing import Dict, Optional, Tuple
 
 from celery.utils.log import get_task_logger
 from django.contrib.auth import get_user_model
 from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
 from django.utils.translation import gettext
+from django_redis import get_redis_connection
+from redis.exceptions import ResponseError
 
 from ontask import models, CELERY_LOGGER
 from ontask.dataops import sql
+from ontask.tasks.row_counts import mark_row_counts_stale
+
+# Name of the Redis hash with the tracking hits pending to be processed
+TRACK_BUFFER_KEY = 'ONTASK_EMAIL_TRACK_BUFFER'
+
+# Name of the Redis hash with the tracking hits being processed
+TRACK_PROCESSING_KEY = 'ONTASK_EMAIL_TRACK_PROCESSING'
+
+# Lock to process the tracking hits (and its timeout in seconds)
+TRACK_FLUSH_LOCK_KEY = 'ONTASK_EMAIL_TRACK_FLUSH'
+TRACK_FLUSH_LOCK_TIMEOUT = 600
+
+
+def register_track_hit(track_token: str):
+    """Accumulate a request received in the tracking URL.
+
+    :param track_token: Signed token received in the request (its signature
+    must have been verified)
+    :return: Nothing. The token counter is increased.
+    """
+    get_redis_connection('default').hincrby(
+        cache.make_key(TRACK_BUFFER_KEY),
+        track_token,
+        1)
+
+
+def _take_track_hits() -> Tuple[str, Dict[str, int]]:
+    """Take the tracking hits accumulated so far.
+
+    The hits are moved to the processing hash, which is deleted only when
+    they have been processed. If the hash already exists (a previous
+    execution failed), its hits are processed again and the new ones remain
+    in the buffer.
+
+    :return: Processing hash key and dictionary with (token, number of hits)
+    """
+    redis = get_redis_connection('default')
+    processing_key = cache.make_key(TRACK_PROCESSING_KEY)
+
+    # Rename the hash so that new hits are accumulated in a new one
+    try:
+        redis.renamenx(cache.make_key(TRACK_BUFFER_KEY), processing_key)
+    except ResponseError:
+        # There are no new hits
+        pass
+
+    return processing_key, {
+        token.decode(): int(nhits)
+        for token, nhits in redis.hgetall(processing_key).items()}
+
+
+def _group_track_hits(hits: Dict[str, int]) -> Dict[Tuple, Dict[str, int]]:
+    """Group the tracking hits by action and tracking column.
+
+    :param hits: Dictionary with (token, number of hits)
+    :return: Dictionary (action, sender, column_dst, column_to): {to: reads}
+    """
+    track_groups = {}
+    for token, nhits in hits.items():
+        try:
+            track_id = signing.loads(token)
+        except signing.BadSignature:
+            CELERY_LOGGER.error(gettext('Bad signature in track_id'))
+            continue
+
+        reads = track_groups.setdefault(
+            (
+                track_id['action'],
+                track_id['sender'],
+                track_id.get('column_dst', ''),
+                track_id.get('column_to', '')),
+            {})
+        msg_to = track_id.get('to', '')
+        reads[msg_to] = reads.get(msg_to, 0) + nhits
+
+    return track_groups
+
+
+def _process_track_group(
+    log_buffer: models.LogBuffer,
+    track_group: Tuple,
+    reads: Dict[str, int],
+) -> Optional[models.Column]:
+    """Increase the counters of a tracking column and log the reads.
+
+    :param log_buffer: Buffer to store the logs
+    :param track_group: Tuple (action, sender, column_dst, column_to)
+    :param reads: Dictionary with (to, number of reads)
+    :return: Column with modified values (None if nothing was modified)
+    """
+    action_id, sender, column_dst, column_to = track_group
+    user = get_user_model().objects.filter(email=sender).first()
+    action = models.Action.objects.filter(pk=action_id).first()
+    column = None
+    if action:
+        column = action.workflow.columns.filter(name=column_dst).first()
+    if not user or not column:
+        CELERY_LOGGER.error(
+            'Incorrect tracking information %s, %s, %s',
+            sender,
+            action_id,
+            column_dst)
+        return None
+
+    exception_msg = None
+    try:
+        # Increase the relevant cells
+        with transaction.atomic():
+            sql.increase_row_integers(
+                action.workflow.get_data_frame_table_name(),
+                column_dst,
+                column_to,
+                reads)
+    except Exception as exc:
+        exception_msg = str(exc)
+        column = None
+
+    _log_track_reads(
+        log_buffer,
+        action,
+        user,
+        track_group,
+        reads,
+        exception_msg)
+
+    return column
+
+
+def _log_track_reads(
+    log_buffer: models.LogBuffer,
+    action: models.Action,
+    user,
+    track_group: Tuple,
+    reads: Dict[str, int],
+    exception_msg: Optional[str],
+):
+    """Log the reads of the messages of an action.
+
+    :param log_buffer: Buffer to store the logs
+    :param action: Action that sent the messages
+    :param user: User that sent the messages
+    :param track_group: Tuple (action, sender, column_dst, column_to)
+    :param reads: Dictionary with (to, number of reads)
+    :param exception_msg: Error increasing the counters (or None)
+    :return: Nothing. Logs are added to the buffer
+    """
+    __, __, column_dst, column_to = track_group
+    # Record the events
+    for msg_to, nreads in reads.items():
+        log_payload = {
+            'to': msg_to,
+            'email_column': column_to,
+            'column_dst': column_dst,
+            'reads': nreads}
+        if exception_msg:
+            log_payload['EXCEPTION_MSG'] = exception_msg
+        action.log(
+            user,
+            models.Log.ACTION_EMAIL_READ,
+            log_buffer=log_buffer,
+            **log_payload)
+
+
+def flush_track_hits():
+    """Process all the tracking hits accumulated so far.
+
+    The hits are grouped by action and tracking column. The counters in each
+    column are increased with a single query, the read events are logged
+    with bulk inserts, and the conditions using the column are flagged to be
+    recalculated. The hits are removed from Redis only after the changes
+    are committed.
+
+    :return: Nothing
+    """
+    columns_to_recount = {}
+    with cache.lock(TRACK_FLUSH_LOCK_KEY, timeout=TRACK_FLUSH_LOCK_TIMEOUT):
+        processing_key, hits = _take_track_hits()
+        if not hits:
+            return
+
+        with transaction.atomic():
+            with models.Log.objects.buffered() as log_buffer:
+                for track_group, reads in _group_track_hits(hits).items():
+                    column = _process_track_group(
+                        log_buffer,
+                        track_group,
+                        reads)
+                    if column:
+                        columns_to_recount.setdefault(
+                            column.workflow_id,
+                            (column.workflow, set()))[1].add(column.name)
+
+        get_redis_connection('default').delete(processing_key)
+
+    # Update the conditions in the actions that use the tracking columns
+    for workflow, column_names in columns_to_recount.values():
+        mark_row_counts_stale(workflow, list(column_names))
 
 
 class ExecuteIncreaseTrackCount:
@@ -113,12 +320,9 @@ class ExecuteIncreaseTrackCount:
             except Exception as exc:
                 log_payload['EXCEPTION_MSG'] = str(exc)
             else:
-                # Get the tracking column and update all the conditions in the
-                # actions that have this column as part of their formulas
-                # FIX: Too aggressive?
-                track_col = action.workflow.columns.get(name=column_dst)
-                for act in action.workflow.actions.all():
-                    act.update_selected_row_counts(track_col)
+                # Flag the conditions in the actions that have this column as
+                # part of their formulas
+                mark_row_counts_stale(action.workflow, [column_dst])
 
         # Record the event
         action.log(user, self.log_event, **log_payload)
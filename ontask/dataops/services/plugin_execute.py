@@ -10,6 +10,7 @@ from django.utils.translation import gettext
 from ontask import OnTaskServiceException, models
 from ontask.dataops import pandas
 from ontask.dataops.services import load_plugin
+from ontask.tasks.row_counts import mark_row_counts_stale
 
 
 def _execute_plugin(
@@ -70,9 +71,11 @@ def _execute_plugin(
             ).format(plugin_info.name),
         )
 
-    # Get the data frame from the workflow
+    # Get the key and input columns from the workflow table
     try:
-        df = pandas.load_table(workflow.get_data_frame_table_name())
+        df = pandas.load_table(
+            workflow.get_data_frame_table_name(),
+            columns=list(dict.fromkeys([merge_key] + input_column_names)))
     except Exception as exc:
         raise Exception(
             gettext(
@@ -137,29 +140,31 @@ def _execute_plugin(
     # Add the merge column to the result df
     new_df[merge_key] = df[merge_key]
 
-    # Proceed with the merge
+    # Proceed with the merge. The output columns are written in place, and
+    # only if they are not compatible with the existing ones, the whole table
+    # is merged.
     try:
-        new_frame = pandas.perform_dataframe_upload_merge(
-            workflow,
-            df,
-            new_df,
-            {
-                'how_merge': 'inner',
-                'dst_selected_key': merge_key,
-                'src_selected_key': merge_key,
-                'initial_column_names': list(new_df.columns),
-                'rename_column_names': list(new_df.columns),
-                'columns_to_upload': [True] * len(list(new_df.columns)),
-            },
-        )
+        if not pandas.store_dataframe_columns(workflow, new_df, merge_key):
+            pandas.perform_dataframe_upload_merge(
+                workflow,
+                pandas.load_table(workflow.get_data_frame_table_name()),
+                new_df,
+                {
+                    'how_merge': 'inner',
+                    'dst_selected_key': merge_key,
+                    'src_selected_key': merge_key,
+                    'initial_column_names': list(new_df.columns),
+                    'rename_column_names': list(new_df.columns),
+                    'columns_to_upload': [True] * len(list(new_df.columns)),
+                },
+            )
     except Exception as exc:
         raise Exception(
             gettext('Error while merging result: {0}.').format(str(exc)),
         )
 
-    if isinstance(new_frame, str):
-        raise Exception(
-            gettext('Error while merging result: {0}.').format(new_frame))
+    # Recompute the rows selected by the conditions using the outputs
+    mark_row_counts_stale(workflow, list(new_df.columns))
 
     # Update execution time in the plugin
     plugin_info.executed = datetime.now(
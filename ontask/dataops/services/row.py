@@ -6,6 +6,7 @@ from django.db import transaction
 from ontask import models
 from ontask.core import checks
 from ontask.dataops import sql
+from ontask.tasks.row_counts import mark_row_counts_stale
 
 
 def create_row(workflow: models.Workflow, row_values: List[Any]):
@@ -33,10 +34,8 @@ def create_row(workflow: models.Workflow, row_values: List[Any]):
     workflow.nrows += 1
     workflow.save(update_fields=['nrows'])
 
-    # Recompute all the values of the conditions in each of the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for act in workflow.actions.all():
-        act.update_selected_row_counts()
+    # The number of rows selected by the conditions must be recomputed
+    mark_row_counts_stale(workflow)
 
 
 def update_row_values(
@@ -66,7 +65,5 @@ def update_row_values(
         # columns.
         checks.check_key_columns(workflow)
 
-    # Recompute all the values of the conditions in each of the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for act in workflow.actions.all():
-        act.update_selected_row_counts()
+    # The number of rows selected by the conditions must be recomputed
+    mark_row_counts_stale(workflow)
@@ -3,7 +3,7 @@ from typing import Dict, List, Tuple
 
 from django import http
 from django.contrib import messages
-from django.shortcuts import redirect, render
+from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils.translation import gettext as _
 
@@ -170,22 +170,8 @@ def upload_step_four(
     :param upload_data: Dictionary with all the information about the merge.
     :return: HttpResponse
     """
-    # Get the dataframes to merge
     try:
-        dst_df = pandas.load_table(workflow.get_data_frame_table_name())
-        src_df = pandas.load_table(workflow.get_upload_table_name())
-    except Exception:
-        return render(
-            request,
-            'error.html',
-            {'message': _('Exception while loading data frame')})
-
-    try:
-        pandas.perform_dataframe_upload_merge(
-            workflow,
-            dst_df,
-            src_df,
-            upload_data)
+        pandas.perform_table_upload_merge(workflow, upload_data)
     except Exception as exc:
         # Nuke the temporary table
         sql.delete_table(workflow.get_upload_table_name())
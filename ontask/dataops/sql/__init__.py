@@ -1,12 +1,17 @@
 """Access the DB directly through psycopg2 and django connection."""
 from ontask.dataops.sql.column_queries import (
-    COLUMN_NAME_SIZE, add_column_to_db, copy_column_in_db, db_rename_column,
-    df_drop_column, get_df_column_types, get_text_column_hash,
-    is_column_in_table, is_column_unique, get_column_distinct_values,
-    is_unique_column)
+    COLUMN_NAME_SIZE, add_column_to_db, add_columns_from_table,
+    add_formula_column_to_db, add_random_column_to_db, copy_column_in_db,
+    db_change_column_type, db_rename_column, df_drop_column,
+    get_df_column_types, get_text_column_hash, is_column_in_table,
+    is_column_unique, get_column_distinct_values, is_unique_column)
 from ontask.dataops.sql.row_queries import (
-    delete_row, get_num_rows, get_row, get_rows, increase_row_integer,
-    insert_row, select_ids_all_false, update_row, get_table_row_by_index)
+    delete_row, get_num_rows, get_row, get_rows, get_rows_with_conditions,
+    get_selected_row_counts, increase_row_integer, increase_row_integers,
+    insert_row, update_row, get_table_row_by_index)
 from ontask.dataops.sql.table_queries import (
-    clone_table, delete_table, get_select_query_txt, rename_table,
-    search_table)
+    clone_table, copy_to_csv, create_search_index, delete_search_index,
+    delete_table, delete_unmatched_rows, get_column_histogram,
+    get_column_statistics, get_search_index_columns, get_select_query_txt,
+    insert_unmatched_rows, rename_table, search_table, search_table_count,
+    update_table_from)
@@ -149,6 +149,234 @@ def db_rename_column(table: str, old_name: str, new_name: str):
         ))
 
 
+def db_change_column_type(table_name: str, column_name: str, col_type: str):
+    """Change the data type of a column in the database.
+
+    :param table_name: Table
+    :param column_name: Column name
+    :param col_type: New OnTask column type
+    :return: Nothing. Change reflected in the database table
+    """
+    query_skel = 'ALTER TABLE {0} ALTER COLUMN {1} TYPE ' + (
+        ontask_to_sql_datatype_names[col_type])
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(sql.SQL(query_skel).format(
+            sql.Identifier(table_name),
+            sql.Identifier(column_name)))
+
+
+def add_columns_from_table(
+        table_name: str,
+        src_table_name: str,
+        column_names: List[str],
+        src_column_names: List[str],
+):
+    """Add columns to a table with the same SQL type as in another table.
+
+    The exact type is used (for example, timestamp with or without time
+    zone) so that the values in the source columns are copied unchanged.
+
+    :param table_name: Table in which to add the columns
+    :param src_table_name: Table with the columns to replicate
+    :param column_names: Names of the new columns
+    :param src_column_names: Corresponding names in the source table
+    :return: Nothing. Effect done in the DB
+    """
+    if not column_names:
+        return
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                'SELECT attname, format_type(atttypid, atttypmod) '
+                + 'FROM pg_attribute WHERE attrelid = %s::regclass '
+                + 'AND attnum > 0 AND NOT attisdropped'),
+            [sql.Identifier(src_table_name).as_string(connection.connection)])
+        sql_types = dict(cursor.fetchall())
+
+        cursor.execute(sql.SQL('ALTER TABLE {0} {1}').format(
+            sql.Identifier(table_name),
+            sql.SQL(', ').join([
+                sql.SQL('ADD COLUMN {0} ' + sql_types[src_cname]).format(
+                    sql.Identifier(cname))
+                for cname, src_cname in zip(column_names, src_column_names)
+            ])))
+
+
+def _get_operands_null_clause(
+        operands: List[sql.Composable],
+) -> sql.Composed:
+    """Create the clause that is true if any of the operands is NULL.
+
+    :param operands: List of SQL expressions
+    :return: SQL clause
+    """
+    return sql.SQL(' OR ').join([
+        sql.SQL('{0} IS NULL').format(operand) for operand in operands])
+
+
+def _get_null_if_any_null(
+        operands: List[sql.Composable],
+        expression: sql.Composable,
+) -> sql.Composed:
+    """Create the expression that is NULL if any of the operands is NULL.
+
+    :param operands: List of SQL expressions
+    :param expression: Expression combining the operands
+    :return: SQL expression
+    """
+    return sql.SQL('CASE WHEN {0} THEN NULL ELSE {1} END').format(
+        _get_operands_null_clause(operands),
+        expression)
+
+
+def _get_values_aggregate(
+        aggregate: str,
+        operands: List[sql.Composable],
+) -> sql.Composed:
+    """Create the expression applying an aggregate to a list of operands.
+
+    :param aggregate: Aggregate over the values of the column "operand"
+    :param operands: List of SQL expressions
+    :return: SQL expression
+    """
+    return _get_null_if_any_null(
+        operands,
+        sql.SQL(
+            '(SELECT {0} FROM (VALUES {1}) AS operands(operand))',
+        ).format(
+            sql.SQL(aggregate),
+            sql.SQL(', ').join([
+                sql.SQL('(CAST({0} AS double precision))').format(operand)
+                for operand in operands])))
+
+
+_op_expression = {
+    'sum': lambda operands: sql.SQL(' + ').join(operands),
+    'prod': lambda operands: sql.SQL(' * ').join(operands),
+    # GREATEST and LEAST ignore the NULL values
+    'max': lambda operands: _get_null_if_any_null(
+        operands,
+        sql.SQL('GREATEST({0})').format(sql.SQL(', ').join(operands))),
+    'min': lambda operands: _get_null_if_any_null(
+        operands,
+        sql.SQL('LEAST({0})').format(sql.SQL(', ').join(operands))),
+    'mean': lambda operands: sql.SQL('({0}) / {1}').format(
+        sql.SQL(' + ').join([
+            sql.SQL('CAST({0} AS double precision)').format(operand)
+            for operand in operands]),
+        sql.Literal(len(operands))),
+    'median': lambda operands: _get_values_aggregate(
+        'percentile_cont(0.5) WITHIN GROUP (ORDER BY operand)',
+        operands),
+    'std': lambda operands: _get_values_aggregate(
+        'stddev_samp(operand)',
+        operands),
+    'all': lambda operands: sql.SQL(' AND ').join([
+        sql.SQL('COALESCE({0}, FALSE)').format(operand)
+        for operand in operands]),
+    'any': lambda operands: sql.SQL(' OR ').join([
+        sql.SQL('COALESCE({0}, FALSE)').format(operand)
+        for operand in operands]),
+}
+
+
+def _get_operation_expression(
+        operation: str,
+        column_names: List[str],
+) -> sql.Composed:
+    """Create the SQL expression combining the values of a set of columns.
+
+    As in the pandas operations with skipna=False, the result of the numeric
+    operations is NULL if any of the values is NULL. In the boolean
+    operations (all, any) the NULL values are considered false.
+
+    :param operation: One of sum, prod, max, min, mean, median, std, all, any
+    :param column_names: Columns to combine
+    :return: SQL expression
+    """
+    if operation not in _op_expression:
+        raise Exception(_('Unknown operation {0}').format(operation))
+
+    return _op_expression[operation](
+        [sql.Identifier(cname) for cname in column_names])
+
+
+def add_formula_column_to_db(
+        table_name: str,
+        col_name: str,
+        col_type: str,
+        operation: str,
+        column_names: List[str],
+):
+    """Add a column with the result of an operation over other columns.
+
+    The column is added and its values are computed with a single UPDATE,
+    so the rest of the columns in the table are not modified.
+
+    :param table_name: Table to consider
+    :param col_name: Column name
+    :param col_type: OnTask type of the result
+    :param operation: One of sum, prod, max, min, mean, median, std, all, any
+    :param column_names: Columns to combine
+    :return: Nothing. Effect done in the DB
+    """
+    expression = _get_operation_expression(operation, column_names)
+
+    add_column_to_db(table_name, col_name, col_type)
+    with connection.connection.cursor() as cursor:
+        cursor.execute(sql.SQL('UPDATE {0} SET {1} = {2}').format(
+            sql.Identifier(table_name),
+            sql.Identifier(col_name),
+            expression))
+
+
+def add_random_column_to_db(
+        table_name: str,
+        col_name: str,
+        col_type: str,
+        values: List,
+):
+    """Add a column with the given values assigned randomly to the rows.
+
+    The rows are shuffled and the values are assigned in turns, so each
+    value is assigned to the same number of rows (plus minus one). The
+    values are assigned with a single UPDATE, so the rest of the columns in
+    the table are not modified.
+
+    :param table_name: Table to consider
+    :param col_name: Column name
+    :param col_type: OnTask column type
+    :param values: List of values to assign
+    :return: Nothing. Effect done in the DB
+    """
+    # Datetime values are stored with their time zone (as in store_table)
+    if col_type == 'datetime':
+        sql_type = 'timestamp with time zone'
+    else:
+        sql_type = ontask_to_sql_datatype_names[col_type]
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL('ALTER TABLE {0} ADD COLUMN {1} ' + sql_type).format(
+                sql.Identifier(table_name),
+                sql.Identifier(col_name)))
+
+        if not values:
+            return
+
+        cursor.execute(
+            sql.SQL(
+                'UPDATE {0} AS dst SET {1} = (%s::' + sql_type + '[])[idx] '
+                + 'FROM (SELECT ctid AS row_id, '
+                + '(row_number() OVER (ORDER BY random()) - 1) %% %s + 1 '
+                + 'AS idx '
+                + 'FROM {0}) AS shuffled WHERE dst.ctid = shuffled.row_id',
+            ).format(sql.Identifier(table_name), sql.Identifier(col_name)),
+            [list(values), len(values)])
+
+
 def df_drop_column(table_name: str, column_name: str):
     """Drop a column from the DB table storing a data frame.
 
@@ -3,7 +3,7 @@ from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from django.db import connection
 from psycopg2 import sql
-from psycopg2.extras import DictCursor
+from psycopg2.extras import DictCursor, execute_values
 
 from ontask import OnTaskDBIdentifier
 from ontask.dataops import formula
@@ -42,6 +42,84 @@ def get_rows(
     return cursor
 
 
+def _get_condition_clauses(
+    cond_formula_list: List[Dict],
+    exclude_null: bool = False,
+) -> Tuple[List[sql.Composable], List]:
+    """Translate the condition formulas to boolean SQL expressions.
+
+    NULL results are considered False, and formulas without rules are
+    replaced by their constant value.
+
+    :param cond_formula_list: List of condition formulas
+    :param exclude_null: Make the operands false for null values (as in the
+    Python evaluation of the formulas)
+    :return: List of SQL expressions (one per formula) and list of fields
+    """
+    cond_clauses = []
+    query_fields = []
+    for cond_formula in cond_formula_list:
+        if exclude_null:
+            cond_formula = formula.exclude_null_values(cond_formula)
+        cond_sql, cond_fields = formula.evaluate(
+            cond_formula,
+            formula.EVAL_SQL)
+        if not cond_sql:
+            # A formula without rules has a constant value
+            cond_sql = sql.Literal(formula.evaluate(
+                cond_formula,
+                formula.EVAL_EXP,
+                {}))
+        cond_clauses.append(
+            sql.SQL('COALESCE(({0}), FALSE)').format(cond_sql))
+        query_fields += cond_fields
+
+    return cond_clauses, query_fields
+
+
+def get_rows_with_conditions(
+    table_name: str,
+    column_names: List[str],
+    cond_formula_list: List[Dict],
+    filter_formula: Optional[Mapping] = None,
+):
+    """Get the rows selected by the filter and the value of the conditions.
+
+    Execute a single select query in which, for each row, the values of the
+    columns are followed by the boolean result of evaluating each condition
+    (translated to SQL with the same result as the Python evaluation).
+
+    :param table_name: Table name
+    :param column_names: Columns to select
+    :param cond_formula_list: List of condition formulas
+    :param filter_formula: Optional JSON formula to use in the WHERE clause
+    :return: cursor resulting from the query. Each row contains the column
+    values followed by the condition values.
+    """
+    cond_clauses, query_fields = _get_condition_clauses(
+        cond_formula_list,
+        exclude_null=True)
+
+    query = sql.SQL('SELECT {0} FROM {1}').format(
+        sql.SQL(', ').join(
+            [OnTaskDBIdentifier(cname) for cname in column_names]
+            + cond_clauses),
+        sql.Identifier(table_name))
+
+    if filter_formula:
+        filter_query, filter_fields = formula.evaluate(
+            filter_formula,
+            formula.EVAL_SQL)
+        if filter_query:
+            query = query + sql.SQL(' WHERE ') + filter_query
+            query_fields += filter_fields
+
+    # Execute the query
+    cursor = connection.connection.cursor()
+    cursor.execute(query, query_fields)
+    return cursor
+
+
 def get_row(
     table_name: str,
     key_name: str,
@@ -181,49 +259,44 @@ def increase_row_integer(
         connection.commit()
 
 
-def select_ids_all_false(
+def increase_row_integers(
     table_name: str,
-    filter_formula: Optional[Dict],
-    cond_formula_list: List[Dict],
-) -> List[int]:
-    """Create query to select rows with all conditions equal to false.
-
-    :param table_name: Table in the DB
-    :param filter_formula: Filter formula for the WHERE clause (if any)
-    :param cond_formula_list: Non-empty list of condition formulas
-    :return: List of indexes for which all conditions (and filter) are false
-    """
-    # Prelude for the query
-    query = sql.SQL(
-        'SELECT t.position from (SELECT *, ROW_NUMBER() OVER () '
-        + 'AS position FROM {0}) AS t',
-    ).format(sql.Identifier(table_name))
-
-    cond_sql, cond_fields = zip(*[
-        formula.evaluate(c_formula, formula.EVAL_SQL)
-        for c_formula in cond_formula_list
-    ])
+    set_field: str,
+    where_field: str,
+    increments: Mapping[Any, int],
+):
+    """Increase the integer in multiple rows with a single query.
 
-    # WHERE clause for the conditions
-    query += sql.SQL(' WHERE ') + sql.SQL(' AND ').join(
-        [sql.SQL('(NOT ({0}))').format(cond) for cond in cond_sql],
-    )
-    query_fields = sum(cond_fields, [])
+    Given a field set_field, a field where_field and a dictionary
+    (where_value, increment), it increases the field in each row by the
+    given amount.
 
-    # Query clause for the filter
-    if filter_formula:
-        filter_query, filter_fields = formula.evaluate(
-            filter_formula,
-            formula.EVAL_SQL,
-        )
-        query = query + sql.SQL(' AND ({0})').format(filter_query)
-        query_fields += filter_fields
+    :param table_name: Table to modify
+    :param set_field: name of the field to be increased
+    :param where_field: Field used to filter the rows in the table
+    :param increments: Dictionary with (value in where_field, increment)
+    :return: Nothing. The table is modified (committed by the caller if it
+    is inside a transaction).
+    """
+    if not increments:
+        return
 
-    # Run the query and return the list
-    cursor = connection.connection.cursor()
-    cursor.execute(query, query_fields)
+    query = sql.SQL(
+        'UPDATE {0} AS t SET {1} = t.{1} + v.increment '
+        + 'FROM (VALUES %s) AS v(where_value, increment) '
+        + 'WHERE t.{2} = v.where_value',
+    ).format(
+        sql.Identifier(table_name),
+        OnTaskDBIdentifier(set_field),
+        OnTaskDBIdentifier(where_field))
 
-    return [id_tuple[0] for id_tuple in cursor.fetchall()]
+    # Execute the query
+    with connection.connection.cursor() as cursor:
+        execute_values(
+            cursor,
+            query,
+            list(increments.items()),
+            page_size=len(increments))
 
 
 def get_num_rows(table_name, cond_filter=None):
@@ -251,6 +324,80 @@ def get_num_rows(table_name, cond_filter=None):
     return num_rows
 
 
+def get_selected_row_counts(
+    table_name: str,
+    filter_formula: Optional[Mapping],
+    cond_formula_list: List[Dict],
+    order_column: Optional[str] = None,
+) -> Tuple[int, List[int], List[int]]:
+    """Count the rows selected by a filter and by each condition.
+
+    A single query is executed over the rows selected by the filter with one
+    count(*) FILTER (WHERE ...) per condition, and the aggregation of the
+    positions of the rows for which all conditions are false. NULL results in
+    the conditions are considered False.
+
+    The positions are those of the rows selected by the filter sorted by the
+    given column (same as in get_table_row_by_index).
+
+    :param table_name: Table name
+    :param filter_formula: Optional filter formula
+    :param cond_formula_list: List of condition formulas
+    :param order_column: Optional column to sort the rows
+    :return: Number of rows selected by the filter, list with the number of
+    rows selected by the filter and each condition, and list of positions of
+    the rows with all conditions false (empty if there are no conditions)
+    """
+    cond_clauses, cond_fields = _get_condition_clauses(cond_formula_list)
+
+    select_items = [sql.SQL('count(*)')] + [
+        sql.SQL('count(*) FILTER (WHERE {0})').format(cond_clause)
+        for cond_clause in cond_clauses]
+    query_fields = list(cond_fields)
+    if cond_clauses:
+        select_items.append(
+            sql.SQL(
+                'array_agg(t.position ORDER BY t.position) '
+                + 'FILTER (WHERE {0})',
+            ).format(
+                sql.SQL(' AND ').join([
+                    sql.SQL('NOT {0}').format(cond_clause)
+                    for cond_clause in cond_clauses])))
+        query_fields += cond_fields
+
+    row_order = sql.SQL('')
+    if order_column:
+        row_order = sql.SQL('ORDER BY {0}').format(
+            OnTaskDBIdentifier(order_column))
+
+    where_clause = sql.SQL('')
+    if filter_formula:
+        filter_query, filter_fields = formula.evaluate(
+            filter_formula,
+            formula.EVAL_SQL)
+        if filter_query:
+            where_clause = sql.SQL(' WHERE ') + filter_query
+            query_fields += filter_fields
+
+    query = sql.SQL(
+        'SELECT {0} FROM (SELECT *, ROW_NUMBER() OVER ({1}) AS position '
+        + 'FROM {2}{3}) AS t',
+    ).format(
+        sql.SQL(', ').join(select_items),
+        row_order,
+        sql.Identifier(table_name),
+        where_clause)
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query, query_fields)
+        counts = cursor.fetchone()
+
+    if not cond_clauses:
+        return counts[0], [], []
+
+    return counts[0], list(counts[1:-1]), counts[-1] or []
+
+
 def delete_row(table_name: str, kv_pair: Tuple[str, Any]):
     """Delete the row with the given key, value pair.
 
@@ -281,20 +428,29 @@ def get_table_row_by_index(
 ):
     """Select the set of elements in the row with the given index.
 
+    The rows are sorted by the first key column and only the requested row
+    is fetched from the database.
+
     :param workflow: Workflow object storing the data
     :param filter_formula: Condition object to filter the data (or None)
     :param idx: Row number to get (first row is idx = 1)
     :return: A dictionary with the (column_name, value) data or None if the
      index is out of bounds
     """
-    # Get the data
-    df_data = get_rows(
+    if idx < 1:
+        return None
+
+    query, query_fields = get_select_query(
         workflow.get_data_frame_table_name(),
         column_names=workflow.get_column_names(),
         filter_formula=filter_formula)
 
-    # If the data is not there, return None
-    if idx > df_data.rowcount:
-        return None
+    order_column = workflow.get_row_order_column()
+    if order_column:
+        query += sql.SQL(' ORDER BY {0}').format(
+            OnTaskDBIdentifier(order_column))
+    query += sql.SQL(' OFFSET %s LIMIT 1')
 
-    return df_data.fetchall()[idx - 1]
+    with connection.connection.cursor(cursor_factory=DictCursor) as cursor:
+        cursor.execute(query, query_fields + [idx - 1])
+        return cursor.fetchone()
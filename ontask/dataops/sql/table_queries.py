@@ -1,5 +1,5 @@
 """Direct SQL operations in the DB."""
-from typing import Any, Dict, List, Mapping, Optional, Tuple
+from typing import Any, BinaryIO, Dict, List, Mapping, Optional, Tuple
 
 from django.db import connection
 from psycopg2 import sql
@@ -7,6 +7,13 @@ from psycopg2 import sql
 from ontask import LOGGER, OnTaskDBIdentifier
 from ontask.dataops import formula
 
+# Immutable function to translate cells to text (created in a migration) used
+# in the trigram index supporting the table search.
+SEARCH_TEXT_FUNCTION = 'ontask_search_text'
+
+# Separator of the cell values in the text of the search index
+SEARCH_TEXT_SEPARATOR = '\x1f'
+
 
 def clone_table(table_from: str, table_to: str):
     """Clone a table in the database.
@@ -35,6 +42,115 @@ def rename_table(table: str, new_name: str):
         ))
 
 
+def update_table_from(
+        table_name: str,
+        src_table_name: str,
+        dst_key: str,
+        src_key: str,
+        column_names: List[str],
+        src_column_names: Optional[List[str]] = None,
+):
+    """Update columns of a table with the values in another table.
+
+    The rows are matched through the key columns. As in DataFrame.update,
+    NULL values in the source table do not modify the values in the
+    destination.
+
+    :param table_name: Table to update
+    :param src_table_name: Table with the new values
+    :param dst_key: Key column in the table to update
+    :param src_key: Key column in the source table
+    :param column_names: Columns to update
+    :param src_column_names: Corresponding columns in the source table (if
+    None, the names are the same in both tables)
+    :return: Nothing. Effect in DB
+    """
+    if src_column_names is None:
+        src_column_names = column_names
+
+    query = sql.SQL(
+        'UPDATE {0} AS dst SET {1} FROM {2} AS src WHERE dst.{3} = src.{4}',
+    ).format(
+        sql.Identifier(table_name),
+        sql.SQL(', ').join([
+            sql.SQL('{0} = COALESCE(src.{1}, dst.{0})').format(
+                sql.Identifier(cname),
+                sql.Identifier(src_cname))
+            for cname, src_cname in zip(column_names, src_column_names)]),
+        sql.Identifier(src_table_name),
+        sql.Identifier(dst_key),
+        sql.Identifier(src_key))
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query)
+
+
+def delete_unmatched_rows(
+        table_name: str,
+        src_table_name: str,
+        dst_key: str,
+        src_key: str,
+):
+    """Delete the rows of a table with no matching row in another table.
+
+    :param table_name: Table from which the rows are deleted
+    :param src_table_name: Table with the rows to match
+    :param dst_key: Key column in the table to modify
+    :param src_key: Key column in the source table
+    :return: Nothing. Effect in DB
+    """
+    query = sql.SQL(
+        'DELETE FROM {0} AS dst WHERE NOT EXISTS '
+        + '(SELECT 1 FROM {1} AS src WHERE src.{2} = dst.{3})',
+    ).format(
+        sql.Identifier(table_name),
+        sql.Identifier(src_table_name),
+        sql.Identifier(src_key),
+        sql.Identifier(dst_key))
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query)
+
+
+def insert_unmatched_rows(
+        table_name: str,
+        src_table_name: str,
+        dst_key: str,
+        src_key: str,
+        column_names: List[str],
+        src_column_names: List[str],
+):
+    """Insert the rows of a table with no matching row in the destination.
+
+    The columns of the destination table not included in column_names are
+    left empty.
+
+    :param table_name: Table in which to insert the rows
+    :param src_table_name: Table with the rows to insert
+    :param dst_key: Key column in the table to modify
+    :param src_key: Key column in the source table
+    :param column_names: Columns to fill in the destination table
+    :param src_column_names: Corresponding columns in the source table
+    :return: Nothing. Effect in DB
+    """
+    query = sql.SQL(
+        'INSERT INTO {0} ({1}) SELECT {2} FROM {3} AS src WHERE NOT EXISTS '
+        + '(SELECT 1 FROM {0} AS dst WHERE dst.{4} = src.{5})',
+    ).format(
+        sql.Identifier(table_name),
+        sql.SQL(', ').join([
+            sql.Identifier(cname) for cname in column_names]),
+        sql.SQL(', ').join([
+            sql.SQL('src.{0}').format(sql.Identifier(cname))
+            for cname in src_column_names]),
+        sql.Identifier(src_table_name),
+        sql.Identifier(dst_key),
+        sql.Identifier(src_key))
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query)
+
+
 def get_boolean_clause(
         filter_formula: Optional[Dict] = None,
         filter_pairs: Optional[Mapping] = None,
@@ -117,6 +233,203 @@ def get_select_query(
     return query, query_fields
 
 
+def copy_to_csv(
+        file_obj: BinaryIO,
+        table_name: str,
+        column_names: List[str],
+        filter_formula: Optional[Dict] = None,
+        boolean_column_names: Optional[List[str]] = None,
+):
+    """Write the rows selected by a formula in a file in CSV format.
+
+    The data is transferred with COPY (SELECT ...) TO STDOUT, so the rows are
+    never loaded in memory. Boolean columns are written as True/False (as in
+    pandas) so that the file can be uploaded again.
+
+    :param file_obj: Binary file in which to write the CSV content
+    :param table_name: Table to query
+    :param column_names: List of columns to include (in this order)
+    :param filter_formula: Optional formula to select the rows
+    :param boolean_column_names: Columns in column_names of type boolean
+    :return: Nothing. Content is written in the file
+    """
+    boolean_column_names = set(boolean_column_names or [])
+    select_fields = []
+    for cname in column_names:
+        if cname in boolean_column_names:
+            select_fields.append(sql.SQL(
+                "CASE WHEN {0} THEN 'True' WHEN NOT {0} THEN 'False' END "
+                + 'AS {0}').format(OnTaskDBIdentifier(cname)))
+        else:
+            select_fields.append(OnTaskDBIdentifier(cname))
+
+    query = sql.SQL('SELECT {0} FROM {1}').format(
+        sql.SQL(', ').join(select_fields),
+        sql.Identifier(table_name))
+
+    query_fields = []
+    if filter_formula:
+        bool_clause, query_fields = get_boolean_clause(
+            filter_formula=filter_formula)
+        if bool_clause:
+            query = query + sql.SQL(' WHERE ') + bool_clause
+
+    with connection.connection.cursor() as cursor:
+        # COPY does not accept parameters, they are included in the query
+        cursor.copy_expert(
+            'COPY ({0}) TO STDOUT WITH (FORMAT csv, HEADER)'.format(
+                cursor.mogrify(query, query_fields).decode()),
+            file_obj)
+
+
+def _get_column_where_clause(
+        column: sql.Composable,
+        filter_formula: Optional[Dict] = None,
+) -> Tuple[sql.Composed, List]:
+    """Create the WHERE clause selecting the non-empty values of a column.
+
+    :param column: Identifier of the column
+    :param filter_formula: Optional formula to select the rows
+    :return: Pair with the clause and the fields to pass to the query
+    """
+    where_clause = sql.SQL(' WHERE {0} IS NOT NULL').format(column)
+    query_fields = []
+    if filter_formula:
+        bool_clause, query_fields = get_boolean_clause(
+            filter_formula=filter_formula)
+        if bool_clause:
+            where_clause += sql.SQL(' AND (') + bool_clause + sql.SQL(')')
+
+    return where_clause, query_fields
+
+
+def get_column_statistics(
+        table_name: str,
+        column_name: str,
+        data_type: str,
+        filter_formula: Optional[Dict] = None,
+) -> Optional[Dict]:
+    """Calculate the descriptive statistics of a column in the database.
+
+    The result is the same as the one obtained with
+    pandas.get_column_statistics, but the values are aggregated in the
+    database (percentile_cont, avg, stddev_samp and GROUP BY), so the column
+    is never transferred.
+
+    :param table_name: Table to query
+    :param column_name: Column to process
+    :param data_type: Data type of the column (OnTask names)
+    :param filter_formula: Optional formula to select the rows
+    :return: Dictionary with min, q1, mean, median, q3, max, std (integer and
+    double), counts and mode, or None if the column has no values. Numeric
+    columns also include the key summary with the numeric values (size,
+    quantiles, mean and std) to create the visualizations.
+    """
+    column = OnTaskDBIdentifier(column_name)
+    where_clause, query_fields = _get_column_where_clause(
+        column,
+        filter_formula)
+
+    # Counts ordered as the mode is calculated in pandas (smallest value
+    # among the most frequent ones)
+    query = sql.SQL(
+        'SELECT {0}, count(*) FROM {1}{2} GROUP BY {0} '
+        + 'ORDER BY count(*) DESC, {0}').format(
+        column,
+        sql.Identifier(table_name),
+        where_clause)
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query, query_fields)
+        counts = cursor.fetchall()
+
+    if not counts:
+        # The column has no data
+        return None
+
+    to_return = {
+        'min': 0,
+        'q1': 0,
+        'mean': 0,
+        'median': 0,
+        'q3': 0,
+        'max': 0,
+        'std': 0,
+        'mode': counts[0][0],
+        'counts': dict(counts),
+    }
+
+    if data_type in ['integer', 'double']:
+        query = sql.SQL(
+            'SELECT percentile_cont(ARRAY[0, 0.25, 0.5, 0.75, 1]) '
+            + 'WITHIN GROUP (ORDER BY {0}::double precision), '
+            + 'avg({0})::double precision, '
+            + 'stddev_samp({0})::double precision FROM {1}{2}').format(
+            column,
+            sql.Identifier(table_name),
+            where_clause)
+        with connection.connection.cursor() as cursor:
+            cursor.execute(query, query_fields)
+            quantiles, mean, std = cursor.fetchone()
+
+        to_return.update({
+            'min': '{0:g}'.format(quantiles[0]),
+            'q1': '{0:g}'.format(quantiles[1]),
+            'mean': '{0:g}'.format(mean),
+            'median': '{0:g}'.format(quantiles[2]),
+            'q3': '{0:g}'.format(quantiles[3]),
+            'max': '{0:g}'.format(quantiles[4]),
+            # Standard deviation of a single value is not defined
+            'std': '{0:g}'.format(float('nan') if std is None else std),
+            'summary': {
+                'size': sum(count for __, count in counts),
+                'quantiles': list(quantiles),
+                'mean': mean,
+                'std': std}})
+
+    return to_return
+
+
+def get_column_histogram(
+        table_name: str,
+        column_name: str,
+        min_value: float,
+        max_value: float,
+        nbins: int,
+        filter_formula: Optional[Dict] = None,
+) -> List[int]:
+    """Count the values of a numeric column in equal width bins.
+
+    The values are grouped in the database (width_bucket) as in
+    numpy.histogram (the last bin includes the maximum value).
+
+    :param table_name: Table to query
+    :param column_name: Column to process
+    :param min_value: Lower edge of the first bin (minimum value)
+    :param max_value: Upper edge of the last bin (maximum value)
+    :param nbins: Number of bins
+    :param filter_formula: Optional formula to select the rows
+    :return: List with the number of values in each bin
+    """
+    column = OnTaskDBIdentifier(column_name)
+    where_clause, query_fields = _get_column_where_clause(
+        column,
+        filter_formula)
+
+    query = sql.SQL(
+        'SELECT LEAST(width_bucket({0}::double precision, %s, %s, %s), %s) '
+        + 'AS bin, count(*) FROM {1}{2} GROUP BY bin').format(
+        column,
+        sql.Identifier(table_name),
+        where_clause)
+    with connection.connection.cursor() as cursor:
+        cursor.execute(
+            query,
+            [min_value, max_value, nbins, nbins] + query_fields)
+        bin_counts = dict(cursor.fetchall())
+
+    return [bin_counts.get(idx, 0) for idx in range(1, nbins + 1)]
+
+
 def get_select_query_txt(
         table_name: str,
         column_names: Optional[List[str]] = None,
@@ -142,6 +455,122 @@ def get_select_query_txt(
     return query_str.as_string(connection.connection), fields
 
 
+def _get_search_text_expression(column_names: List[str]) -> sql.Composed:
+    """Create the expression with the text of the cells used in the index.
+
+    The text of the cells is concatenated (in alphabetical order of the
+    column names) with a separator that does not appear in the search values.
+    The same expression is used to create the index and to search the table
+    so that Postgres uses the index.
+
+    :param column_names: Columns to include in the expression
+    :return: SQL expression
+    """
+    return sql.SQL(' || {0} || ').format(
+        sql.Literal(SEARCH_TEXT_SEPARATOR)).join([
+            sql.SQL("COALESCE({0}({1}), '')").format(
+                sql.SQL(SEARCH_TEXT_FUNCTION),
+                OnTaskDBIdentifier(cname))
+            for cname in sorted(column_names)])
+
+
+def _get_search_like_clause(
+        table_name: str,
+        search_value: str,
+        columns_to_search: List[str],
+        any_join: bool,
+        use_search_index: bool,
+) -> Tuple[sql.Composed, List]:
+    """Create the clause to search a value in the text of the given columns.
+
+    :param table_name: table name
+    :param search_value: String to search
+    :param columns_to_search: Columns in which to search the value
+    :param any_join: Boolean encoding if values should be combined with OR (or
+    AND)
+    :param use_search_index: Add a condition over the expression of the
+    search index (see create_search_index) to pre-select the rows
+    :return: Clause and list of fields.
+    """
+    indexed_columns = []
+    if use_search_index:
+        indexed_columns = get_search_index_columns(table_name)
+        if not set(columns_to_search).issubset(indexed_columns):
+            indexed_columns = []
+
+    if indexed_columns:
+        # Translate the cells to text with the function used in the index
+        text_clause = sql.SQL(
+            '(' + SEARCH_TEXT_FUNCTION + '({0}) LIKE %s)')
+    else:
+        text_clause = sql.SQL('(CAST ({0} AS TEXT) LIKE %s)')
+
+    like_value = '%' + search_value + '%'
+    like_clause = sql.SQL('(') + sql.SQL(
+        ' OR ' if any_join else ' AND ').join([
+            text_clause.format(OnTaskDBIdentifier(cname))
+            for cname in columns_to_search]) + sql.SQL(')')
+    query_fields = [like_value] * len(columns_to_search)
+
+    if not indexed_columns:
+        return like_clause, query_fields
+
+    # The index selects the rows with the value in any of the columns, and
+    # the previous clause checks the value in each column.
+    return (
+        sql.SQL('(({0}) LIKE %s) AND ').format(
+            _get_search_text_expression(indexed_columns)) + like_clause,
+        [like_value] + query_fields)
+
+
+def _get_search_where_clause(
+        table_name: str,
+        search_value: str,
+        columns_to_search: Optional[List] = None,
+        filter_formula: Optional[Dict] = None,
+        any_join: bool = True,
+        use_search_index: bool = False,
+) -> Tuple[sql.Composed, List]:
+    """Create the WHERE clause to search the content of the table cells.
+
+    :param table_name: table name
+    :param search_value: String to search
+    :param columns_to_search: Columns in which to search the value
+    :param filter_formula: Optional filter condition to pre-filter the query
+    :param any_join: Boolean encoding if values should be combined with OR (or
+    AND)
+    :param use_search_index: Use the search index of the table (if any)
+    :return: WHERE clause (empty if no restriction) and list of fields.
+    """
+    clauses = []
+    query_fields = []
+
+    # Add filter part if present
+    if filter_formula:
+        filter_query, filter_fields = formula.evaluate(
+            filter_formula,
+            formula.EVAL_SQL)
+        if filter_query:
+            clauses.append(filter_query)
+            query_fields += filter_fields
+
+    # Add the CAST {0} AS TEXT LIKE ...
+    if search_value and columns_to_search:
+        like_clause, like_fields = _get_search_like_clause(
+            table_name,
+            search_value,
+            columns_to_search,
+            any_join,
+            use_search_index)
+        clauses.append(like_clause)
+        query_fields += like_fields
+
+    if not clauses:
+        return sql.SQL(''), query_fields
+
+    return sql.SQL(' WHERE ') + sql.SQL(' AND ').join(clauses), query_fields
+
+
 def search_table(
         table_name: str,
         search_value: str,
@@ -150,13 +579,18 @@ def search_table(
         any_join: bool = True,
         order_col_name: str = None,
         order_asc: bool = True,
+        key_name: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        use_search_index: bool = False,
 ):
     """Search the content of all cells in the table.
 
     Select rows where for every (column, value) pair, column contains value
     (as in 'LIKE %value%'), these are combined with OR if any is TRUE,
     or AND if any is false, and the result is ordered by the given column
-    and type (if given)
+    and type (if given). Only the page of rows given by offset and limit is
+    fetched from the database.
 
     :param table_name: table name
     :param filter_formula: Optional filter condition to pre-filter the query
@@ -167,6 +601,12 @@ def search_table(
     AND)
     :param order_col_name: Order results by this column
     :param order_asc: Order results in ascending values (or descending)
+    :param key_name: Key column used to break ties in the order so that pages
+    are stable across requests
+    :param offset: Number of rows to skip
+    :param limit: Maximum number of rows to return (all if None or negative)
+    :param use_search_index: Write the search so that it uses the search
+    index of the table
     :param search_value: String to search
     :return: The resulting query set
     """
@@ -179,55 +619,171 @@ def search_table(
             sql.Identifier(table_name),
         )
     else:
-        query = sql.SQL('SELECT * from {1}').format(sql.Identifier(table_name))
-    query_fields = []
+        query = sql.SQL('SELECT * from {0}').format(sql.Identifier(table_name))
 
-    where_clause = sql.SQL('')
-    # Add filter part if present
-    if filter_formula:
-        filter_query, filter_fields = formula.evaluate(
-            filter_formula,
-            formula.EVAL_SQL)
-        if filter_query:
-            where_clause = filter_query
-            query_fields += filter_fields
+    where_clause, query_fields = _get_search_where_clause(
+        table_name,
+        search_value,
+        columns_to_search=columns_to_search,
+        filter_formula=filter_formula,
+        any_join=any_join,
+        use_search_index=use_search_index)
+    query = query + where_clause
 
-    # Add the CAST {0} AS TEXT LIKE ...
-    if search_value:
-        if where_clause != sql.SQL(''):
-            where_clause = where_clause + sql.SQL(' AND ')
+    # Add the order if needed
+    order_clauses = []
+    if order_col_name:
+        order_clauses.append(
+            OnTaskDBIdentifier(order_col_name)
+            + sql.SQL('' if order_asc else ' DESC'))
+    if key_name and key_name != order_col_name:
+        order_clauses.append(OnTaskDBIdentifier(key_name))
+    if order_clauses:
+        query = query + sql.SQL(' ORDER BY ') + sql.SQL(', ').join(
+            order_clauses)
+
+    # Restrict the query to the requested page
+    if limit is not None and limit >= 0:
+        query = query + sql.SQL(' LIMIT %s')
+        query_fields.append(limit)
+    if offset:
+        query = query + sql.SQL(' OFFSET %s')
+        query_fields.append(offset)
 
-        # Combine the search subqueries
-        if any_join:
-            conn_txt = ' OR '
-        else:
-            conn_txt = ' AND '
+    # Execute the query
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query, query_fields)
+        search_result = cursor.fetchall()
 
-        where_clause = where_clause + sql.SQL(conn_txt).join([
-            sql.SQL('(CAST ({0} AS TEXT) LIKE %s)').format(
-                OnTaskDBIdentifier(cname),
-            ) for cname in columns_to_search
-        ])
+    return search_result
 
-        query_fields += ['%' + search_value + '%'] * len(columns_to_search)
 
-    if where_clause != sql.SQL(''):
-        query = query + sql.SQL(' WHERE ') + where_clause
+def search_table_count(
+        table_name: str,
+        search_value: str,
+        columns_to_search: Optional[List] = None,
+        filter_formula: Optional[Dict] = None,
+        any_join: bool = True,
+        use_search_index: bool = False,
+) -> int:
+    """Count the rows selected by the same criteria used in search_table.
 
-    # Add the order if needed
-    if order_col_name:
-        query = query + sql.SQL(' ORDER BY {0}').format(
-            OnTaskDBIdentifier(order_col_name))
+    :param table_name: table name
+    :param search_value: String to search
+    :param columns_to_search: Columns in which to search the value
+    :param filter_formula: Optional filter condition to pre-filter the query
+    :param any_join: Boolean encoding if values should be combined with OR (or
+    AND)
+    :param use_search_index: Write the search so that it uses the search
+    index of the table
+    :return: Number of rows selected
+    """
+    where_clause, query_fields = _get_search_where_clause(
+        table_name,
+        search_value,
+        columns_to_search=columns_to_search,
+        filter_formula=filter_formula,
+        any_join=any_join,
+        use_search_index=use_search_index)
 
-        if not order_asc:
-            query = query + sql.SQL(' DESC')
+    query = sql.SQL('SELECT count(*) FROM {0}').format(
+        sql.Identifier(table_name)) + where_clause
 
-    # Execute the query
     with connection.connection.cursor() as cursor:
         cursor.execute(query, query_fields)
-        search_result = cursor.fetchall()
+        return cursor.fetchone()[0]
 
-    return search_result
+
+def _get_search_index_fields(table_name: str) -> List[str]:
+    """Get the query fields to select the search indices of a table.
+
+    :param table_name: Table name
+    :return: Quoted table name (for regclass) and pattern of the index
+    """
+    return [
+        sql.Identifier(table_name).as_string(connection.connection),
+        '%' + SEARCH_TEXT_FUNCTION + '(%']
+
+
+def get_search_index_columns(table_name: str) -> List[str]:
+    """Get the columns in the table with a search index.
+
+    :param table_name: Table name
+    :return: List of column names
+    """
+    query = sql.SQL(
+        'SELECT a.attname FROM pg_index i '
+        + 'JOIN pg_depend d ON d.classid = {0}::regclass '
+        + 'AND d.objid = i.indexrelid AND d.refobjsubid > 0 '
+        + 'JOIN pg_attribute a ON a.attrelid = d.refobjid '
+        + 'AND a.attnum = d.refobjsubid '
+        + 'WHERE i.indrelid = %s::regclass '
+        + 'AND pg_get_indexdef(i.indexrelid) LIKE %s').format(
+        sql.Literal('pg_class'))
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query, _get_search_index_fields(table_name))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _get_search_index_names(table_name: str) -> List[str]:
+    """Get the names of the search indices of a table.
+
+    :param table_name: Table name
+    :return: List of index names
+    """
+    query = sql.SQL(
+        'SELECT c.relname FROM pg_index i '
+        + 'JOIN pg_class c ON c.oid = i.indexrelid '
+        + 'WHERE i.indrelid = %s::regclass '
+        + 'AND pg_get_indexdef(i.indexrelid) LIKE %s')
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query, _get_search_index_fields(table_name))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_search_index(table_name: str, column_names: List[str]):
+    """Create the trigram index to search the content of the table.
+
+    A single GIN trigram index is created over the concatenated text of the
+    cells in the given columns, thus the searches performed with
+    use_search_index in search_table do not require a sequential scan.
+    Postgres maintains the index when rows are inserted, updated or deleted,
+    and drops it with the table. If the table already has an index over a
+    different set of columns, it is replaced.
+
+    :param table_name: Table name
+    :param column_names: Columns to index
+    :return: Nothing. Index is created in the DB
+    """
+    if (
+        len(_get_search_index_names(table_name)) == 1
+        and set(get_search_index_columns(table_name)) == set(column_names)
+    ):
+        return
+
+    delete_search_index(table_name)
+    if not column_names:
+        return
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(sql.SQL(
+            'CREATE INDEX ON {0} USING gin (({1}) gin_trgm_ops)').format(
+            sql.Identifier(table_name),
+            _get_search_text_expression(column_names)))
+
+
+def delete_search_index(table_name: str):
+    """Drop the trigram indices created to search the table.
+
+    :param table_name: Table name
+    :return: Nothing. Indices are dropped in the DB
+    """
+    with connection.connection.cursor() as cursor:
+        for index_name in _get_search_index_names(table_name):
+            cursor.execute(sql.SQL('DROP INDEX IF EXISTS {0}').format(
+                sql.Identifier(index_name)))
 
 
 def delete_table(table_name: str):
@@ -0,0 +1,205 @@
+"""Test the upload of a Canvas course with a local mock Canvas server."""
+import datetime
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from ontask import models, tests
+from ontask.dataops import services
+
+CANVAS_RESPONSES = {
+    '/api/v1/courses/1/enrollments': [{
+        'user': {'id': 1, 'name': 'Student One'},
+        'updated_at': '2024-01-01T00:00:00Z'}],
+    '/api/v1/courses/1/enrollments?page=2': [{
+        'user': {'id': 2, 'name': 'Student Two'},
+        'updated_at': '2024-03-01T00:00:00Z'}],
+    '/api/v1/courses/1/quizzes': [{'id': 10, 'assignment_id': 30}],
+    '/api/v1/courses/1/quizzes/10/questions': [
+        {'id': 100, 'question_name': '<p>Question</p>'}],
+    '/api/v1/courses/1/quizzes/10/statistics': {
+        'quiz_statistics': [{
+            'question_statistics': [{
+                'id': '100',
+                'question_type': 'multiple_choice_question',
+                'answers': [{
+                    'responses': 1,
+                    'user_ids': [1],
+                    'user_names': ['Student One'],
+                    'text': 'Yes'}]}]}]},
+    '/api/v1/courses/1/quizzes/10/submissions': {
+        'quiz_submissions': [{
+            'user_id': 1,
+            'attempt': 1,
+            'started_at': '2024-01-01T10:00:00Z',
+            'finished_at': '2024-01-01T10:30:00Z',
+            'kept_score': 5}]},
+    '/api/v1/courses/1/assignments': [{'id': 20}, {'id': 21}],
+    '/api/v1/courses/1/assignments/20/submissions': [{
+        'user_id': 2,
+        'attempt': 1,
+        'submitted_at': '2024-01-02T10:00:00Z',
+        'submission_type': 'online_text_entry',
+        'entered_score': 7}],
+    '/api/v1/courses/1/assignments/21/submissions': [],
+    '/api/v1/courses/1/students/submissions': [{
+        'assignment_id': 20,
+        'user_id': 2,
+        'attempt': 2,
+        'submitted_at': '2024-03-02T10:00:00Z',
+        'submission_type': 'online_text_entry',
+        'entered_score': 9}],
+}
+
+
+class MockCanvasHandler(BaseHTTPRequestHandler):
+    """Answer the Canvas API requests with the content of CANVAS_RESPONSES."""
+
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    requests = []
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        # Simulate the network latency
+        time.sleep(0.05)
+
+        path = self.path.split('?')[0]
+        if 'page=2' in self.path:
+            path += '?page=2'
+        content = json.dumps(CANVAS_RESPONSES[path]).encode()
+        etag = '"{0}"'.format(hashlib.sha256(content).hexdigest())
+        not_modified = self.headers.get('If-None-Match') == etag
+        with cls.lock:
+            cls.requests.append((self.path, 304 if not_modified else 200))
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-Rate-Limit-Remaining', '700.0')
+        self.send_header('ETag', etag)
+        if path == '/api/v1/courses/1/enrollments':
+            self.send_header(
+                'Link',
+                '<http://{0}:{1}{2}?page=2>; rel="next"'.format(
+                    *self.server.server_address,
+                    path))
+        self.end_headers()
+        if not not_modified:
+            self.wfile.write(content)
+
+        with cls.lock:
+            cls.active -= 1
+
+    def log_message(self, *args):
+        """Do not print the requests."""
+
+
+class DataopsCanvasUpload(tests.SimpleTableFixture, tests.OnTaskTestCase):
+    """Test the creation of a data frame from a mock Canvas server."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        MockCanvasHandler.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), MockCanvasHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        models.OAuthUserToken.objects.create(
+            user=self.user,
+            instance_name='Mock Canvas',
+            access_token='token',
+            refresh_token='refresh',
+            valid_until=timezone.now() + datetime.timedelta(days=1))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def _create_data_frame(self, changed_since=None):
+        canvas_info = {'Mock Canvas': {
+            'domain_port': 'http://{0}:{1}'.format(
+                *self.server.server_address)}}
+        with override_settings(
+            CANVAS_INFO_DICT=canvas_info,
+            CANVAS_API_CONCURRENCY=4,
+        ):
+            return services.create_df_from_canvas_course(
+                self.user,
+                'Mock Canvas',
+                1,
+                True,
+                True,
+                True,
+                False,
+                changed_since=changed_since)
+
+    def test(self):
+        data_frame = self._create_data_frame()
+
+        # Requests are executed concurrently
+        self.assertTrue(1 < MockCanvasHandler.max_active <= 4)
+
+        # Both pages of the enrollment are included
+        self.assertEqual(
+            sorted(data_frame['name'].tolist()),
+            ['Student One', 'Student Two'])
+        rows = data_frame.set_index('id')
+        self.assertEqual(rows.loc[1, '1_10_100 Question'], 'Yes')
+        self.assertEqual(rows.loc[1, '1_10 Score'], 5)
+        self.assertEqual(rows.loc[2, '1_20 Score'], 7)
+        self.assertEqual(
+            rows.loc[2, '1_20 Submission Type'],
+            'online_text_entry')
+
+    def test_incremental(self):
+        data_frame = self._create_data_frame('2024-02-01T00:00:00+00:00')
+
+        # Only the changed submissions are requested
+        paths = [path for path, __ in MockCanvasHandler.requests]
+        self.assertEqual(
+            len([path for path in paths if 'students/submissions' in path]),
+            2)
+        self.assertFalse(any('quizzes/10' in path for path in paths))
+        self.assertFalse(any('assignments' in path for path in paths))
+
+        # Only the student with changes is included
+        self.assertEqual(data_frame['id'].tolist(), [2])
+        self.assertEqual(data_frame['name'].tolist(), ['Student Two'])
+        self.assertEqual(data_frame['1_20 Score'].tolist(), [9])
+        self.assertNotIn('1_10 Score', data_frame.columns)
+
+        # The lists of students and quizzes are not transferred again
+        MockCanvasHandler.requests = []
+        second_data_frame = self._create_data_frame(
+            '2024-02-01T00:00:00+00:00')
+        self.assertEqual(
+            sorted(
+                path for path, response_status in MockCanvasHandler.requests
+                if response_status == 304),
+            [
+                '/api/v1/courses/1/enrollments?page=2',
+                '/api/v1/courses/1/enrollments?type=StudentEnrollment'
+                '&state=active&per_page=100',
+                '/api/v1/courses/1/quizzes?per_page=100'])
+        self.assertTrue(data_frame.equals(second_data_frame))
+
+    def test_incremental_submission_only(self):
+        # The enrollment of the student did not change, only the submission
+        data_frame = self._create_data_frame('2024-03-01T12:00:00+00:00')
+
+        self.assertEqual(data_frame['id'].tolist(), [2])
+        self.assertEqual(data_frame['name'].tolist(), ['Student Two'])
+        self.assertEqual(data_frame['1_20 Score'].tolist(), [9])
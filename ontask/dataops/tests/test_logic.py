@@ -1,6 +1,7 @@
 """Testing logic functions in the package."""
 import datetime
 import io
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 import pandas as pd
@@ -95,6 +96,55 @@ class DataopsMatrixEquivalentAfterSQL(DataopsMatrixBasic):
         assert df_source.equals(df_dst)
 
 
+class DataopsEngineIsReused(DataopsMatrixBasic):
+
+    def test(self):
+
+        df_source = services.load_df_from_csvfile(io.StringIO(self.csv1), 0, 0)
+
+        engine = pandas.get_engine()
+        for __ in range(3):
+            pandas.store_table(df_source, self.table_name)
+            pandas.load_table(self.table_name)
+
+        # Same engine, and all connections returned to the pool
+        self.assertEqual(engine, pandas.get_engine())
+        pool_status = pandas.get_engine_pool_status()
+        self.assertEqual(pool_status['checked_out'], 0)
+        self.assertTrue(pool_status['checked_in'] >= 1)
+
+
+class DataopsStoreTableCopyEquivalent(DataopsMatrixBasic):
+
+    def test(self):
+
+        df_source = services.load_df_from_csvfile(io.StringIO(self.csv1), 0, 0)
+
+        # Store the DF with COPY and with INSERT statements
+        pandas.store_table(df_source, self.table_name, bulk_copy=True)
+        df_copy = pandas.load_table(self.table_name)
+        pandas.store_table(df_source, self.table_name, bulk_copy=False)
+        df_insert = pandas.load_table(self.table_name)
+
+        # Both methods must produce identical tables
+        self.assertTrue(df_copy.equals(df_insert))
+
+    def test_integer_with_nan(self):
+        # Integer column stored by pandas as float64
+        df_source = pd.DataFrame({'key': [1, 2, 3], 'value': [3, None, 5]})
+
+        pandas.store_table(
+            df_source,
+            self.table_name,
+            dict_type={'key': 'integer', 'value': 'integer'})
+        self.assertEqual(
+            sql.get_df_column_types(self.table_name),
+            {'key': 'integer', 'value': 'integer'})
+        df_copy = pandas.load_table(self.table_name)
+        self.assertEqual(df_copy['key'].tolist(), [1, 2, 3])
+        self.assertEqual(df_copy['value'].dropna().tolist(), [3, 5])
+
+
 class DataopsMatrixMergeInner(DataopsMatrixBasic):
 
     def test(self):
@@ -120,6 +170,121 @@ class DataopsMatrixMergeInner(DataopsMatrixBasic):
         self.assertEquals(result, None)
 
 
+class DataopsTableMergeEquivalent(
+    tests.EmptyWorkflowFixture,
+    tests.OnTaskTestCase,
+):
+    """The merge in the database produces the same table as with pandas."""
+
+    dst_df = pd.DataFrame({
+        'key': [1, 2, 3, 4],
+        'name': ['n1', 'n2', 'n3', 'n4'],
+        'score': [1.5, 2.5, 3.5, 4.5],
+        'grade': [10, 20, 30, 40]})
+
+    src_df = pd.DataFrame({
+        'key': [3, 4, 5, 6],
+        'score': [13.5, None, 15.5, 16.5],
+        'grade': [13.5, 14.5, 15.5, 16.5],
+        'comment': ['c3', 'c4', None, 'c6']})
+
+    def _merge(self, how_merge: str, in_database: bool):
+        workflow = models.Workflow.objects.get(name=self.wflow_name)
+        workflow.flush()
+        pandas.store_dataframe(
+            self.dst_df,
+            models.Workflow.objects.get(name=self.wflow_name))
+
+        workflow = models.Workflow.objects.get(name=self.wflow_name)
+        pandas.store_table(self.src_df, workflow.get_upload_table_name())
+        merge_info = {
+            'initial_column_names': list(self.src_df.columns),
+            'rename_column_names': list(self.src_df.columns),
+            'columns_to_upload': [True] * len(self.src_df.columns),
+            'src_selected_key': 'key',
+            'dst_selected_key': 'key',
+            'how_merge': how_merge}
+        if in_database:
+            with mock.patch.object(
+                pandas,
+                'load_table',
+                wraps=pandas.load_table,
+            ) as load_table:
+                pandas.perform_table_upload_merge(workflow, merge_info)
+            load_table.assert_not_called()
+        else:
+            pandas.perform_dataframe_upload_merge(
+                workflow,
+                pandas.load_table(workflow.get_data_frame_table_name()),
+                pandas.load_table(workflow.get_upload_table_name()),
+                merge_info)
+
+        workflow = models.Workflow.objects.get(name=self.wflow_name)
+        data_frame = pandas.load_table(workflow.get_data_frame_table_name())
+        self.assertEqual(workflow.nrows, data_frame.shape[0])
+        return (
+            data_frame[sorted(data_frame.columns)].sort_values(
+                'key').reset_index(drop=True),
+            {
+                col.name: (col.data_type, col.is_key)
+                for col in workflow.columns.all()})
+
+    def test(self):
+        for how_merge in ['inner', 'outer', 'left', 'right']:
+            sql_df, sql_columns = self._merge(how_merge, True)
+            pandas_df, pandas_columns = self._merge(how_merge, False)
+
+            pd.testing.assert_frame_equal(
+                sql_df,
+                pandas_df,
+                check_dtype=False)
+            self.assertEqual(sql_columns, pandas_columns)
+
+
+class DataopsVerifyDataFrameColumns(
+    tests.EmptyWorkflowFixture,
+    tests.OnTaskTestCase,
+):
+    """All the problems in the data frame columns are reported."""
+
+    def test(self):
+        pandas.store_dataframe(
+            pd.DataFrame({
+                'key': [1, 2, 3],
+                'grade': ['A', 'B', None],
+                'passed': [True, False, None],
+                'score': [1.5, 2.5, 3.5]}),
+            self.workflow)
+        grade = self.workflow.columns.get(name='grade')
+        grade.set_categories(['A', 'B'])
+        self.workflow = models.Workflow.objects.get(id=self.workflow.id)
+
+        # Correct values
+        self.assertEqual(
+            pandas.get_dataframe_column_errors(
+                self.workflow.columns.all(),
+                pd.DataFrame({
+                    'key': [1, 2, 4],
+                    'grade': ['B', '', None],
+                    'passed': [None, True, True],
+                    'score': [1.5, 2.5, None]})),
+            [])
+
+        # One error in each column
+        errors = pandas.get_dataframe_column_errors(
+            self.workflow.columns.all(),
+            pd.DataFrame({
+                'key': [1, 1, 4],
+                'grade': ['A', 'C', None],
+                'passed': [True, 'no', None],
+                'score': ['1.5', '2.5', None]}))
+        self.assertEqual(len(errors), 4)
+        for cname in ['key', 'grade', 'passed', 'score']:
+            self.assertTrue(any(
+                'column {0} '.format(cname) in error.lower()
+                for error in errors))
+
+
 class FormulaEvaluation(tests.OnTaskTestCase):
     skel = {
         'condition': 'AND',
@@ -153,6 +318,14 @@ class FormulaEvaluation(tests.OnTaskTestCase):
         self.skel['rules'][0]['value'] = value
         return self.skel
 
+    def evaluate_exp(self, node, given_variables):
+        """Evaluate the formula and check the compiled version agrees."""
+        result = formula.evaluate(node, formula.EVAL_EXP, given_variables)
+        self.assertEqual(
+            formula.compile_formula(node)(given_variables),
+            result)
+        return result
+
     def do_operand(
         self,
         input_value,
@@ -163,22 +336,20 @@ class FormulaEvaluation(tests.OnTaskTestCase):
         value3
     ):
 
-        result1 = formula.evaluate(
+        result1 = self.evaluate_exp(
             self.set_skel(
                 input_value,
                 op_value.format(''),
                 type_value,
                 value1),
-            formula.EVAL_EXP,
             {'variable': value2}
         )
-        result2 = formula.evaluate(
+        result2 = self.evaluate_exp(
             self.set_skel(
                 input_value,
                 op_value.format(''),
                 type_value,
                 value1),
-            formula.EVAL_EXP,
             {'variable': value3}
         )
 
@@ -192,22 +363,20 @@ class FormulaEvaluation(tests.OnTaskTestCase):
         self.assertFalse(result2)
 
         if op_value.find('{0}') != -1:
-            result1 = formula.evaluate(
+            result1 = self.evaluate_exp(
                 self.set_skel(
                     input_value,
                     op_value.format('not_'),
                     type_value,
                     value1),
-                formula.EVAL_EXP,
                 {'variable': value2}
             )
-            result2 = formula.evaluate(
+            result2 = self.evaluate_exp(
                 self.set_skel(
                     input_value,
                     op_value.format('not_'),
                     type_value,
                     value1),
-                formula.EVAL_EXP,
                 {'variable': value3}
             )
 
@@ -698,6 +867,256 @@ class ConditionSetEvaluation(
             assert cond_eval1 == cond_eval2
 
 
+class ConditionSetSQLEvaluation(
+    tests.TestConditionEvaluationFixture,
+    tests.OnTaskTestCase,
+):
+    action_name = 'Test action'
+
+    def test(self):
+        # Get the action first
+        self.action = models.Action.objects.get(name=self.action_name)
+
+        wflow_table = self.action.workflow.get_data_frame_table_name()
+        filter_formula = self.action.get_filter_formula()
+        column_names = self.action.workflow.get_column_names()
+        conditions = self.action.conditions.all()
+
+        # Rows with the condition values evaluated in SQL
+        qs = sql.get_rows_with_conditions(
+            wflow_table,
+            column_names,
+            [cond.formula for cond in conditions],
+            filter_formula=filter_formula)
+
+        # The SQL evaluation must be identical to the python evaluation
+        ncols = len(column_names)
+        for row in qs:
+            row_values = dict(zip(column_names, row[:ncols]))
+            self.assertEqual(
+                list(row[ncols:]),
+                [
+                    formula.evaluate(
+                        cond.formula,
+                        formula.EVAL_EXP,
+                        row_values)
+                    for cond in conditions])
+
+    def test_null_values(self):
+        """Operands with null values are false (as in EVAL_EXP)."""
+        table_name = 'TEST_NULL_TABLE'
+        pandas.store_table(
+            pd.DataFrame({
+                'v_string': ['abc', '', None],
+                'v_integer': [1, 2, None]}),
+            table_name)
+
+        operand_values = [
+            ('string', 'v_string', 'equal', 'abc'),
+            ('string', 'v_string', 'not_equal', 'abc'),
+            ('string', 'v_string', 'begins_with', 'a'),
+            ('string', 'v_string', 'not_begins_with', 'a'),
+            ('string', 'v_string', 'contains', 'b'),
+            ('string', 'v_string', 'not_contains', 'b'),
+            ('string', 'v_string', 'ends_with', 'c'),
+            ('string', 'v_string', 'not_ends_with', 'c'),
+            ('string', 'v_string', 'is_empty', None),
+            ('string', 'v_string', 'is_not_empty', None),
+            ('string', 'v_string', 'is_null', None),
+            ('string', 'v_string', 'is_not_null', None),
+            ('integer', 'v_integer', 'equal', '1'),
+            ('integer', 'v_integer', 'not_equal', '1'),
+            ('integer', 'v_integer', 'less', '2'),
+            ('integer', 'v_integer', 'greater_or_equal', '2'),
+            ('integer', 'v_integer', 'between', ['1', '1']),
+            ('integer', 'v_integer', 'not_between', ['1', '1'])]
+        cond_formulas = []
+        for data_type, cname, operator, value in operand_values:
+            for negate in [False, True]:
+                cond_formulas.append({
+                    'condition': 'AND',
+                    'not': negate,
+                    'rules': [{
+                        'field': cname,
+                        'id': cname,
+                        'input': 'text',
+                        'operator': operator,
+                        'type': data_type,
+                        'value': value}],
+                    'valid': True})
+
+        column_names = ['v_string', 'v_integer']
+        rows = list(sql.get_rows_with_conditions(
+            table_name,
+            column_names,
+            cond_formulas))
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            row_values = dict(zip(column_names, row[:2]))
+            self.assertEqual(
+                list(row[2:]),
+                [
+                    formula.evaluate(
+                        cond_formula,
+                        formula.EVAL_EXP,
+                        row_values)
+                    for cond_formula in cond_formulas])
+
+
+class ConditionCompiledFormulaCache(
+    tests.TestConditionEvaluationFixture,
+    tests.OnTaskTestCase,
+):
+    action_name = 'Test action'
+
+    def test(self):
+        action = models.Action.objects.get(name=self.action_name)
+        data_frame = pandas.load_table(
+            action.workflow.get_data_frame_table_name())
+        row_values = data_frame.iloc[0].to_dict()
+
+        for cond in action.conditions.all():
+            self.assertEqual(
+                cond.evaluate_row(row_values),
+                formula.evaluate(cond.formula, formula.EVAL_EXP, row_values))
+
+            # Negate the formula, the cached compiled version is discarded
+            result = cond.evaluate_row(row_values)
+            cond.formula = {
+                'condition': 'AND',
+                'not': True,
+                'rules': [cond.formula],
+                'valid': True}
+            cond.save()
+            self.assertEqual(cond.evaluate_row(row_values), not result)
+
+
+class ConditionSelectedCountIsLazy(
+    tests.TestConditionEvaluationFixture,
+    tests.OnTaskTestCase,
+):
+    action_name = 'Test action 2'
+
+    def test(self):
+        action = models.Action.objects.get(name=self.action_name)
+        workflow = action.workflow
+        action.update_selected_row_counts()
+        counts = [cond.selected_count for cond in action.conditions.all()]
+        filter_count = action.filter.selected_count
+
+        # Edits flag the counts as stale without recomputing them
+        workflow.mark_selected_counts_stale()
+        action.refresh_from_db()
+        self.assertEqual(action.filter.selected_count, -1)
+        self.assertTrue(all(
+            cond.selected_count == -1 for cond in action.conditions.all()))
+        self.assertIsNone(action.rows_all_false)
+
+        # A single refresh restores the values
+        action.refresh_selected_row_counts()
+        action.refresh_from_db()
+        self.assertEqual(action.filter.selected_count, filter_count)
+        self.assertEqual(
+            [cond.selected_count for cond in action.conditions.all()],
+            counts)
+
+        # Columns not used in any formula leave the counts untouched
+        workflow.mark_selected_counts_stale(['__not_a_column__'])
+        action.refresh_from_db()
+        self.assertEqual(action.filter.selected_count, filter_count)
+
+        # Counts marked as stale during the recount are not overwritten
+        get_counts = sql.get_selected_row_counts
+
+        def mark_stale_while_counting(*args, **kwargs):
+            result = get_counts(*args, **kwargs)
+            workflow.increase_table_version()
+            workflow.mark_selected_counts_stale()
+            return result
+
+        with mock.patch.object(
+            sql,
+            'get_selected_row_counts',
+            side_effect=mark_stale_while_counting,
+        ):
+            action.update_selected_row_counts()
+        action.refresh_from_db()
+        self.assertEqual(action.filter.selected_count, -1)
+        self.assertTrue(all(
+            cond.selected_count == -1 for cond in action.conditions.all()))
+
+
+class ConditionSelectedCountSingleQuery(
+    tests.TestConditionEvaluationFixture,
+    tests.OnTaskTestCase,
+):
+    action_name = 'Test action 2'
+
+    def test(self):
+        action = models.Action.objects.get(name=self.action_name)
+        wflow_table = action.workflow.get_data_frame_table_name()
+        filter_formula = action.get_filter_formula()
+        action.update_selected_row_counts()
+        action.refresh_from_db()
+
+        # Counts are identical to those obtained with one query per condition
+        self.assertEqual(
+            action.filter.selected_count,
+            sql.get_num_rows(wflow_table, filter_formula))
+        for cond in action.conditions.all():
+            self.assertEqual(
+                cond.selected_count,
+                sql.get_num_rows(
+                    wflow_table,
+                    {
+                        'condition': 'AND',
+                        'not': False,
+                        'rules': [filter_formula, cond.formula],
+                        'valid': True}))
+
+        # Rows with all conditions false
+        self.assertEqual(
+            action.rows_all_false,
+            action.get_row_all_false_count())
+        column_names = action.workflow.get_column_names()
+        n_all_false = sum(
+            not any(
+                formula.evaluate(
+                    cond.formula,
+                    formula.EVAL_EXP,
+                    dict(zip(column_names, row)))
+                for cond in action.conditions.all())
+            for row in sql.get_rows(
+                wflow_table,
+                column_names=column_names,
+                filter_formula=filter_formula))
+        self.assertEqual(len(action.rows_all_false), n_all_false)
+
+
+class DataopsRowByIndex(tests.SimpleTableFixture, tests.OnTaskTestCase):
+    """Test that the rows are fetched one by one sorted by the key."""
+
+    def test(self):
+        workflow = models.Workflow.objects.get(name=self.wflow_name)
+        key_name = workflow.get_row_order_column()
+        self.assertIsNotNone(key_name)
+
+        keys = sorted(
+            row[0] for row in sql.get_rows(
+                workflow.get_data_frame_table_name(),
+                column_names=[key_name]))
+        for idx, key_value in enumerate(keys):
+            row = sql.get_table_row_by_index(workflow, None, idx + 1)
+            self.assertEqual(row[key_name], key_value)
+            self.assertEqual(
+                list(row.keys()),
+                workflow.get_column_names())
+
+        self.assertIsNone(
+            sql.get_table_row_by_index(workflow, None, len(keys) + 1))
+        self.assertIsNone(sql.get_table_row_by_index(workflow, None, 0))
+
+
 class ConditionNameWithSymbols(
     tests.SymbolsInConditionNameFixture,
     tests.OnTaskTestCase,
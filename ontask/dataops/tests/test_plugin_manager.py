@@ -1,10 +1,15 @@
 """Test plugin manager functions."""
+from unittest import mock
 
+from django.db import connection
+import pandas as pd
 from rest_framework import status
 
 from ontask import models, tests
+from ontask.dataops import pandas
 from ontask.dataops.plugin import OnTaskModel
 from ontask.dataops.services.plugin_admin import _verify_plugin
+from ontask.dataops.services.plugin_execute import _execute_plugin
 
 
 class BogusPlugin:
@@ -56,3 +61,103 @@ class DataopsPluginErrors(tests.OnTaskTestCase):
         self.assertTrue(tests[4][0] != 'Ok')
         self.assertTrue(tests[5][0] != 'Ok')
         self.assertTrue(tests[6][0] != 'Ok')
+
+
+class DataopsPluginExecution(
+    tests.PluginExecutionFixture,
+    tests.OnTaskTestCase,
+):
+    """Test that the plugin results are stored without reloading the table."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    def test(self):
+        plugin_info = models.Plugin.objects.get(filename='test_plugin_1')
+        with mock.patch.object(
+            pandas,
+            'load_table',
+            wraps=pandas.load_table,
+        ) as load_table, mock.patch.object(
+            pandas,
+            'store_dataframe',
+            wraps=pandas.store_dataframe,
+        ) as store_dataframe:
+            # New columns
+            _execute_plugin(
+                self.workflow,
+                plugin_info,
+                ['A1'],
+                ['RESULT 1', 'RESULT 2'],
+                '',
+                'email',
+                {})
+
+            # Existing column
+            _execute_plugin(
+                self.workflow,
+                plugin_info,
+                ['A1'],
+                ['A2', 'RESULT 3'],
+                '',
+                'email',
+                {})
+
+        # Only the key and the input column are loaded
+        self.assertEqual(load_table.call_count, 2)
+        for call in load_table.call_args_list:
+            self.assertEqual(call.kwargs['columns'], ['email', 'A1'])
+        store_dataframe.assert_not_called()
+
+        self.workflow.refresh_from_db()
+        self.assertEqual(self.workflow.ncols, 7)
+        column = self.workflow.columns.get(name='RESULT 1')
+        self.assertEqual(column.data_type, 'integer')
+        self.assertFalse(column.is_key)
+
+        data_frame = pandas.load_table(
+            self.workflow.get_data_frame_table_name())
+        self.assertTrue((data_frame['RESULT 1'] == 1).all())
+        self.assertTrue((data_frame['RESULT 2'] == 2).all())
+        self.assertTrue((data_frame['A2'] == 1).all())
+        self.assertTrue((data_frame['RESULT 3'] == 2).all())
+        self.assertEqual(
+            data_frame.set_index('email')['student id'].to_dict(),
+            {
+                'fake_addess1@bogus.com': 111,
+                'fake_addess2@bogus.com': 222,
+                'fake_addess3@bogus.com': 333})
+
+    def test_datetime_output(self):
+        """Datetime results keep their time zone in the new columns."""
+        data_frame = pandas.load_table(
+            self.workflow.get_data_frame_table_name(),
+            columns=['email'])
+        dates = pd.Series(
+            pd.Timestamp('2024-03-01 10:30:00', tz='Australia/Sydney'),
+            index=data_frame.index)
+        data_frame['RESULT DATE'] = dates
+
+        self.assertTrue(pandas.store_dataframe_columns(
+            self.workflow,
+            data_frame,
+            'email'))
+
+        with connection.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT data_type FROM information_schema.columns '
+                + 'WHERE table_name = %s AND column_name = %s',
+                [self.workflow.get_data_frame_table_name(), 'RESULT DATE'])
+            self.assertEqual(
+                cursor.fetchone()[0],
+                'timestamp with time zone')
+
+        self.assertEqual(
+            self.workflow.columns.get(name='RESULT DATE').data_type,
+            'datetime')
+        result = pandas.load_table(
+            self.workflow.get_data_frame_table_name(),
+            columns=['RESULT DATE'])
+        self.assertTrue((
+            pd.to_datetime(result['RESULT DATE'], utc=True)
+            == pd.Timestamp('2024-02-29 23:30:00', tz='UTC')).all())
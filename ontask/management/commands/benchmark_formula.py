@@ -0,0 +1,107 @@
+"""Command to compare the interpreted and compiled evaluation of formulas."""
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from ontask.dataops import formula
+
+# Operator, type, constant and value of the variable for each benchmark
+BENCHMARK_OPERANDS = [
+    ('equal', 'integer', '3', 3),
+    ('not_equal', 'double', '3.5', 2.5),
+    ('begins_with', 'string', 'abc', 'abcdef'),
+    ('not_begins_with', 'string', 'abc', 'xabcdef'),
+    ('contains', 'string', 'cd', 'abcdef'),
+    ('not_contains', 'string', 'xy', 'abcdef'),
+    ('ends_with', 'string', 'def', 'abcdef'),
+    ('not_ends_with', 'string', 'xyz', 'abcdef'),
+    ('is_empty', 'string', None, ''),
+    ('is_not_empty', 'string', None, 'abc'),
+    ('is_null', 'string', None, None),
+    ('is_not_null', 'string', None, 'abc'),
+    ('less', 'integer', '10', 3),
+    ('less_or_equal', 'double', '10.5', 10.5),
+    ('greater', 'integer', '1', 3),
+    ('greater_or_equal', 'datetime', '2020-01-01T00:00:00+00:00',
+     datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)),
+    ('between', 'integer', ['1', '10'], 3),
+    ('not_between', 'double', ['1.0', '2.0'], 3.5),
+]
+
+
+def create_benchmark_formula(operator: str, type_value: str, value) -> dict:
+    """Create a formula with a single rule using the given operator.
+
+    :param operator: Name of the operator
+    :param type_value: Data type of the variable
+    :param value: Constant in the formula
+    :return: Formula
+    """
+    return {
+        'condition': 'AND',
+        'not': False,
+        'rules': [{
+            'id': 'variable',
+            'field': 'variable',
+            'input': 'text',
+            'operator': operator,
+            'type': type_value,
+            'value': value}],
+        'valid': True}
+
+
+class Command(BaseCommand):
+    """Class implementing the command to benchmark formula evaluation."""
+
+    help = """This command evaluates a formula with each of the operators
+    available in the conditions with the interpreted (formula.evaluate) and
+    the compiled (formula.compile_formula) versions, and prints the time
+    required by each method."""
+
+    def add_arguments(self, parser):
+        """Parse the arguments."""
+        parser.add_argument(
+            '-n',
+            '--iterations',
+            type=int,
+            default=100000,
+            help='Number of evaluations for each operator')
+
+    def handle(self, *args, **options):
+        """Execute the command, evaluate the formulas, show the times.
+
+        :param args: Arguments (not used)
+        :param options: Dictionary with the number of iterations
+        :return: Nothing
+        """
+        iterations = options['iterations']
+        self.stdout.write('{0:>18} {1:>16} {2:>14} {3:>8}'.format(
+            'operator',
+            'interpreted (s)',
+            'compiled (s)',
+            'speedup'))
+        for operator, type_value, value, var_value in BENCHMARK_OPERANDS:
+            node = create_benchmark_formula(operator, type_value, value)
+            row_values = {'variable': var_value}
+
+            start = time.perf_counter()
+            for __ in range(iterations):
+                formula.evaluate(node, formula.EVAL_EXP, row_values)
+            interpreted = time.perf_counter() - start
+
+            start = time.perf_counter()
+            compiled_formula = formula.get_compiled_formula(
+                ('benchmark', operator),
+                None,
+                node)
+            for __ in range(iterations):
+                compiled_formula(row_values)
+            compiled = time.perf_counter() - start
+
+            self.stdout.write(
+                '{0:>18} {1:>16.3f} {2:>14.3f} {3:>7.1f}x'.format(
+                    operator,
+                    interpreted,
+                    compiled,
+                    interpreted / compiled if compiled else 0))
@@ -0,0 +1,68 @@
+"""Command to compare the methods to store a data frame in the DB."""
+import time
+
+from django.core.management.base import BaseCommand
+import numpy as np
+import pandas as pd
+
+from ontask.dataops import pandas as ontask_pandas, sql
+
+BENCHMARK_TABLE_NAME = '__ONTASK_BENCHMARK_STORE_TABLE'
+
+
+def create_benchmark_data_frame(nrows: int) -> pd.DataFrame:
+    """Create a synthetic data frame with one column of each type.
+
+    :param nrows: Number of rows in the data frame
+    :return: Data frame
+    """
+    rng = np.random.default_rng(seed=0)
+    return pd.DataFrame({
+        'key': np.arange(nrows),
+        'email': ['student{0}@bogus.com'.format(idx) for idx in range(nrows)],
+        'score': rng.random(nrows) * 100,
+        'attempts': rng.integers(0, 10, nrows),
+        'passed': rng.random(nrows) > 0.5,
+        'submitted': pd.Timestamp('2024-01-01', tz='UTC') + pd.to_timedelta(
+            rng.integers(0, 86400 * 30, nrows),
+            unit='s')})
+
+
+class Command(BaseCommand):
+    """Class implementing the command to benchmark store_table."""
+
+    help = """This command stores synthetic data frames of increasing size in
+    the database with COPY FROM STDIN and with DataFrame.to_sql INSERT
+    statements, and prints the time required by each method."""
+
+    def add_arguments(self, parser):
+        """Parse the arguments."""
+        parser.add_argument(
+            '-r',
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10000, 100000, 1000000],
+            help='Number of rows of the data frames to store')
+
+    def handle(self, *args, **options):
+        """Execute the command, store the data frames, show the times."""
+        self.stdout.write('{0:>10} {1:>12} {2:>12}'.format(
+            'rows',
+            'copy (s)',
+            'to_sql (s)'))
+        for nrows in options['rows']:
+            data_frame = create_benchmark_data_frame(nrows)
+            times = []
+            for bulk_copy in [True, False]:
+                start = time.perf_counter()
+                ontask_pandas.store_table(
+                    data_frame,
+                    BENCHMARK_TABLE_NAME,
+                    bulk_copy=bulk_copy)
+                times.append(time.perf_counter() - start)
+                sql.delete_table(BENCHMARK_TABLE_NAME)
+
+            self.stdout.write('{0:>10} {1:>12.3f} {2:>12.3f}'.format(
+                nrows,
+                *times))
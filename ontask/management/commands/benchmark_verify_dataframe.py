@@ -0,0 +1,178 @@
+"""Command to measure the verification of a data frame before it is stored."""
+import time
+from typing import List, Tuple
+
+from django.core.management.base import BaseCommand
+import numpy as np
+import pandas as pd
+
+from ontask import models
+from ontask.dataops import pandas as ontask_pandas
+
+# Data types of the synthetic columns (assigned in turns)
+BENCHMARK_COLUMN_TYPES = ['integer', 'double', 'string', 'boolean', 'datetime']
+
+# Categories used in the string columns
+BENCHMARK_CATEGORIES = ['A', 'B', 'C', 'D', 'E']
+
+
+# Functions to generate the values of each data type
+_BENCHMARK_GENERATORS = {
+    'integer': lambda rng, nrows: rng.integers(0, 100, nrows),
+    'double': lambda rng, nrows: rng.random(nrows) * 100,
+    'string': lambda rng, nrows: rng.choice(
+        BENCHMARK_CATEGORIES,
+        nrows).astype(object),
+    'boolean': lambda rng, nrows: rng.choice(
+        np.array([True, False, None], dtype=object),
+        nrows),
+    'datetime': lambda rng, nrows: pd.Timestamp('2024-01-01', tz='UTC') + (
+        pd.to_timedelta(rng.integers(0, 86400 * 30, nrows), unit='s')),
+}
+
+
+def create_benchmark_columns(
+    nrows: int,
+    ncols: int,
+) -> Tuple[List[models.Column], pd.DataFrame]:
+    """Create a synthetic data frame and the columns describing it.
+
+    The first column is a key, half of the string columns have categories
+    and the boolean columns are of type object with True/False/None.
+
+    :param nrows: Number of rows in the data frame
+    :param ncols: Number of columns in the data frame
+    :return: List of (unsaved) columns and data frame
+    """
+    rng = np.random.default_rng(seed=0)
+    columns = [models.Column(name='key', data_type='integer', is_key=True)]
+    data = {'key': np.arange(nrows)}
+    for idx in range(1, ncols):
+        data_type = BENCHMARK_COLUMN_TYPES[idx % len(BENCHMARK_COLUMN_TYPES)]
+        cname = '{0}_{1}'.format(data_type, idx)
+        data[cname] = _BENCHMARK_GENERATORS[data_type](rng, nrows)
+        columns.append(models.Column(
+            name=cname,
+            data_type=data_type,
+            categories=(
+                BENCHMARK_CATEGORIES
+                if data_type == 'string' and idx % 2 else [])))
+
+    return columns, pd.DataFrame(data)
+
+
+def get_dataframe_column_errors_per_cell(
+    columns: List[models.Column],
+    data_frame: pd.DataFrame,
+) -> List[str]:
+    """Check the data frame traversing its cells (previous version).
+
+    :param columns: Columns to check
+    :param data_frame: Data frame to check
+    :return: List of columns with errors
+    """
+    errors = []
+    for col in columns:
+        # All the checks are performed (as in the previous version)
+        errors += [
+            col.name for has_error in [
+                col.is_key and not ontask_pandas.is_unique_series(
+                    data_frame[col.name]),
+                _has_type_error_per_cell(col, data_frame[col.name]),
+                _has_category_error_per_cell(col, data_frame[col.name])]
+            if has_error]
+
+    return errors
+
+
+def _has_type_error_per_cell(col: models.Column, series: pd.Series) -> bool:
+    """Check the data type of the column traversing its cells.
+
+    :param col: Column to check
+    :param series: Values of the column
+    :return: True if the type is not compatible
+    """
+    df_col_type = ontask_pandas.datatype_names.get(series.dtype.name)
+    if col.data_type == 'boolean' and df_col_type == 'string':
+        column_data_types = {
+            type(row_value)
+            for row_value in series
+            if not isinstance(row_value, float) and row_value is not None
+        }
+        return len(column_data_types) != 1 or column_data_types.pop() != bool
+
+    return col.data_type != df_col_type
+
+
+def _has_category_error_per_cell(
+    col: models.Column,
+    series: pd.Series,
+) -> bool:
+    """Check the categories of the column traversing its cells.
+
+    :param col: Column to check
+    :param series: Values of the column
+    :return: True if any value is not in the categories
+    """
+    return bool(col.categories) and not all(
+        row_val in col.get_categories() for row_val in series
+        if row_val and not pd.isnull(row_val))
+
+
+class Command(BaseCommand):
+    """Class implementing the command to benchmark the verification."""
+
+    help = """This command checks a synthetic data frame (by default with
+    100000 rows and 200 columns) against the description of its columns
+    traversing its cells and with the vectorized checks used before storing
+    a data frame, and prints the time required by each method."""
+
+    def add_arguments(self, parser):
+        """Parse the arguments."""
+        parser.add_argument(
+            '-r',
+            '--rows',
+            type=int,
+            default=100000,
+            help='Number of rows of the data frame')
+        parser.add_argument(
+            '-c',
+            '--columns',
+            type=int,
+            default=200,
+            help='Number of columns of the data frame')
+
+    def handle(self, *args, **options):
+        """Execute the command, verify the data frame, show the times.
+
+        :param args: Arguments (not used)
+        :param options: Dictionary with the number of rows and columns
+        :return: Nothing
+        """
+        columns, data_frame = create_benchmark_columns(
+            options['rows'],
+            options['columns'])
+
+        start = time.perf_counter()
+        get_dataframe_column_errors_per_cell(columns, data_frame)
+        per_cell = time.perf_counter() - start
+
+        start = time.perf_counter()
+        errors = ontask_pandas.get_dataframe_column_errors(columns, data_frame)
+        vectorized = time.perf_counter() - start
+
+        self.stdout.write('{0:>10} {1:>8} {2:>14} {3:>15} {4:>8}'.format(
+            'rows',
+            'columns',
+            'per cell (s)',
+            'vectorized (s)',
+            'speedup'))
+        self.stdout.write(
+            '{0:>10} {1:>8} {2:>14.3f} {3:>15.3f} {4:>7.1f}x'.format(
+                options['rows'],
+                options['columns'],
+                per_cell,
+                vectorized,
+                per_cell / vectorized if vectorized else 0))
+        for error in errors:
+            self.stdout.write(error)
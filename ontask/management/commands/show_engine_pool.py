@@ -0,0 +1,23 @@
+"""Command to show the status of the DB engine connection pool."""
+from django.core.management.base import BaseCommand
+
+from ontask.dataops import pandas
+
+
+class Command(BaseCommand):
+    """Class implementing a command to show the engine pool status."""
+
+    help = """This command prints the status of the connection pool used by
+    the SQLAlchemy engine that loads and stores the workflow tables (size,
+    connections checked in, checked out and in overflow).
+    """
+
+    def handle(self, *args, **options):
+        """Execute command to show the engine pool status.
+
+        :param args: Arguments given to the command (None!)
+        :param options: Options parsed
+        :return: Nothing
+        """
+        for key, value in pandas.get_engine_pool_status().items():
+            self.stdout.write('{0}: {1}'.format(key, value))
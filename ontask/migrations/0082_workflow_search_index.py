@@ -0,0 +1,32 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:12
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ontask', '0081_alter_log_name_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # Function to translate the cells to text in the search index (see
+        # 0083 for the version for timestamps with time zone).
+        migrations.RunSQL(
+            sql='CREATE OR REPLACE FUNCTION ontask_search_text(anyelement) '
+                'RETURNS text AS $$ SELECT CAST($1 AS TEXT) $$ '
+                'LANGUAGE SQL IMMUTABLE PARALLEL SAFE',
+            reverse_sql='DROP FUNCTION IF EXISTS '
+                        'ontask_search_text(anyelement)'),
+        migrations.AddField(
+            model_name='workflow',
+            name='search_index',
+            field=models.BooleanField(
+                default=False,
+                help_text='Index the table to speed up searches in large '
+                          'tables',
+                verbose_name='Create search index'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ontask', '0082_workflow_search_index'),
+    ]
+
+    operations = [
+        # The text representation of timestamps with time zone depends on the
+        # session time zone, so they are formatted explicitly in UTC for the
+        # function to be immutable.
+        migrations.RunSQL(
+            sql='CREATE OR REPLACE FUNCTION '
+                'ontask_search_text(timestamp with time zone) '
+                'RETURNS text AS $$ SELECT '
+                "to_char($1 AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS') "
+                "|| rtrim(rtrim(to_char($1 AT TIME ZONE 'UTC', '.US'), "
+                "'0'), '.') || '+00' $$ "
+                'LANGUAGE SQL IMMUTABLE PARALLEL SAFE',
+            reverse_sql='DROP FUNCTION IF EXISTS '
+                        'ontask_search_text(timestamp with time zone)'),
+    ]
@@ -9,7 +9,7 @@ from ontask.models.common import (
 )
 from ontask.models.condition import ConditionBase, Condition, Filter
 from ontask.models.connection import Connection
-from ontask.models.logs import Log
+from ontask.models.logs import Log, LogBuffer
 from ontask.models.oauth import OAuthUserToken
 from ontask.models.plugin import Plugin
 from ontask.models.profiles import Profile
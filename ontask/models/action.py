@@ -18,8 +18,8 @@ from ontask.dataops import formula, sql
 from ontask.models.actioncolumnconditiontuple import ActionColumnConditionTuple
 from ontask.models.column import Column
 from ontask.models.common import CreateModifyFields, NameAndDescription
-from ontask.models.condition import Filter
-from ontask.models.logs import Log
+from ontask.models.condition import Condition, Filter
+from ontask.models.logs import Log, LogBuffer
 from ontask.models.view import View
 from ontask.models.workflow import Workflow
 
@@ -162,7 +162,7 @@ class ActionBase(NameAndDescription, CreateModifyFields):
         if not self.filter:
             return self.workflow.nrows
 
-        return self.filter.selected_count
+        return self.filter.refresh_selected_count()
 
     def get_row_all_false_count(self) -> List[int]:
         """Extract the rows for which  all conditions are false.
@@ -182,54 +182,105 @@ class ActionBase(NameAndDescription, CreateModifyFields):
                 # Condition list is either None or empty. No restrictions.
                 return []
 
-            # Separate filter from conditions
-            cond_list = self.conditions.all()
-
-            # Workflow has a data frame and condition list is non-empty
-
-            # Get the list of indexes
-            self.rows_all_false = sql.select_ids_all_false(
-                self.workflow.get_data_frame_table_name(),
-                self.filter.formula if self.filter else None,
-                cond_list.values_list('_formula', flat=True),
-            )
-
-            self.save(update_fields=['rows_all_false'])
+            # The list is calculated together with the counts
+            self.update_selected_row_counts()
 
         return self.rows_all_false
 
     def update_selected_row_counts(self, column: Optional[Column] = None):
         """Reset the field selected_count in filter and all conditions.
 
-        If the column argument is present, select only those conditions that
-        have column as part of their variables.
+        The number of rows selected by the filter, by each condition, and the
+        rows with all conditions false are calculated with a single query.
+        If the column argument is present, the counts are only updated if the
+        filter or a condition has column as part of their variables. The
+        counts are not stored if the table changed while they were computed
+        (they remain marked as stale).
 
-        :param column: Optional column name to process only those conditions
-        that use this column
+        :param column: Optional column name to process only if the filter or
+        the conditions use this column
 
-        :return: All conditions (except the filter) are updated
+        :return: Filter, conditions and rows_all_false are updated
         """
-
-        if self.filter and (
-                column is None or column in self.conditions.columns.all()
+        conditions = list(self.conditions.all())
+        if column and not (
+            (self.filter and self.filter.columns.filter(pk=column.pk).exists())
+            or self.conditions.filter(columns=column).exists()
         ):
-            # Recalculate number of selected rows for the filter
-            old_count = self.filter.selected_count
-            self.filter.save()
-            if old_count != self.filter.selected_count:
-                # If filter rows have changed, flush the rows_all_false counter
-                self.rows_all_false = None
-                self.save(update_fields=['rows_all_false'])
+            return
 
-        # Recalculate for the rest of conditions
-        if column:
-            cond_to_save = self.conditions.filter(columns=column)
-        else:
-            cond_to_save = self.conditions.all()
+        table_version = self.workflow.get_table_version()
+        filter_count, cond_counts, rows_all_false = (
+            sql.get_selected_row_counts(
+                self.workflow.get_data_frame_table_name(),
+                self.get_filter_formula(),
+                [cond.formula for cond in conditions],
+                order_column=self.workflow.get_row_order_column()))
 
         with transaction.atomic():
-            for cond in cond_to_save:
-                cond.save()
+            # Lock the rows so that the counts are not marked as stale while
+            # they are stored. If the table changed during the recount, they
+            # remain stale.
+            list(Condition.objects.select_for_update().filter(
+                pk__in=[cond.pk for cond in conditions]))
+            if self.filter:
+                list(Filter.objects.select_for_update().filter(
+                    pk=self.filter.pk))
+            if self.workflow.get_table_version() != table_version:
+                return
+
+            self._store_selected_row_counts(
+                conditions,
+                filter_count,
+                cond_counts,
+                rows_all_false)
+
+    def _store_selected_row_counts(
+        self,
+        conditions: List[Condition],
+        filter_count: int,
+        cond_counts: List[int],
+        rows_all_false: List[int],
+    ):
+        """Store the selected_count in filter and conditions.
+
+        :param conditions: Conditions of the action
+        :param filter_count: Number of rows selected by the filter
+        :param cond_counts: Number of rows selected by each condition
+        :param rows_all_false: Rows with all conditions false
+        :return: Filter, conditions and rows_all_false are updated
+        """
+        if self.filter:
+            self.filter.selected_count = filter_count
+            Filter.objects.filter(pk=self.filter.pk).update(
+                selected_count=filter_count)
+
+        for cond, cond_count in zip(conditions, cond_counts):
+            cond.selected_count = cond_count
+        Condition.objects.bulk_update(conditions, ['selected_count'])
+
+        self.rows_all_false = rows_all_false if conditions else None
+        self.save(update_fields=['rows_all_false'])
+
+    def refresh_selected_row_counts(self):
+        """Recompute the stale selected_count in filter and conditions.
+
+        Edits to the table rows mark the counts as stale (negative value). If
+        any of them is stale, all of them are recomputed with a single query.
+
+        :return: Filter and conditions are updated
+        """
+        conditions = self.conditions.all()
+        if not (
+            (self.filter and self.filter.selected_count < 0)
+            or any(cond.selected_count < 0 for cond in conditions)
+        ):
+            return
+
+        if not self.workflow.has_data_frame:
+            return
+
+        self.update_selected_row_counts()
 
     def used_columns(self) -> List[Column]:
         """List of columns used in the action.
@@ -367,7 +418,7 @@ class ActionDataOut(ActionBase):  # noqa Z214
         for cond in self.conditions.all():
             cond.formula = formula.rename_variable(
                 cond.formula, old_name, new_name)
-            cond.save(update_fields=['_formula'])
+            cond.save(update_fields=['_formula', 'modified'])
 
     def get_used_conditions(self) -> List[str]:
         """Get list of conditions that are used in the text_content.
@@ -529,8 +580,21 @@ class Action(ActionDataOut, ActionDataIn):
         return _('Action type {0} cannot be executed.'.format(
             self.get_action_type_display()))
 
-    def log(self, user, operation_type: str, **kwargs):
-        """Log the operation with the object."""
+    def log(
+        self,
+        user,
+        operation_type: str,
+        log_buffer: Optional[LogBuffer] = None,
+        **kwargs,
+    ):
+        """Log the operation with the object.
+
+        :param user: User executing the operation
+        :param operation_type: Type of log event
+        :param log_buffer: Buffer to accumulate the log (optional)
+        :param kwargs: Additional fields for the payload
+        :return: Log object
+        """
         payload = {
             'id': self.id,
             'name': self.name,
@@ -544,7 +608,7 @@ class Action(ActionDataOut, ActionDataIn):
             payload['target_url'] = self.target_url
 
         payload.update(kwargs)
-        return Log.objects.register(
+        return (log_buffer or Log.objects).register(
             user,
             operation_type,
             self.workflow,
@@ -1,4 +1,6 @@
 """Condition Model."""
+from typing import Dict
+
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.db.models import JSONField
@@ -52,6 +54,9 @@ class ConditionBase(CreateModifyFields):
         # Boolean flagging the formula as empty
         self.empty_formula = dataops_formula.is_empty(self._formula)
 
+        # The compiled version of the formula may no longer be valid
+        dataops_formula.invalidate_compiled_formula(self.compiled_formula_key)
+
         # Text rendering of the formula
         if not self.empty_formula:
             self._formula_text = dataops_formula.evaluate(
@@ -75,6 +80,26 @@ class ConditionBase(CreateModifyFields):
         """Return the text rendering of the formula."""
         return self._formula_text
 
+    @property
+    def compiled_formula_key(self):
+        """Key to store the compiled formula in the cache."""
+        return self._meta.label_lower, self.id
+
+    def evaluate_row(self, row_values: Dict) -> bool:
+        """Evaluate the formula with the values of a row.
+
+        The formula is compiled and kept in a cache while the object is not
+        modified.
+
+        :param row_values: Dictionary with (name, value) pairs for one row
+        :return: Boolean result of the evaluation
+        """
+        return dataops_formula.get_compiled_formula(
+            self.compiled_formula_key,
+            self.modified,
+            self._formula,
+        )(row_values)
+
     def update_selected_row_count(self, filter_formula=None) -> bool:
         """Calculate the number of rows for which this condition is true.
 
@@ -235,6 +260,21 @@ class Filter(ConditionBase):
         super().update_fields()
         return self.update_selected_row_count()
 
+    def refresh_selected_count(self) -> int:
+        """Recompute the number of selected rows if it is stale.
+
+        Edits to the table rows mark the count as stale (negative value) and
+        it is only recomputed when needed.
+
+        :return: Number of rows selected by the filter
+        """
+        if self.selected_count < 0:
+            self.update_selected_row_count()
+            Filter.objects.filter(pk=self.pk).update(
+                selected_count=self.selected_count)
+
+        return self.selected_count
+
     def delete_from_action(self):
         """Delete the filter only if it is not attached to a view."""
         if getattr(self, 'view', None) is None:
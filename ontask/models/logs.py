@@ -1,7 +1,8 @@
 """Model for OnTask Logs."""
 import json
-from typing import Dict
+from typing import Dict, List, Optional
 
+from django.conf import settings
 from django.db import models
 from django.db.models import JSONField
 from django.utils.functional import cached_property
@@ -28,6 +29,65 @@ class LogManager(models.Manager):
             payload=payload)
         return log_item
 
+    def buffered(self, batch_size: Optional[int] = None) -> 'LogBuffer':
+        """Create a buffer to register multiple logs with bulk inserts.
+
+        :param batch_size: Number of logs to insert at once (default is
+        LOGS_BULK_BATCH_SIZE)
+        :return: LogBuffer object (to use in a with statement)
+        """
+        return LogBuffer(self, batch_size or settings.LOGS_BULK_BATCH_SIZE)
+
+
+class LogBuffer:
+    """Accumulate log events and store them in the DB in batches.
+
+    Used when running actions that log one event per message. The logs are
+    stored with bulk_create when the batch is full, when flush is called,
+    and when exiting the with statement.
+    """
+
+    def __init__(self, manager: LogManager, batch_size: int):
+        """Store the manager and the size of the batch."""
+        self.manager = manager
+        self.batch_size = batch_size
+        self.pending: List['Log'] = []
+
+    def __enter__(self) -> 'LogBuffer':
+        """Use the buffer in a with statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Store the pending logs (also if an exception has been raised)."""
+        self.flush()
+
+    def register(
+        self,
+        user,
+        name: str,
+        workflow,
+        payload: Dict
+    ) -> 'Log':
+        """Handle user, name, workflow and payload (stored in the next flush).
+
+        :return: Log object (not yet stored in the DB)
+        """
+        log_item = self.manager.model(
+            user=user,
+            name=name,
+            workflow=workflow,
+            payload=payload)
+        self.pending.append(log_item)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return log_item
+
+    def flush(self):
+        """Store the pending logs in the DB."""
+        if self.pending:
+            self.manager.bulk_create(self.pending)
+            self.pending = []
+
 
 class Log(Owner):
     """Model to encode logs in OnTask.
@@ -82,7 +82,7 @@ class View(NameAndDescription, CreateModifyFields):
         :return: Number of rows resulting from using the formula
         """
         if self.filter:
-            return self.filter.selected_count
+            return self.filter.refresh_selected_count()
 
         return self.workflow.nrows
 
@@ -1,8 +1,9 @@
 """Model description for the Workflow."""
 import datetime
 import json
+import time
 from importlib import import_module
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import pandas as pd
 from django.conf import settings
@@ -39,6 +40,7 @@ class Workflow(NameAndDescription, CreateModifyFields):
     table_prefix = '__ONTASK_WORKFLOW_TABLE_'
     df_table_prefix = table_prefix + '{0}'
     upload_table_prefix = table_prefix + 'UPLOAD_{0}'
+    table_version_key = 'ONTASK_WORKFLOW_TABLE_VERSION_{0}'
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -120,6 +122,12 @@ class Workflow(NameAndDescription, CreateModifyFields):
         null=False,
         blank=False)
 
+    # Boolean that flags if the table has a (trigram) search index
+    search_index = models.BooleanField(
+        verbose_name=_('Create search index'),
+        help_text=_('Index the table to speed up searches in large tables'),
+        default=False)
+
     @classmethod
     def unlock_workflow_by_id(cls, wid: int):
         """Remove the session_key from the workflow with given id.
@@ -210,6 +218,15 @@ class Workflow(NameAndDescription, CreateModifyFields):
         """
         return self.columns.filter(is_key=True)
 
+    def get_row_order_column(self) -> Optional[str]:
+        """Get the column used to traverse the rows in a stable order.
+
+        :return: Name of the first key column (or None if there is none)
+        """
+        return self.get_unique_columns().values_list(
+            'name',
+            flat=True).first()
+
     def set_query_builder_ops(self):
         """Update the jason object with operator and names for the columns.
 
@@ -408,6 +425,61 @@ class Workflow(NameAndDescription, CreateModifyFields):
 
         # Save the workflow with the new fields.
         self.save()
+        self.increase_table_version()
+
+    def mark_selected_counts_stale(self, column_names: List[str] = None):
+        """Flag the number of selected rows in filters/conditions as stale.
+
+        The counts are set to -1 and recomputed only when they are needed
+        (see Action.refresh_selected_row_counts). If column names are given,
+        only the filters and conditions using those columns are affected
+        (plus the conditions in actions whose filter is affected).
+
+        :param column_names: Optional list of columns with modified values
+        :return: Reflected in the DB
+        """
+        filters = self.filters.all()
+        conditions = self.conditions.all()
+        if column_names is not None:
+            filters = filters.filter(columns__name__in=column_names)
+            conditions = conditions.filter(
+                models.Q(columns__name__in=column_names)
+                | models.Q(action__filter__in=filters))
+
+        conditions.update(selected_count=-1)
+        filters.update(selected_count=-1)
+
+        # Rows with all conditions false need to be recalculated
+        self.actions.filter(
+            models.Q(filter__selected_count__lt=0)
+            | models.Q(conditions__selected_count__lt=0),
+        ).update(rows_all_false=None)
+
+    def get_table_version(self) -> int:
+        """Get the version of the data stored in the workflow table.
+
+        The version is kept in the cache and increased every time the data in
+        the table changes, so it can be used in the keys of values derived
+        from the table (e.g. column statistics). If it is not in the cache,
+        it is initialised with the current time to avoid reusing a previous
+        version.
+
+        :return: Integer with the version of the table
+        """
+        key = self.table_version_key.format(self.id)
+        cache.add(key, time.time_ns(), None)
+        return cache.get(key)
+
+    def increase_table_version(self):
+        """Flag that the data in the workflow table has changed.
+
+        :return: Reflected in the cache
+        """
+        key = self.table_version_key.format(self.id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
 
     def add_columns(self, triplets: List[Tuple[str, str, bool]]):
         """Add a set of columns to the workflow.
@@ -430,6 +502,24 @@ class Workflow(NameAndDescription, CreateModifyFields):
         self.ncols = position
         self.save(update_fields=['ncols'])
 
+    def update_search_index(self):
+        """Create or drop the search index of the table.
+
+        The index is created (or replaced if the columns changed) if the
+        search_index field is True, and dropped otherwise.
+
+        :return: Nothing. Index is updated in the DB
+        """
+        if not pandas.is_table_in_db(self.get_data_frame_table_name()):
+            return
+
+        if self.search_index:
+            sql.create_search_index(
+                self.get_data_frame_table_name(),
+                self.get_column_names())
+        else:
+            sql.delete_search_index(self.get_data_frame_table_name())
+
     def reposition_columns(self, from_idx: int, to_idx: int):
         """Relocate the columns from one index to another.
 
@@ -208,12 +208,25 @@ class ScheduleUploadCanvasForm(
     Canvas Host is required only if more than one is specified.
     """
 
+    incremental_sync = forms.BooleanField(
+        label=_('Upload only the changes?'),
+        required=False,
+        help_text=_(
+            'If selected, each execution requests only the submissions '
+            'and enrolments that changed after the previous execution.'))
+
     def __init__(self, *args, **kwargs):
         """Modify certain field data."""
         super().__init__(*args, **kwargs)
 
         # Load the values in the payload
-        self.set_fields_from_dict(['canvas_course_id'])
+        self.set_fields_from_dict([
+            'canvas_course_id',
+            'upload_enrollment',
+            'upload_quizzes',
+            'upload_assignments',
+            'include_course_id_column',
+            'incremental_sync'])
 
         # Adjustments to fields
         self.fields['how_merge'].required = True
@@ -240,6 +253,8 @@ class ScheduleUploadCanvasForm(
             'upload_enrollment',
             'upload_quizzes',
             'upload_assignments',
+            'include_course_id_column',
+            'incremental_sync',
             'execute_start',
             'multiple_executions',
             'frequency',
@@ -251,7 +266,13 @@ class ScheduleUploadCanvasForm(
     def clean(self) -> Dict:
         """Store the fields in the Form Payload"""
         form_data = super().clean()
-        self.store_fields_in_dict([('canvas_course_id', None)])
+        self.store_fields_in_dict([
+            ('canvas_course_id', None),
+            ('upload_enrollment', None),
+            ('upload_quizzes', None),
+            ('upload_assignments', None),
+            ('include_course_id_column', None),
+            ('incremental_sync', None)])
         return form_data
 
 
@@ -281,6 +302,8 @@ class ScheduleUploadCanvasForm(ScheduleUploadCanvasForm):
             'upload_enrollment',
             'upload_quizzes',
             'upload_assignments',
+            'include_course_id_column',
+            'incremental_sync',
             'execute_start',
             'multiple_executions',
             'frequency',
@@ -37,6 +37,7 @@ class ScheduledOperationActionRunUpdateView(ScheduledOperationUpdateBaseView):
         context = super().get_context_data(**kwargs)
         all_false_conditions = False
         if self.action:
+            self.action.refresh_selected_row_counts()
             all_false_conditions = any(
                 cond.selected_count == 0
                 for cond in self.action.conditions.all())
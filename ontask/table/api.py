@@ -13,6 +13,7 @@ from ontask import OnTaskDataFrameNoKey, models, LOGGER
 from ontask.core import UserIsInstructor, get_workflow
 from ontask.dataops import pandas
 from ontask.table import serializers
+from ontask.tasks.row_counts import mark_row_counts_stale
 
 
 class TableBasicOps(APIView):
@@ -67,8 +68,7 @@ class TableBasicOps(APIView):
                 status=status.HTTP_400_BAD_REQUEST)
 
         # Update all the counters in the conditions
-        for action in workflow.actions.all():
-            action.update_selected_row_counts()
+        mark_row_counts_stale(workflow)
 
         return Response(None, status=status.HTTP_201_CREATED)
 
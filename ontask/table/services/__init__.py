@@ -3,6 +3,6 @@ from ontask.table.services.display import (
 from ontask.table.services.download import create_response_with_csv
 from ontask.table.services.errors import OnTaskTableNoKeyValueError
 from ontask.table.services.stats import (
-    get_df_and_columns, get_column_visualization_items,
+    get_column_statistics, get_column_visualization_items, get_columns_to_view,
     get_table_visualization_items)
 from ontask.table.services.view import do_clone_view, save_view_form
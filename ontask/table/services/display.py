@@ -14,6 +14,7 @@ from ontask import models
 from ontask.core import DataTablesServerSidePaging
 from ontask.dataops import sql
 from ontask.table.services.errors import OnTaskTableNoKeyValueError
+from ontask.tasks.row_counts import mark_row_counts_stale
 
 
 def create_dictionary_table_display_ss(
@@ -44,6 +45,12 @@ def create_dictionary_table_display_ss(
         # The first column is ops
         order_col_name = column_names[dt_page.order_col - 1]
 
+    # Find the first key column
+    key_name, key_idx = next(
+        ((col.name, idx) for idx, col in enumerate(columns) if col.is_key),
+        None)
+
+    # Fetch only the requested page
     qs = sql.search_table(
         workflow.get_data_frame_table_name(),
         dt_page.search_value,
@@ -51,19 +58,28 @@ def create_dictionary_table_display_ss(
         filter_formula=formula,
         order_col_name=order_col_name,
         order_asc=dt_page.order_dir == 'asc',
+        key_name=key_name,
+        offset=dt_page.start,
+        limit=dt_page.length,
+        use_search_index=workflow.search_index,
     )
 
-    # Find the first key column
-    key_name, key_idx = next(
-        ((col.name, idx) for idx, col in enumerate(columns) if col.is_key),
-        None)
+    # Count the rows only if the search or the filter restrict the table
+    if dt_page.search_value or formula:
+        records_filtered = sql.search_table_count(
+            workflow.get_data_frame_table_name(),
+            dt_page.search_value,
+            columns_to_search=column_names,
+            filter_formula=formula,
+            use_search_index=workflow.search_index)
+    else:
+        records_filtered = workflow.nrows
+
     key_name = escape(key_name)
 
     # Post-processing + adding operation columns and performing the search
     final_qs = []
-    nitems = 0  # For counting the number of elements in the result
-    for row in qs[dt_page.start:dt_page.start + dt_page.length]:
-        nitems += 1
+    for row in qs:
         new_element = {}
         if view_id:
             stat_url = reverse(
@@ -105,14 +121,10 @@ def create_dictionary_table_display_ss(
         # Create the list of elements to display and add it ot the final QS
         final_qs.append(new_element)
 
-        if nitems == dt_page.length:
-            # We reached the number or requested elements, abandon.
-            break
-
     return {
         'draw': dt_page.draw,
         'recordsTotal': workflow.nrows,
-        'recordsFiltered': len(qs),
+        'recordsFiltered': records_filtered,
         'data': final_qs,
     }
 
@@ -143,7 +155,5 @@ def perform_row_delete(
     workflow.nrows -= 1
     workflow.save(update_fields=['nrows'])
 
-    # Update the value of all the conditions in the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for action in workflow.actions.all():
-        action.update_selected_row_counts()
+    # The number of rows selected by the conditions must be recomputed
+    mark_row_counts_stale(workflow)
@@ -1,23 +1,71 @@
 """Functions to support download a table in CSV format."""
+import gzip
+import tempfile
+from typing import List, Optional
+
 from django import http
-import pandas as pd
+
+from ontask import models
+from ontask.dataops import sql
+
+# Bytes of CSV content kept in memory before moving it to a temporary file
+CSV_SPOOL_SIZE = 1024 * 1024
+
+# Size of the chunks sent in the response
+CSV_CHUNK_SIZE = 64 * 1024
 
 
-def create_response_with_csv(data_frame: pd.DataFrame) -> http.HttpResponse:
-    """Create a HTTP Response to download a data frame in CSV format.
+def create_response_with_csv(
+    workflow: models.Workflow,
+    column_names: List[str],
+    filter_formula: Optional[dict] = None,
+    use_gzip: bool = False,
+) -> http.StreamingHttpResponse:
+    """Create a HTTP Response to download a table in CSV format.
 
-    :param data_frame: Data frame to send
-    :return: HttpResponse
+    The content is written by the database (COPY ... TO STDOUT) in a
+    temporary file that is sent in chunks, so the memory used does not depend
+    on the size of the table.
+
+    :param workflow: Workflow with the table to send
+    :param column_names: Columns to include in the file
+    :param filter_formula: Optional formula to select the rows
+    :param use_gzip: Compress the content (Content-Encoding: gzip)
+    :return: StreamingHttpResponse
     """
+    boolean_column_names = list(workflow.columns.filter(
+        name__in=column_names,
+        data_type='boolean',
+    ).values_list('name', flat=True))
+
+    csv_file = tempfile.SpooledTemporaryFile(max_size=CSV_SPOOL_SIZE)
+    if use_gzip:
+        with gzip.GzipFile(fileobj=csv_file, mode='wb') as gzip_file:
+            sql.copy_to_csv(
+                gzip_file,
+                workflow.get_data_frame_table_name(),
+                column_names,
+                filter_formula,
+                boolean_column_names)
+    else:
+        sql.copy_to_csv(
+            csv_file,
+            workflow.get_data_frame_table_name(),
+            column_names,
+            filter_formula,
+            boolean_column_names)
+    content_length = csv_file.tell()
+    csv_file.seek(0)
+
     # Create the response object
-    response = http.HttpResponse(content_type='text/csv')
+    response = http.FileResponse(
+        csv_file,
+        block_size=CSV_CHUNK_SIZE,
+        content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="ontask_table.csv"'
-
-    # Dump the data frame as the content of the response object
-    data_frame.to_csv(
-        path_or_buf=response,
-        sep=str(','),
-        index=False,
-        encoding='utf-8')
+    response['Content-Length'] = content_length
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    response['Vary'] = 'Accept-Encoding'
 
     return response
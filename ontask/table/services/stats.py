@@ -1,21 +1,117 @@
 """Functions to support stats visualisation."""
+import hashlib
+import json
 from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
+import numpy as np
+from django.core.cache import cache
 from django.utils.translation import gettext as _
-from pandas import DataFrame
 
 from ontask import models
-from ontask.dataops import pandas
-from ontask.visualizations.plotly import PlotlyBoxPlot, PlotlyColumnHistogram
+from ontask.dataops import sql
+from ontask.visualizations.plotly import (
+    PlotlyBoxPlot, PlotlyColumnHistogram, get_bar_trace, get_box_trace,
+    get_histogram_nbins)
 
 VISUALIZATION_WIDTH = 600
 VISUALIZATION_HEIGHT = 400
 
+# Key to cache the statistics of a column (workflow id, table version, column
+# id, data type and hash of the filter formula)
+COLUMN_STATISTICS_KEY = 'ONTASK_COLUMN_STATISTICS_{0}_{1}_{2}_{3}_{4}'
+
+# Seconds to keep the statistics of a column in the cache
+COLUMN_STATISTICS_TIMEOUT = 3600
+
+
+def _get_histogram_trace(
+    workflow: models.Workflow,
+    column: models.Column,
+    stat_data: Dict,
+    filter_formula: Optional[Dict] = None,
+) -> Tuple[str, Dict]:
+    """Create the histogram trace of a column with the counts in the DB.
+
+    Numeric values are counted in bins (as in numpy.histogram) and the rest
+    are counted by their text representation.
+
+    :param workflow: Workflow with the table
+    :param column: Column to process
+    :param stat_data: Statistics of the column (see sql.get_column_statistics)
+    :param filter_formula: Optional formula to select the rows (view filter)
+    :return: Pair with the column data type and the trace
+    """
+    if column.data_type == 'integer' or column.data_type == 'double':
+        summary = stat_data['summary']
+        min_value, q1, __, q3, max_value = summary['quantiles']
+        if min_value == max_value:
+            # Single bin centered in the value
+            return column.data_type, get_bar_trace(
+                column.name,
+                [summary['size']],
+                edges=[min_value - 0.5, max_value + 0.5])
+
+        nbins = get_histogram_nbins(
+            summary['size'],
+            max_value - min_value,
+            q3 - q1)
+        return column.data_type, get_bar_trace(
+            column.name,
+            sql.get_column_histogram(
+                workflow.get_data_frame_table_name(),
+                column.name,
+                min_value,
+                max_value,
+                nbins,
+                filter_formula),
+            edges=np.linspace(min_value, max_value, nbins + 1))
+
+    counts = {}
+    for value, count in stat_data['counts'].items():
+        counts[str(value)] = counts.get(str(value), 0) + count
+    labels = sorted(counts)
+    return column.data_type, get_bar_trace(
+        column.name,
+        [counts[label] for label in labels],
+        labels=labels)
+
+
+def _get_column_traces(
+    workflow: models.Workflow,
+    column: models.Column,
+    stat_data: Dict,
+    filter_formula: Optional[Dict] = None,
+) -> Dict:
+    """Create the traces to visualize a column from its statistics.
+
+    :param workflow: Workflow with the table
+    :param column: Column to process
+    :param stat_data: Statistics of the column (see sql.get_column_statistics)
+    :param filter_formula: Optional formula to select the rows (view filter)
+    :return: Dictionary with the histogram (pair data type and trace) and the
+    boxplot trace (None if the column is not numeric)
+    """
+    boxplot = None
+    if column.data_type == 'integer' or column.data_type == 'double':
+        summary = stat_data['summary']
+        boxplot = get_box_trace(
+            column.name,
+            summary['quantiles'],
+            summary['mean'],
+            summary['std'])
+
+    return {
+        'histogram': _get_histogram_trace(
+            workflow,
+            column,
+            stat_data,
+            filter_formula),
+        'boxplot': boxplot}
+
 
 def _get_column_visualisations(
     column: models.Column,
-    col_data: List,
+    traces: Dict,
     vis_scripts: List,
     viz_id: Optional[str] = '',
     single_val: Optional[str] = None,
@@ -23,13 +119,14 @@ def _get_column_visualisations(
 ) -> List[str]:
     """Create a column visualization.
 
-    Given a column object and a dataframe, create the visualizations for this
-    column. The list vis_scripts is modified to include the scripts to
-    include in the HTML page. If single_val is not None, its position in the
-    visualization is marked (place individual value in population measure).
+    Given a column object and its traces, create the visualizations for this
+    column (with the values aggregated in the database). The list vis_scripts
+    is modified to include the scripts to include in the HTML page. If
+    single_val is not None, its position in the visualization is marked
+    (place individual value in population measure).
 
     :param column: Column element to visualize
-    :param col_data: Data in the column (extracted from the data frame)
+    :param traces: Traces of the column (see _get_column_traces)
     :param viz_id: String to use to label the visualization
     :param vis_scripts: Collection of visualization scripts needed in HTML
     :param single_val: Mark a specific value (or None)
@@ -52,8 +149,9 @@ def _get_column_visualisations(
         if single_val is not None:
             context['individual_value'] = single_val
         v1 = PlotlyBoxPlot(
-            data=col_data,
-            context=context)
+            data=None,
+            context=context,
+            traces=[traces['boxplot']])
         v1.get_engine_scripts(vis_scripts)
         visualizations.append(v1)
 
@@ -65,44 +163,83 @@ def _get_column_visualisations(
     if single_val is not None:
         context['individual_value'] = single_val
     v2 = PlotlyColumnHistogram(
-        data=col_data,
-        context=context)
+        data=None,
+        context=context,
+        trace=traces['histogram'])
     v2.get_engine_scripts(vis_scripts)
     visualizations.append(v2)
 
     return visualizations
 
 
-def get_df_and_columns(
+def get_column_statistics(
+    workflow: models.Workflow,
+    column: models.Column,
+    filter_formula: Optional[Dict] = None,
+) -> Optional[Dict]:
+    """Get the descriptive statistics of a column (cached).
+
+    The statistics and the traces to visualize them (key traces) are
+    calculated in the database and stored in the cache with a key that
+    includes the version of the workflow table, so they are discarded when
+    the data changes.
+
+    :param workflow: Workflow with the table
+    :param column: Column to process
+    :param filter_formula: Optional formula to select the rows (view filter)
+    :return: Dictionary as in pandas.get_column_statistics or None if the
+    column has no values
+    """
+    key = COLUMN_STATISTICS_KEY.format(
+        workflow.id,
+        workflow.get_table_version(),
+        column.id,
+        column.data_type,
+        hashlib.md5(
+            json.dumps(filter_formula, sort_keys=True).encode(),
+        ).hexdigest())
+
+    # None is a valid value (column without data)
+    not_cached = object()
+    stat_data = cache.get(key, not_cached)
+    if stat_data is not_cached:
+        stat_data = sql.get_column_statistics(
+            workflow.get_data_frame_table_name(),
+            column.name,
+            column.data_type,
+            filter_formula)
+        if stat_data is not None:
+            stat_data['traces'] = _get_column_traces(
+                workflow,
+                column,
+                stat_data,
+                filter_formula)
+        cache.set(key, stat_data, COLUMN_STATISTICS_TIMEOUT)
+
+    return stat_data
+
+
+def get_columns_to_view(
     workflow: models.Workflow,
     view: Optional[models.View],
-) -> Optional[Tuple[DataFrame, List]]:
-    """Get the DF and the columns to process.
+) -> List[models.Column]:
+    """Get the columns to process.
 
     :param workflow: Workflow object.
     :param view: Optional view (None if not needed).
-    :return: Tuple DataFrame, List of columns.
+    :return: List of columns.
     """
     if view:
-        columns_to_view = view.columns.filter(is_key=False)
-        df = pandas.load_table(
-            workflow.get_data_frame_table_name(),
-            [col.name for col in columns_to_view],
-            view.formula)
-    else:
-        # No view given, fetch the entire data frame
-        columns_to_view = workflow.columns.filter(is_key=False)
-        df = pandas.load_table(
-            workflow.get_data_frame_table_name(),
-            [col.name for col in columns_to_view])
+        return view.columns.filter(is_key=False)
 
-    return df, columns_to_view
+    # No view given, take all the columns in the workflow
+    return workflow.columns.filter(is_key=False)
 
 
 def get_column_visualization_items(
     workflow: models.Workflow,
     column: models.Column,
-) -> Tuple[Dict, List, List[str]]:
+) -> Tuple[Optional[Dict], List, List[str]]:
     """Get the visualization items (scripts and HTML) for a column.
 
     :param workflow: Workflow being processed
@@ -110,16 +247,17 @@ def get_column_visualization_items(
     :return: Tuple stat_data with descriptive stats, visualization scripts and
     visualization HTML
     """
-    # Get the dataframe
-    df = pandas.load_table(workflow.get_data_frame_table_name(), [column.name])
-
     # Extract the data to show at the top of the page
-    stat_data = pandas.get_column_statistics(df[column.name])
+    stat_data = get_column_statistics(workflow, column)
 
     viz_scripts = []
+    if stat_data is None:
+        # Column without values
+        return stat_data, viz_scripts, []
+
     visualizations = _get_column_visualisations(
         column,
-        df[[column.name]],
+        stat_data['traces'],
         viz_scripts,
         context={
             'style': 'width:100%; height:100%;' + 'display:inline-block;'},
@@ -129,15 +267,17 @@ def get_column_visualization_items(
 
 
 def get_table_visualization_items(
-    data_frame: pd.DataFrame,
+    workflow: models.Workflow,
     columns_to_view: List[models.Column],
     row: Optional,
+    filter_formula: Optional[Dict] = None,
 ) -> Tuple[List, List]:
     """Get the HTML snippets to visualize the given list of columns.
 
-    :param data_frame: Data frame containing the data
+    :param workflow: Workflow with the table
     :param columns_to_view: List of columns to process
     :param row: Row of values to take as reference (optional)
+    :param filter_formula: Optional formula to select the rows (view filter)
     :return: Tuple with visualization scripts, and html snippets.
     """
     vis_scripts = []
@@ -151,8 +291,9 @@ def get_table_visualization_items(
         # Add the title and surrounding container
         visualizations.append(
             '<hr/><h4 class="text-center">' + column.name + '</h4>')
+        stat_data = get_column_statistics(workflow, column, filter_formula)
         # If all values are empty, no need to proceed
-        if all(not col_data for col_data in data_frame[column.name]):
+        if not stat_data or not any(stat_data['counts']):
             visualizations.append(
                 '<p class="text-center">'
                 + _('No values in this column')
@@ -166,7 +307,7 @@ def get_table_visualization_items(
 
         column_viz = _get_column_visualisations(
             column,
-            data_frame[[column.name]],
+            stat_data['traces'],
             vis_scripts=vis_scripts,
             viz_id='column_{0}'.format(idx),
             single_val=row[column.name] if row else None,
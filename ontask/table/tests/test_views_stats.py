@@ -1,9 +1,17 @@
 """Test the views for the scheduler pages."""
+from unittest import mock
 
+from django.core.cache import cache
+import pandas as pd
 from rest_framework import status
 
 import ontask.dataops.sql.row_queries
 from ontask import tests
+from ontask.dataops import pandas, sql
+from ontask.table import services
+from ontask.tasks.row_counts import mark_row_counts_stale
+from ontask.visualizations.plotly import (
+    HISTOGRAM_MAX_BINS, PlotlyBoxPlot, PlotlyColumnHistogram)
 
 
 class TableTestStatView(tests.SimpleTableFixture, tests.OnTaskTestCase):
@@ -61,3 +69,196 @@ class TableTestStatView(tests.SimpleTableFixture, tests.OnTaskTestCase):
             {'pk': col.id},
             is_ajax=True)
         self.assertTrue(status.is_success(resp.status_code))
+
+
+class TableTestColumnStatistics(
+    tests.SimpleTableFixture,
+    tests.OnTaskTestCase,
+):
+    """Test the statistics of a column calculated in the database."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    def test(self):
+        """Compare with the statistics calculated by pandas."""
+        cache.clear()
+        data_frame = pandas.load_table(
+            self.workflow.get_data_frame_table_name())
+        for column in self.workflow.columns.all():
+            df_stats = pandas.get_column_statistics(data_frame[column.name])
+            db_stats = services.get_column_statistics(self.workflow, column)
+            for key in ['min', 'q1', 'mean', 'median', 'q3', 'max', 'std']:
+                self.assertEqual(df_stats[key], db_stats[key])
+            self.assertEqual(
+                sorted(df_stats['counts'].values()),
+                sorted(db_stats['counts'].values()))
+            if column.data_type not in ['boolean', 'datetime']:
+                self.assertEqual(df_stats['mode'], db_stats['mode'])
+
+        # Statistics of the rows selected by a formula
+        column = self.workflow.columns.get(name='age')
+        stat_data = services.get_column_statistics(
+            self.workflow,
+            column,
+            {
+                'condition': 'AND',
+                'not': False,
+                'rules': [{
+                    'field': 'one',
+                    'id': 'one',
+                    'input': 'text',
+                    'operator': 'equal',
+                    'type': 'string',
+                    'value': 'aaa'}],
+                'valid': True})
+        self.assertEqual(stat_data['min'], '12')
+        self.assertEqual(stat_data['max'], '13.2')
+
+        # Changes in the data discard the cached values
+        sql.update_row(
+            self.workflow.get_data_frame_table_name(),
+            ['age'],
+            [20],
+            filter_dict={'sid': 1})
+        self.assertEqual(
+            services.get_column_statistics(self.workflow, column)['max'],
+            '13.2')
+        mark_row_counts_stale(self.workflow, ['age'])
+        self.assertEqual(
+            services.get_column_statistics(self.workflow, column)['max'],
+            '20')
+
+
+class TableTestBinnedVisualizations(
+    tests.SimpleTableFixture,
+    tests.OnTaskTestCase,
+):
+    """Test the visualizations with the values aggregated in the server."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    def test(self):
+        """Check the traces and the column visualization page."""
+        data_frame = pandas.load_table(
+            self.workflow.get_data_frame_table_name(),
+            ['age', 'one'])
+
+        column_dtype, trace = PlotlyColumnHistogram.create_trace(
+            data_frame[['age']],
+            binned=True)
+        self.assertEqual(column_dtype, 'double')
+        self.assertEqual(trace['type'], 'bar')
+        self.assertEqual(sum(trace['y']), 3)
+        self.assertEqual(len(trace['x']), len(trace['width']))
+
+        # An extreme outlier does not increase the number of bins
+        __, trace = PlotlyColumnHistogram.create_trace(
+            pd.DataFrame({'v': [0.0, 1.0] * 50000 + [1e9]}),
+            binned=True)
+        self.assertTrue(len(trace['x']) <= HISTOGRAM_MAX_BINS)
+        self.assertEqual(sum(trace['y']), 100001)
+
+        column_dtype, trace = PlotlyColumnHistogram.create_trace(
+            data_frame[['one']],
+            binned=True)
+        self.assertEqual(column_dtype, 'string')
+        self.assertEqual(trace['x'], ['aaa', 'bbb'])
+        self.assertEqual(trace['y'], [2, 1])
+
+        boxplot = PlotlyBoxPlot(
+            data=data_frame[['age']],
+            context={'individual_value': 12.1},
+            binned=True)
+        self.assertIn('"median": [12.1]', boxplot.html_content)
+        self.assertIn('annotations', boxplot.html_content)
+
+        # The page includes only the aggregated values
+        col = self.workflow.columns.get(name='age')
+        resp = self.get_response('table:stat_column', {'pk': col.id})
+        self.assertTrue(status.is_success(resp.status_code))
+        self.assertIn('"type": "bar"', str(resp.content))
+        self.assertNotIn('"type": "histogram"', str(resp.content))
+
+
+class TableTestStatsInDatabase(
+    tests.SimpleTableFixture,
+    tests.OnTaskTestCase,
+):
+    """Test the visualizations created with the aggregates in the DB."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    filter_formula = {
+        'condition': 'AND',
+        'not': False,
+        'rules': [{
+            'field': 'one',
+            'id': 'one',
+            'input': 'text',
+            'operator': 'equal',
+            'type': 'string',
+            'value': 'aaa'}],
+        'valid': True}
+
+    def test_traces(self):
+        """Compare the traces with those calculated with pandas."""
+        cache.clear()
+        data_frame = pandas.load_table(
+            self.workflow.get_data_frame_table_name(),
+            ['age', 'one'])
+        for cname in ['age', 'one']:
+            column = self.workflow.columns.get(name=cname)
+            traces = services.get_column_statistics(
+                self.workflow,
+                column)['traces']
+            self.assertEqual(
+                traces['histogram'],
+                PlotlyColumnHistogram.create_trace(
+                    data_frame[[cname]],
+                    binned=True))
+
+        column = self.workflow.columns.get(name='age')
+        boxplot = services.get_column_statistics(
+            self.workflow,
+            column)['traces']['boxplot']
+        self.assertAlmostEqual(boxplot['median'][0], 12.1)
+        self.assertAlmostEqual(boxplot['upperfence'][0], 13.2)
+
+        # Rows selected by the filter of a view
+        traces = services.get_column_statistics(
+            self.workflow,
+            column,
+            self.filter_formula)['traces']
+        self.assertEqual(sum(traces['histogram'][1]['y']), 2)
+        self.assertAlmostEqual(traces['boxplot']['lowerfence'][0], 12)
+
+        __, visualizations = services.get_table_visualization_items(
+            self.workflow,
+            [column],
+            None,
+            self.filter_formula)
+        self.assertIn('"upperfence": [13.2]', ''.join(visualizations))
+        self.assertNotIn('12.1', ''.join(visualizations))
+
+    def test_pages_do_not_load_table(self):
+        """The stats pages do not load the table in a data frame."""
+        col = self.workflow.columns.get(name='age')
+        col.is_key = False
+        col.save()
+        view = self.workflow.views.get(name='simple view')
+
+        with mock.patch.object(
+            pandas,
+            'load_table',
+            wraps=pandas.load_table,
+        ) as load_table:
+            resp = self.get_response('table:stat_table')
+            self.assertTrue(status.is_success(resp.status_code))
+            resp = self.get_response('table:stat_table_view', {'pk': view.id})
+            self.assertTrue(status.is_success(resp.status_code))
+            resp = self.get_response('table:stat_column', {'pk': col.id})
+            self.assertTrue(status.is_success(resp.status_code))
+            load_table.assert_not_called()
@@ -1,10 +1,14 @@
 """Test the views for the scheduler pages."""
+import gzip
+import io
+import json
 
 from django.urls import reverse
+import pandas as pd
 from rest_framework import status
 
 from ontask import tests
-from ontask.dataops import pandas
+from ontask.dataops import pandas, sql
 import ontask.dataops.sql.row_queries
 from ontask.table import views
 
@@ -98,3 +102,132 @@ class TableTestViewTableDisplay(tests.SimpleTableFixture, tests.OnTaskTestCase):
                 'val': r_val['email']},
             is_ajax=True)
         self.assertTrue(status.is_success(resp.status_code))
+
+
+class TableTestViewTableDisplayPaging(
+    tests.SimpleTableFixture,
+    tests.OnTaskTestCase,
+):
+    """Test that only the requested page is returned."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    def test(self):
+        """Request pages of the table with and without search."""
+        nrows = self.workflow.nrows
+
+        resp = self.get_response(
+            'table:display_ss',
+            method='POST',
+            req_params={
+                'draw': '1',
+                'start': '1',
+                'length': '2',
+                'order[0][column]': '1',
+                'order[0][dir]': 'asc',
+                'search[value]': ''},
+            is_ajax=True)
+        self.assertTrue(status.is_success(resp.status_code))
+        resp_json = json.loads(resp.content)
+        self.assertEqual(len(resp_json['data']), min(2, nrows - 1))
+        self.assertEqual(resp_json['recordsFiltered'], nrows)
+
+        # Search a value present in a single row
+        r_val = ontask.dataops.sql.row_queries.get_table_row_by_index(
+            self.workflow, None, 1)
+        resp = self.get_response(
+            'table:display_ss',
+            method='POST',
+            req_params={
+                'draw': '2',
+                'start': '0',
+                'length': '10',
+                'order[0][column]': '1',
+                'order[0][dir]': 'asc',
+                'search[value]': r_val['email']},
+            is_ajax=True)
+        self.assertTrue(status.is_success(resp.status_code))
+        resp_json = json.loads(resp.content)
+        self.assertEqual(resp_json['recordsFiltered'], 1)
+        self.assertEqual(len(resp_json['data']), 1)
+
+
+class TableTestViewTableDisplaySearchIndex(
+    tests.SimpleTableFixture,
+    tests.OnTaskTestCase,
+):
+    """Test the search with the trigram search index."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    def test(self):
+        """Create the index and search the table."""
+        self.workflow.search_index = True
+        self.workflow.save(update_fields=['search_index'])
+        self.workflow.update_search_index()
+
+        table_name = self.workflow.get_data_frame_table_name()
+        self.assertEqual(
+            set(sql.get_search_index_columns(table_name)),
+            set(self.workflow.get_column_names()))
+        self.assertEqual(
+            len(ontask.dataops.sql.table_queries._get_search_index_names(
+                table_name)),
+            1)
+
+        r_val = ontask.dataops.sql.row_queries.get_table_row_by_index(
+            self.workflow, None, 1)
+        resp = self.get_response(
+            'table:display_ss',
+            method='POST',
+            req_params={
+                'draw': '1',
+                'start': '0',
+                'length': '10',
+                'order[0][column]': '1',
+                'order[0][dir]': 'asc',
+                'search[value]': r_val['email']},
+            is_ajax=True)
+        self.assertTrue(status.is_success(resp.status_code))
+        resp_json = json.loads(resp.content)
+        self.assertEqual(resp_json['recordsFiltered'], 1)
+
+        # Drop the index
+        self.workflow.search_index = False
+        self.workflow.save(update_fields=['search_index'])
+        self.workflow.update_search_index()
+        self.assertEqual(sql.get_search_index_columns(table_name), [])
+
+
+class TableTestViewCSVDownload(tests.SimpleTableFixture, tests.OnTaskTestCase):
+    """Test the download of the table in CSV format."""
+
+    user_email = 'instructor01@bogus.com'
+    user_pwd = 'boguspwd'
+
+    def test(self):
+        """Download the table with and without compression."""
+        data_frame = pandas.load_table(
+            self.workflow.get_data_frame_table_name())
+
+        resp = self.get_response('table:csvdownload')
+        self.assertTrue(status.is_success(resp.status_code))
+        self.assertNotIn('Content-Encoding', resp)
+        content = b''.join(resp.streaming_content)
+        self.assertEqual(int(resp['Content-Length']), len(content))
+        csv_frame = pd.read_csv(io.BytesIO(content))
+        self.assertEqual(
+            list(csv_frame.columns),
+            self.workflow.get_column_names())
+        self.assertEqual(len(csv_frame), len(data_frame))
+
+        resp = self.get_response(
+            'table:csvdownload',
+            HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertTrue(status.is_success(resp.status_code))
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(resp.streaming_content)),
+            content)
@@ -8,7 +8,6 @@ from django.views import generic
 from ontask import models
 from ontask.core import (
     UserIsInstructor, WorkflowView)
-from ontask.dataops import pandas
 from ontask.table import services
 
 
@@ -39,7 +38,7 @@ class TableCSVDownloadView(UserIsInstructor, WorkflowView, generic.DetailView):
             col_names = self.workflow.get_column_names()
 
         return services.create_response_with_csv(
-            pandas.get_subframe(
-                self.workflow.get_data_frame_table_name(),
-                formula,
-                col_names))
+            self.workflow,
+            col_names,
+            formula,
+            use_gzip='gzip' in request.headers.get('Accept-Encoding', ''))
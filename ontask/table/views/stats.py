@@ -96,8 +96,8 @@ class TableStatView(UserIsInstructor, WorkflowView, generic.DetailView):
             self.template_name = 'table/stat_row.html'
         else:
             self.template_name = 'table/stat_view.html'
-        # Get the data frame and the columns
-        data_frame, columns_to_view = services.get_df_and_columns(
+        # Get the columns (the values are aggregated in the database)
+        columns_to_view = services.get_columns_to_view(
             self.workflow,
             self.object)
 
@@ -110,9 +110,10 @@ class TableStatView(UserIsInstructor, WorkflowView, generic.DetailView):
                 column_names=[col.name for col in columns_to_view])
 
         vis_scripts, visualizations = services.get_table_visualization_items(
-            data_frame,
+            self.workflow,
             columns_to_view,
-            row)
+            row,
+            self.object.formula if self.object else None)
 
         context.update({
             'reference_value': row_select_val,
@@ -0,0 +1,58 @@
+"""Recompute the number of rows selected by filters and conditions."""
+from typing import List, Optional
+
+from celery import shared_task
+from django.core.cache import cache
+
+from ontask import models
+
+# Seconds to wait before recomputing the counts so that a burst of edits in
+# the rows of a workflow triggers a single recount.
+ROW_COUNTS_REFRESH_DELAY = 10
+ROW_COUNTS_REFRESH_KEY = 'ONTASK_ROW_COUNTS_REFRESH_{0}'
+
+
+@shared_task
+def refresh_row_counts(workflow_id: int):
+    """Recompute the stale selected counts in the actions of a workflow.
+
+    :param workflow_id: Id of the workflow to process
+    :return: Reflected in the DB
+    """
+    cache.delete(ROW_COUNTS_REFRESH_KEY.format(workflow_id))
+    for action in models.Action.objects.filter(
+        workflow_id=workflow_id,
+    ).select_related('workflow', 'filter'):
+        action.refresh_selected_row_counts()
+
+
+def mark_row_counts_stale(
+    workflow: models.Workflow,
+    column_names: Optional[List[str]] = None,
+):
+    """Flag the selected counts as stale and schedule their recount.
+
+    The version of the workflow table is increased first to discard the
+    values derived from the previous data (see Workflow.get_table_version)
+    and the counts being recomputed concurrently (see
+    Action.update_selected_row_counts).
+
+    The counts are recomputed either when they are needed or by a background
+    task delayed ROW_COUNTS_REFRESH_DELAY seconds (only one per workflow is
+    scheduled at any time).
+
+    :param workflow: Workflow with the modified rows
+    :param column_names: Optional list of columns with modified values
+    :return: Reflected in the DB
+    """
+    workflow.increase_table_version()
+    workflow.mark_selected_counts_stale(column_names)
+
+    if cache.add(
+        ROW_COUNTS_REFRESH_KEY.format(workflow.id),
+        True,
+        ROW_COUNTS_REFRESH_DELAY * 6,
+    ):
+        refresh_row_counts.apply_async(
+            (workflow.id,),
+            countdown=ROW_COUNTS_REFRESH_DELAY)
@@ -0,0 +1,16 @@
+"""Process the email read tracking requests accumulated."""
+
+from celery import shared_task
+
+from ontask.dataops import services
+
+
+@shared_task
+def track_flush():
+    """Update the tracking columns with the requests accumulated so far.
+
+    This function is not executed anywhere in the platform, but it is invoked
+    regularly by the workers at a frequency determined in the configuration
+    file (EMAIL_TRACK_FLUSH_INTERVAL).
+    """
+    services.flush_track_hits()
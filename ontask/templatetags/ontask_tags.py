@@ -143,8 +143,28 @@ def ontask_datetimepicker_js() -> str:
 
 @register.simple_tag(takes_context=True)
 def ot_insert_report(context, *args) -> str:
-    """Insert in the text a column list."""
+    """Insert in the text a column list.
+
+    The result does not depend on the row being rendered, so it is computed
+    once per action execution.
+    """
     action = context[ACTION_CONTEXT_VAR]
+    return evaluate.get_render_cache_item(
+        context,
+        (
+            'ot_insert_report',
+            args,
+            json.dumps(action.get_filter_formula(), sort_keys=True)),
+        lambda: _render_report(action, args))
+
+
+def _render_report(action: models.Action, args) -> str:
+    """Render the column list for the ot_insert_report tag.
+
+    :param action: Action being rendered
+    :param args: Translated names of the columns to include
+    :return: HTML table or JSON string with the column values
+    """
     real_args = [evaluate.RTR_ITEM(argitem) for argitem in args]
     all_column_values = []
     for column_name in real_args:
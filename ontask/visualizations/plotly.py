@@ -2,12 +2,131 @@
 import json
 from abc import abstractmethod
 from builtins import str
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 from django.utils.translation import gettext as _
 
 from ontask.dataops import pandas
 from ontask.visualizations import VisHandler
 
+# Maximum number of bins in the histograms computed in the server
+HISTOGRAM_MAX_BINS = 100
+
+
+def get_histogram_nbins(size: int, value_range: float, iqr: float) -> int:
+    """Calculate the number of bins of the histogram of a set of values.
+
+    The bin width is the one used by NumPy with bins='auto' (minimum of the
+    Freedman-Diaconis and Sturges estimators), but the number of bins is
+    limited to HISTOGRAM_MAX_BINS (a single outlier may otherwise require
+    millions of them).
+
+    :param size: Number of values
+    :param value_range: Difference between the maximum and the minimum
+    :param iqr: Interquartile range of the values
+    :return: Number of bins (one if the values are all equal)
+    """
+    if size == 0 or value_range <= 0:
+        return 1
+
+    width = value_range / (np.log2(size) + 1.0)
+    if iqr > 0:
+        width = min(width, 2.0 * iqr * size ** (-1.0 / 3.0))
+
+    return max(min(int(np.ceil(value_range / width)), HISTOGRAM_MAX_BINS), 1)
+
+
+def _get_histogram_bins(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate the histogram of a set of numeric values.
+
+    :param values: Array with the values (without NaN)
+    :return: Pair with the counts and the bin edges
+    """
+    if values.size == 0 or values.min() == values.max():
+        return np.histogram(values, bins=1)
+
+    iqr = np.subtract(*np.percentile(values, [75, 25]))
+    return np.histogram(
+        values,
+        bins=get_histogram_nbins(
+            values.size,
+            float(values.max() - values.min()),
+            iqr))
+
+
+def get_bar_trace(
+    name: str,
+    counts: List[int],
+    edges: Optional[List[float]] = None,
+    labels: Optional[List] = None,
+) -> Dict:
+    """Create a bar trace with the counts calculated in the server.
+
+    :param name: Name of the trace
+    :param counts: Number of values in each bar
+    :param edges: Edges of the bins (numeric values)
+    :param labels: Label of each bar (if no edges are given)
+    :return: Dictionary with the trace
+    """
+    if edges is None:
+        return {'x': labels, 'y': counts, 'name': name, 'type': 'bar'}
+
+    edges = np.asarray(edges, dtype=float)
+    return {
+        'x': ((edges[:-1] + edges[1:]) / 2).tolist(),
+        'y': list(counts),
+        'width': np.diff(edges).tolist(),
+        'name': name,
+        'type': 'bar'}
+
+
+def get_box_trace(
+    name: str,
+    quantiles: List[float],
+    mean: float,
+    std: Optional[float] = None,
+) -> Dict:
+    """Create a box trace with the summary of a set of values.
+
+    The whiskers are placed in the minimum and the maximum, so no outliers
+    are shown.
+
+    :param name: Name of the trace
+    :param quantiles: Minimum, Q1, median, Q3 and maximum
+    :param mean: Mean of the values
+    :param std: Standard deviation (None if not defined)
+    :return: Dictionary with the trace
+    """
+    trace = {
+        'x': [name],
+        'lowerfence': [float(quantiles[0])],
+        'q1': [float(quantiles[1])],
+        'median': [float(quantiles[2])],
+        'q3': [float(quantiles[3])],
+        'upperfence': [float(quantiles[4])],
+        'mean': [float(mean)],
+        'name': name,
+        'type': 'box'}
+    if std is not None:
+        trace['sd'] = [float(std)]
+    return trace
+
+
+def _get_box_summary(name: str, values: pd.Series) -> Dict:
+    """Create a box trace with the summary of a set of values.
+
+    :param name: Name of the trace
+    :param values: Series with the values (without NaN)
+    :return: Dictionary with the trace
+    """
+    return get_box_trace(
+        name,
+        values.quantile([0, .25, .5, .75, 1]).tolist(),
+        values.mean(),
+        values.std() if len(values) > 1 else None)
+
 
 class PlotlyHandler(VisHandler):
     """Handler to produce Plotly visualizations."""
@@ -62,7 +181,13 @@ class PlotlyHandler(VisHandler):
 
 
 class PlotlyBoxPlot(PlotlyHandler):
-    """Create a boxplot with a given data frame column."""
+    """Create a boxplot with a given data frame column.
+
+    If the parameter binned is True, the five-number summary (and the mean
+    and standard deviation) of each column is calculated in the server and
+    only these values are included in the page. The box traces may also be
+    given precomputed (parameter traces, see get_box_trace).
+    """
 
     def __init__(self, data, *args, **kwargs):
 
@@ -73,13 +198,9 @@ class PlotlyBoxPlot(PlotlyHandler):
         for key, value in list(kwargs.pop('context', {}).items()):
             self.format_dict[key] = value
 
-        data = []
-        for column in self.data.columns:
-            data.append(
-                {'y': list(self.data[column].dropna()),
-                 'name': column,
-                 'type': 'box'}
-            )
+        data = kwargs.get('traces')
+        if data is None:
+            data = self._create_traces(kwargs.get('binned', False))
 
         # If an individual value has been given, add the annotation and the
         # layout to the rendering.
@@ -116,6 +237,25 @@ class PlotlyBoxPlot(PlotlyHandler):
 
         # If a title is given, place it in front of the widget
 
+    def _create_traces(self, binned: bool):
+        """Create one box trace per column in the data.
+
+        :param binned: Include only the summary of the values
+        :return: List of traces
+        """
+        data = []
+        for column in self.data.columns:
+            values = self.data[column].dropna()
+            if not binned:
+                data.append(
+                    {'y': list(values),
+                     'name': column,
+                     'type': 'box'}
+                )
+            elif len(values) > 0:
+                data.append(_get_box_summary(column, values))
+        return data
+
     def get_id(self):
         """Return the name of this handler.
 
@@ -125,7 +265,56 @@ class PlotlyBoxPlot(PlotlyHandler):
 
 
 class PlotlyColumnHistogram(PlotlyHandler):
-    """Create a histogram."""
+    """Create a histogram.
+
+    The histogram trace may be given precomputed (parameter trace, obtained
+    with create_trace) to render the same data with different individual
+    values. If the parameter binned is True, the counts are calculated in the
+    server and only the bins are included in the page.
+    """
+
+    @staticmethod
+    def create_trace(
+        data,
+        binned: bool = False,
+    ) -> Tuple[Optional[str], Dict]:
+        """Create the histogram trace with the values in the first column.
+
+        :param data: Data frame with the column to plot
+        :param binned: Calculate the counts of the bars (numeric values are
+        grouped in bins, and the rest by value)
+        :return: Name of the column data type and dictionary with the trace
+        """
+        column = data.columns[0]
+        column_dtype = pandas.datatype_names.get(data[column].dtype.name)
+        values = data[column].dropna()
+        # Special case for bool and datetime. Turn into strings to be
+        # treated as such
+        if (
+            column_dtype == 'boolean' or column_dtype == 'datetime'
+                or column_dtype == 'string'
+        ):
+            values = values.map(str)
+
+        if not binned:
+            return column_dtype, {
+                'x': values.tolist(),
+                'histnorm': '',
+                'name': column,
+                'type': 'histogram'}
+
+        if column_dtype == 'integer' or column_dtype == 'double':
+            counts, edges = _get_histogram_bins(values.to_numpy())
+            return column_dtype, get_bar_trace(
+                column,
+                counts.tolist(),
+                edges=edges)
+
+        counts = values.value_counts().sort_index()
+        return column_dtype, get_bar_trace(
+            column,
+            counts.tolist(),
+            labels=counts.index.tolist())
 
     def _create_dictionaries(self, data, *args, **kwargs):
         """Create the dictionary needed for the rendering."""
@@ -140,27 +329,11 @@ class PlotlyColumnHistogram(PlotlyHandler):
         for key, value in list(kwargs.pop('context', {}).items()):
             self.format_dict[key] = value
 
-        data = []
-        column = self.data.columns[0]
-        column_dtype = pandas.datatype_names.get(
-            self.data[column].dtype.name)
-        data_list = self.data[column].dropna().tolist()
-        # Special case for bool and datetime. Turn into strings to be
-        # treated as such
-        if (
-            column_dtype == 'boolean' or column_dtype == 'datetime'
-                or column_dtype == 'string'
-        ):
-            data_list = [str(x) for x in data_list]
-
-        data.append(
-            {'x': data_list,
-             'histnorm': '',
-             'name': column,
-             'type': 'histogram'}
-        )
+        column_dtype, trace = (
+            kwargs.get('trace')
+            or self.create_trace(self.data, kwargs.get('binned', False)))
 
-        self.format_dict['data'] = data
+        self.format_dict['data'] = [trace]
 
         # If an individual value has been given, add the annotation and the
         # layout to the rendering.
@@ -1,4 +1,6 @@
 """functions to include the visualization code."""
+import json
+
 from django import template
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
@@ -11,6 +13,25 @@ from ontask.visualizations import plotly
 register = template.Library()
 
 
+def _get_histogram_data(workflow, filter_formula, column_name):
+    """Load the column values and create the histogram trace (binned).
+
+    :param workflow: Workflow with the data
+    :param filter_formula: Formula to select the rows
+    :param column_name: Column to plot
+    :return: Column data type and histogram trace
+    """
+    # Check if the column is correct
+    if not workflow.columns.filter(name=column_name).exists():
+        raise Exception(_('Column {0} does not exist').format(column_name))
+
+    df = pandas.get_subframe(
+        workflow.get_data_frame_table_name(),
+        filter_formula,
+        [column_name])
+    return plotly.PlotlyColumnHistogram.create_trace(df, binned=True)
+
+
 def vis_html_content(context, column_name):
     """Create the HTML visualization code."""
     # Get the action
@@ -19,10 +40,6 @@ def vis_html_content(context, column_name):
         raise Exception(_('Action object not found when processing tag'))
     workflow = action.workflow
 
-    # Check if the column is correct
-    if not workflow.columns.filter(name=column_name).exists():
-        raise Exception(_('Column {0} does not exist').format(column_name))
-
     # Get the visualization number to generate unique IDs
     viz_number = context[evaluate.VIZ_NUMBER_CONTEXT_VAR]
 
@@ -40,14 +57,22 @@ def vis_html_content(context, column_name):
     if ivalue is not None:
         viz_ctx['individual_value'] = ivalue
 
-    # Get the data from the data frame
-    df = pandas.get_subframe(
-        workflow.get_data_frame_table_name(),
-        action.get_filter_formula(),
-        [column_name])
+    # Get the data from the data frame and compute the histogram (only once
+    # per action execution, the individual value is added to each row)
+    filter_formula = action.get_filter_formula()
+    trace = evaluate.get_render_cache_item(
+        context,
+        (
+            'visualization',
+            column_name,
+            json.dumps(filter_formula, sort_keys=True)),
+        lambda: _get_histogram_data(workflow, filter_formula, column_name))
 
     # Get the visualisation
-    viz = plotly.PlotlyColumnHistogram(data=df, context=viz_ctx)
+    viz = plotly.PlotlyColumnHistogram(
+        data=None,
+        context=viz_ctx,
+        trace=trace)
 
     prefix = ''
     if viz_number == 0:
@@ -50,7 +50,7 @@ class WorkflowForm(forms.ModelForm):
         """Identify the model and the fields."""
 
         model = models.Workflow
-        fields = ['name', 'description_text']
+        fields = ['name', 'description_text', 'search_index']
 
 
 class WorkflowImportForm(forms.Form):
@@ -61,7 +61,8 @@ def do_clone_workflow(user, workflow: models.Workflow) -> models.Workflow:
         attributes=copy.deepcopy(workflow.attributes),
         query_builder_ops=copy.deepcopy(workflow.query_builder_ops),
         luser_email_column_md5=workflow.luser_email_column_md5,
-        lusers_is_outdated=workflow.lusers_is_outdated)
+        lusers_is_outdated=workflow.lusers_is_outdated,
+        search_index=workflow.search_index)
     new_workflow.save()
 
     try:
@@ -83,6 +84,7 @@ def do_clone_workflow(user, workflow: models.Workflow) -> models.Workflow:
             sql.clone_table(
                 workflow.get_data_frame_table_name(),
                 new_workflow.get_data_frame_table_name())
+            new_workflow.update_search_index()
 
         for item_obj in workflow.views.all():
             do_clone_view(user, item_obj, new_workflow)
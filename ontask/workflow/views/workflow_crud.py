@@ -112,6 +112,9 @@ class WorkflowUpdateView(
         # Save object
         self.object = form.save()
 
+        if 'search_index' in form.changed_data:
+            self.object.update_search_index()
+
         return services.log_workflow_createupdate(
             self.request,
             self.object,
@@ -53,6 +53,11 @@ BASE_URL = env('BASE_URL', default='')
 
 CANVAS_INFO_DICT = json.loads(env('CANVAS_INFO_DICT', default='{}'))
 CANVAS_TOKEN_EXPIRY_SLACK = env.int('CANVAS_TOKEN_EXPIRY_SLACK', default=600)
+CANVAS_API_CONCURRENCY = env.int('CANVAS_API_CONCURRENCY', default=4)
+CANVAS_API_PAGE_SIZE = env.int('CANVAS_API_PAGE_SIZE', default=100)
+CANVAS_RATE_LIMIT_THRESHOLD = env.float(
+    'CANVAS_RATE_LIMIT_THRESHOLD',
+    default=100)
 
 DATABASE_URL = env.db()
 
@@ -61,6 +66,16 @@ DATAOPS_CONTENT_TYPES = env(
     default='["text/csv", "application/json", '
             + '"application/gzip", "application/x-gzip", '
             + '"application/vnd.ms-excel"]')
+DATAOPS_ENGINE_MAX_OVERFLOW = env.int(
+    'DATAOPS_ENGINE_MAX_OVERFLOW',
+    default=10)
+DATAOPS_ENGINE_POOL_PRE_PING = env.bool(
+    'DATAOPS_ENGINE_POOL_PRE_PING',
+    default=True)
+DATAOPS_ENGINE_POOL_RECYCLE = env.int(
+    'DATAOPS_ENGINE_POOL_RECYCLE',
+    default=1800)
+DATAOPS_ENGINE_POOL_SIZE = env.int('DATAOPS_ENGINE_POOL_SIZE', default=5)
 DATAOPS_MAX_UPLOAD_SIZE = env.int('DATAOPS_MAX_UPLOAD_SIZE', default=209715200)
 DATAOPS_PLUGIN_DIRECTORY = env(
     'DATAOPS_PLUGIN_DIRECTORY',
@@ -98,12 +113,18 @@ The OnTask Support Team
 
 EMAIL_BURST = env.int('EMAIL_BURST', default=0)
 EMAIL_BURST_PAUSE = env.int('EMAIL_BURST_PAUSE', default=0)
+EMAIL_CONNECTIONS = env.int('EMAIL_CONNECTIONS', default=1)
 EMAIL_HOST = env('EMAIL_HOST', default='')
 EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 EMAIL_HTML_ONLY = env.bool('EMAIL_HTML_ONLY', default=True)
 EMAIL_OVERRIDE_FROM = env('EMAIL_OVERRIDE_FROM', default='')
 EMAIL_PORT = env('EMAIL_PORT', default='')
+EMAIL_RATE_LIMIT = env.float('EMAIL_RATE_LIMIT', default=0)
+EMAIL_RETRIES = env.int('EMAIL_RETRIES', default=2)
+EMAIL_TRACK_FLUSH_INTERVAL = env.int(
+    'EMAIL_TRACK_FLUSH_INTERVAL',
+    default=60)
 EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default='')
 EMAIL_USE_SSL = env.bool('EMAIL_USE_SSL', default='')
 
@@ -118,6 +139,8 @@ LDAP_AUTH_BIND_PASSWORD = env('LDAP_AUTH_BIND_PASSWORD', default='')
 
 LOG_FOLDER = env('LOG_FOLDER', default=join(BASE_DIR(), 'logs'))
 
+LOGS_BULK_BATCH_SIZE = env.int('LOGS_BULK_BATCH_SIZE', default=500)
+
 LOGS_MAX_LIST_SIZE = env.int('LOGS_MAX_LIST_SIZE', default=200)
 
 LTI_OAUTH_CREDENTIALS = env.dict('LTI_OAUTH_CREDENTIALS', default={})
@@ -429,6 +452,10 @@ CELERY_BEAT_SCHEDULE = {
             month_of_year=CELERY_SESSION_CLEANUP_CRONTAB[4]),
         #     'args': (DEBUG,),
     },
+    '__ONTASK_EMAIL_TRACK_FLUSH_TASK': {
+        'task': 'ontask.tasks.track_flush.track_flush',
+        'schedule': EMAIL_TRACK_FLUSH_INTERVAL,
+    },
 }
 CELERY_BROKER_URL = REDIS_URL['LOCATION']
 CELERY_RESULT_BACKEND = REDIS_URL['LOCATION']
@@ -563,6 +590,9 @@ def show_configuration() -> None:
     print('# ------')
     print('CANVAS_INFO_DICT (conf):', CANVAS_INFO_DICT)
     print('CANVAS_TOKEN_EXPIRY_SLACK (conf):', CANVAS_TOKEN_EXPIRY_SLACK)
+    print('CANVAS_API_CONCURRENCY (conf):', CANVAS_API_CONCURRENCY)
+    print('CANVAS_API_PAGE_SIZE (conf):', CANVAS_API_PAGE_SIZE)
+    print('CANVAS_RATE_LIMIT_THRESHOLD (conf):', CANVAS_RATE_LIMIT_THRESHOLD)
     print()
     print('# Celery')
     print('# ------')
@@ -668,6 +698,10 @@ def show_configuration() -> None:
     print('# OnTask')
     print('# --------')
     print('DATAOPS_CONTENT_TYPES:', DATAOPS_CONTENT_TYPES)
+    print('DATAOPS_ENGINE_MAX_OVERFLOW:', DATAOPS_ENGINE_MAX_OVERFLOW)
+    print('DATAOPS_ENGINE_POOL_PRE_PING:', DATAOPS_ENGINE_POOL_PRE_PING)
+    print('DATAOPS_ENGINE_POOL_RECYCLE:', DATAOPS_ENGINE_POOL_RECYCLE)
+    print('DATAOPS_ENGINE_POOL_SIZE:', DATAOPS_ENGINE_POOL_SIZE)
     print('DATAOPS_MAX_UPLOAD_SIZE (conf):', DATAOPS_MAX_UPLOAD_SIZE)
     print('DATAOPS_PLUGIN_DIRECTORY (conf):', DATAOPS_PLUGIN_DIRECTORY)
     print('DISABLED_ACTIONS:', DISABLED_ACTIONS)
@@ -683,10 +717,15 @@ def show_configuration() -> None:
     print('EMAIL_ACTION_PIXEL:', EMAIL_ACTION_PIXEL)
     print('EMAIL_BURST (conf):', EMAIL_BURST)
     print('EMAIL_BURST_PAUSE (conf):', EMAIL_BURST_PAUSE)
+    print('EMAIL_CONNECTIONS (conf):', EMAIL_CONNECTIONS)
     print('EMAIL_HTML_ONLY (conf):', EMAIL_HTML_ONLY)
     print('EMAIL_OVERRIDE_FROM (conf):', EMAIL_OVERRIDE_FROM)
+    print('EMAIL_RATE_LIMIT (conf):', EMAIL_RATE_LIMIT)
+    print('EMAIL_RETRIES (conf):', EMAIL_RETRIES)
+    print('EMAIL_TRACK_FLUSH_INTERVAL (conf):', EMAIL_TRACK_FLUSH_INTERVAL)
     print('EXECUTE_ACTION_JSON_TRANSFER (conf):', EXECUTE_ACTION_JSON_TRANSFER)
     print('LOG_FOLDER (conf):', LOG_FOLDER)
+    print('LOGS_BULK_BATCH_SIZE:', LOGS_BULK_BATCH_SIZE)
     print('LOGS_MAX_LIST_SIZE:', LOGS_MAX_LIST_SIZE)
     print('ONTASK_HELP_URL:', ONTASK_HELP_URL)
     print('SHOW_HOME_FOOTER_IMAGE (conf):', SHOW_HOME_FOOTER_IMAGE)